@@ -0,0 +1,209 @@
+"""Adaptive difficulty: Elo-style ratings for players and questions
+
+Each answer is treated as a match between the player and the question, and
+both ratings move by how surprising the result was. This is O(1) arithmetic
+per answer. Questions are indexed by rating, so the next question near a
+player's rating is found in O(log n).
+
+Questions nobody has answered yet keep the starting rating of their difficulty
+label. They stay in the bank's difficulty index and only move into the rating
+index once answered, so large banks cost nothing extra at startup.
+"""
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Set
+
+from analytics import text_key
+from question_bank import QuestionBank
+from session import QuizSession, points_for
+from skiplist import IndexableSkipList
+
+ADAPTIVE = "adaptive"
+
+PLAYER_RATING = 1000.0
+# Rating gap between neighbouring difficulty levels (easy 800, medium 1000, hard 1200)
+LEVEL_STEP = 200.0
+# Ratings move fast while little is known about a player or question, then settle
+K_START = 64.0
+K_MIN = 16.0
+# Random offset on the target rating so rounds at the same rating differ
+TARGET_SPREAD = 50.0
+
+
+def expected_score(player_rating: float, question_rating: float) -> float:
+    """Probability that a player answers a question correctly"""
+    return 1.0 / (1.0 + 10 ** ((question_rating - player_rating) / 400.0))
+
+
+def k_factor(answers: int) -> float:
+    return max(K_MIN, K_START / (1 + answers / 20))
+
+
+class AdaptiveEngine:
+    """Player and question ratings with a rating index for choosing questions
+
+    Ratings are kept as [rating, answers] pairs. Question ratings are keyed by
+    bank id in memory and by a hash of the question text on disk, so they
+    survive question packs being added or reordered.
+    """
+
+    def __init__(self, bank: QuestionBank, path: Optional[str] = None, save_every: int = 20,
+                 rng: Optional[random.Random] = None, window: int = 32):
+        self.bank = bank
+        self.path = path
+        self.save_every = save_every
+        self.rng = rng or random.Random()
+        self.window = window
+        self._players: Dict[str, List[float]] = {}
+        self._questions: Dict[int, List[float]] = {}
+        # (rating, question id) for every question that has been answered at least once
+        self._index = IndexableSkipList(self.rng)
+        levels = bank.difficulty_levels
+        middle = (len(levels) - 1) / 2
+        self._level_ratings = {level: PLAYER_RATING + (i - middle) * LEVEL_STEP for i, level in enumerate(levels)}
+        self._rounds_since_save = 0
+
+    def load(self):
+        """Read saved ratings, if any"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._players = {name: list(rating) for name, rating in data.get("players", {}).items()}
+        saved = {int(key, 16): rating for key, rating in data.get("questions", {}).items()}
+        if saved:
+            # One pass over the bank to find the saved questions by their text
+            for question_id in range(len(self.bank)):
+                rating = saved.get(text_key(self.bank.text_of(question_id)))
+                if rating is not None:
+                    self._questions[question_id] = list(rating)
+                    self._index.insert((rating[0], question_id))
+
+    def save(self):
+        """Atomically write all ratings"""
+        if not self.path:
+            return
+        # Copies first, so a server thread can save while the event loop keeps updating
+        players = dict(self._players)
+        questions = dict(self._questions)
+        content = json.dumps({
+            "players": players,
+            "questions": {f"{text_key(self.bank.text_of(question_id)):016x}": rating
+                          for question_id, rating in questions.items()}
+        })
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+        self._rounds_since_save = 0
+
+    def round_finished(self):
+        """Save every save_every rounds"""
+        self._rounds_since_save += 1
+        if self._rounds_since_save >= self.save_every:
+            self.save()
+
+    def player_rating(self, player: str) -> float:
+        rating = self._players.get(player)
+        return rating[0] if rating else PLAYER_RATING
+
+    def question_rating(self, question_id: int) -> float:
+        rating = self._questions.get(question_id)
+        if rating:
+            return rating[0]
+        return self._level_ratings.get(self.bank.difficulty_of(question_id), PLAYER_RATING)
+
+    def update(self, player: str, question_id: int, correct: bool):
+        """Move both ratings after an answer; a timeout counts as a wrong answer"""
+        player_entry = self._players.get(player)
+        if player_entry is None:
+            player_entry = self._players[player] = [PLAYER_RATING, 0]
+        question_entry = self._questions.get(question_id)
+        if question_entry is None:
+            question_entry = self._questions[question_id] = [self.question_rating(question_id), 0]
+        else:
+            self._index.remove((question_entry[0], question_id))
+
+        surprise = (1.0 if correct else 0.0) - expected_score(player_entry[0], question_entry[0])
+        player_entry[0] += k_factor(player_entry[1]) * surprise
+        question_entry[0] -= k_factor(question_entry[1]) * surprise
+        player_entry[1] += 1
+        question_entry[1] += 1
+        self._index.insert((question_entry[0], question_id))
+
+    def pick(self, player: str, exclude: Set[int]) -> Optional[int]:
+        """Return the id of a question rated close to the player, or None if all are excluded"""
+        target = self.player_rating(player) + self.rng.gauss(0, TARGET_SPREAD)
+        candidates = []
+
+        # Nearest rated questions on either side of the target
+        position = self._index.rank((target, -1))
+        for key, _ in self._index.items(position, position + self.window):
+            if key[1] not in exclude:
+                candidates.append(key)
+                break
+        below = list(self._index.items(max(0, position - self.window), position))
+        for key, _ in reversed(below):
+            if key[1] not in exclude:
+                candidates.append(key)
+                break
+
+        # A few random draws from each level's unanswered questions
+        for level, ids in self.bank.segments_at_or_below(self.bank.difficulty_levels[-1]):
+            for _ in range(min(len(ids), 8)):
+                question_id = ids[self.rng.randrange(len(ids))]
+                if question_id not in exclude and question_id not in self._questions:
+                    candidates.append((self._level_ratings[level], question_id))
+                    break
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda key: abs(key[0] - target))[1]
+
+
+class AdaptiveSession(QuizSession):
+    """A round whose next question is picked after each answer, from the player's current rating"""
+
+    __slots__ = ("engine", "player", "round_length", "exclude", "ids")
+
+    def __init__(self, engine: AdaptiveEngine, player: str, round_length: int, time_limit: float = 30,
+                 exclude: Optional[Set[int]] = None, rng: Optional[random.Random] = None,
+                 clock=time.monotonic):
+        super().__init__([], ADAPTIVE, time_limit, rng, clock)
+        self.engine = engine
+        self.player = player
+        self.round_length = round_length
+        self.exclude = set(exclude or ())
+        self.ids: List[int] = []
+
+    @property
+    def total_questions(self) -> int:
+        return self.round_length
+
+    def next_question(self):
+        if self._options is None and self._result is None and len(self.questions) < self.round_length:
+            question_id = self.engine.pick(self.player, self.exclude)
+            if question_id is None:
+                # Too few questions outside the player's recent rounds, so allow repeats from those
+                question_id = self.engine.pick(self.player, set(self.ids))
+            if question_id is None:
+                # Every question is excluded; end the round early
+                self.round_length = len(self.questions)
+            else:
+                self.exclude.add(question_id)
+                self.ids.append(question_id)
+                self.questions.append(self.engine.bank[question_id])
+        return super().next_question()
+
+    def submit_answer(self, choice: Optional[int], now: Optional[float] = None):
+        result = super().submit_answer(choice, now)
+        self.engine.update(self.player, self.ids[self._index], result.correct)
+        return result
+
+    def finish(self):
+        if self._result is None:
+            # Questions come from every level, so the maximum is what they were actually worth
+            self.max_score = sum(points_for(question.difficulty) for question in self.questions)
+        return super().finish()
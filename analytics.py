@@ -0,0 +1,221 @@
+"""Per-question analytics: how often each question is answered, right, wrong or too late
+
+Every answer is appended to a compact binary event log (14 bytes per answer)
+and folded into in-memory aggregates in O(1). The report streams the log in
+fixed-size chunks, so memory grows with the number of distinct questions, not
+with the number of answers. Run from the repository root:
+
+    python analytics.py --log question_analytics.bin [question packs...]
+"""
+import argparse
+import hashlib
+import os
+import struct
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from question_bank import Question
+
+MAGIC = b"PQAE\x01\x00\x00\x00"
+
+# question key, chosen option index in pack order (255 = none), flags, elapsed milliseconds
+EVENT = struct.Struct("<QBBI")
+NO_CHOICE = 255
+CORRECT = 1
+TIMED_OUT = 2
+
+# Response-time bucket upper bounds in seconds
+RESPONSE_BUCKETS = (1, 2, 3, 5, 8, 13, 20, 30)
+
+# (minimum correct rate, label) used to suggest a difficulty from the data
+DIFFICULTY_BY_CORRECT_RATE = [(0.8, "easy"), (0.5, "medium"), (0.0, "hard")]
+
+Event = Tuple[int, int, int, int]
+
+
+def text_key(text: str) -> int:
+    """Stable 64-bit key for a question text"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def question_key(question: Question) -> int:
+    """Stable 64-bit key for a question, from its text"""
+    return text_key(question.text)
+
+
+class QuestionStats:
+    """Running totals for one question"""
+
+    __slots__ = ("attempts", "correct", "timeouts", "elapsed_total", "response_counts", "picks")
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        self.timeouts = 0
+        self.elapsed_total = 0.0
+        self.response_counts = [0] * (len(RESPONSE_BUCKETS) + 1)
+        self.picks: List[int] = []
+
+    def add(self, chosen: int, flags: int, elapsed: float):
+        self.attempts += 1
+        self.correct += flags & CORRECT
+        self.timeouts += (flags & TIMED_OUT) >> 1
+        self.elapsed_total += elapsed
+        self.response_counts[bisect_left(RESPONSE_BUCKETS, elapsed)] += 1
+        if chosen != NO_CHOICE:
+            if chosen >= len(self.picks):
+                self.picks.extend([0] * (chosen + 1 - len(self.picks)))
+            self.picks[chosen] += 1
+
+    @property
+    def correct_rate(self) -> float:
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def timeout_rate(self) -> float:
+        return self.timeouts / self.attempts if self.attempts else 0.0
+
+    def response_time(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of response times"""
+        target = fraction * self.attempts
+        seen = 0
+        for bound, count in zip(RESPONSE_BUCKETS + (float("inf"),), self.response_counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def suggested_difficulty(self) -> str:
+        for minimum, label in DIFFICULTY_BY_CORRECT_RATE:
+            if self.correct_rate >= minimum:
+                return label
+        return DIFFICULTY_BY_CORRECT_RATE[-1][1]
+
+
+class QuestionAnalytics:
+    """Aggregates answers as they happen and appends them to the event log
+
+    Events are buffered in memory until flush(), so recording an answer never
+    touches the disk. The server records on its event loop and flushes on its
+    store thread, so the buffer is only swapped or grown under a lock. `stats`
+    only covers answers recorded by this process; use
+    aggregate(read_events(path)) for the full history.
+    """
+
+    def __init__(self, path: str = "question_analytics.bin"):
+        self.path = path
+        self.stats: Dict[int, QuestionStats] = {}
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def record(self, question: Question, chosen: Optional[str], correct: bool, timed_out: bool,
+               elapsed: float):
+        """Record one answer; chosen is the option text picked, or None"""
+        key = question_key(question)
+        index = question.options.index(chosen) if chosen in question.options else NO_CHOICE
+        flags = (CORRECT if correct else 0) | (TIMED_OUT if timed_out else 0)
+        elapsed_ms = min(int(elapsed * 1000), 0xFFFFFFFF)
+        event = EVENT.pack(key, index, flags, elapsed_ms)
+        with self._lock:
+            self._buffer += event
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = QuestionStats()
+        stats.add(index, flags, elapsed_ms / 1000)
+
+    def flush(self):
+        """Append buffered events to the log"""
+        # Once swapped out, the old buffer is only seen here, so it cannot grow while being written
+        with self._lock:
+            if not self._buffer:
+                return
+            data, self._buffer = self._buffer, bytearray()
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(MAGIC)
+            f.write(data)
+
+    def close(self):
+        self.flush()
+
+
+def read_events(path: str, chunk_events: int = 65536) -> Iterator[Event]:
+    """Yield (key, chosen, flags, elapsed_ms) from a log, reading it in chunks"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a question analytics log")
+        chunk_size = chunk_events * EVENT.size
+        while True:
+            chunk = f.read(chunk_size)
+            # A torn record at the end of the log (crash mid-write) is ignored
+            usable = len(chunk) - len(chunk) % EVENT.size
+            yield from EVENT.iter_unpack(memoryview(chunk)[:usable])
+            if len(chunk) < chunk_size:
+                break
+
+
+def aggregate(events: Iterable[Event]) -> Dict[int, QuestionStats]:
+    """Fold events into per-question stats"""
+    stats: Dict[int, QuestionStats] = {}
+    for key, chosen, flags, elapsed_ms in events:
+        entry = stats.get(key)
+        if entry is None:
+            entry = stats[key] = QuestionStats()
+        entry.add(chosen, flags, elapsed_ms / 1000)
+    return stats
+
+
+def report(stats: Dict[int, QuestionStats], questions: Iterable[Question], min_attempts: int = 1) -> List[str]:
+    """Report lines for every question with enough answers, least answered correctly first"""
+    known = {}
+    for question in questions:
+        key = question_key(question)
+        if key in stats:
+            known[key] = question
+
+    lines = [f"{'ATTEMPTS':>8} | {'CORRECT':>7} | {'TIMEOUT':>7} | {'P50 s':>5} | {'P90 s':>5} | "
+             f"{'LABEL':<6} -> {'DATA':<6} | {'TOP DISTRACTOR':<20} | QUESTION",
+             "-" * 110]
+    rows = sorted((entry.correct_rate, key) for key, entry in stats.items() if entry.attempts >= min_attempts)
+    for _, key in rows:
+        entry = stats[key]
+        question = known.get(key)
+        label = question.difficulty if question else "?"
+        text = question.text if question else f"<unknown question {key:016x}>"
+        distractor = ""
+        if question:
+            wrong = [(count, question.options[i]) for i, count in enumerate(entry.picks)
+                     if count and i < len(question.options) and question.options[i] != question.answer]
+            if wrong:
+                count, option = max(wrong)
+                distractor = f"{option[:14]} ({count})"
+        lines.append(f"{entry.attempts:>8} | {entry.correct_rate:>7.0%} | {entry.timeout_rate:>7.0%} | "
+                     f"{entry.response_time(0.5):>5} | {entry.response_time(0.9):>5} | "
+                     f"{label:<6} -> {entry.suggested_difficulty():<6} | {distractor:<20} | {text}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-question analytics report")
+    parser.add_argument("question_packs", nargs="*", help="question packs used by the game, to name questions")
+    parser.add_argument("--log", default="question_analytics.bin")
+    parser.add_argument("--min-attempts", type=int, default=1)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        parser.error(f"{args.log} does not exist")
+
+    # Imported here since the game imports this module
+    from game import QuizGame
+    from render import NullRenderer
+
+    stats = aggregate(read_events(args.log))
+    game = QuizGame(args.question_packs, renderer=NullRenderer())
+    for line in report(stats, game.questions, args.min_attempts):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
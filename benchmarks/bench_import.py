@@ -0,0 +1,53 @@
+"""Bulk import throughput (questions/second) against the number of validation workers
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py --size 500000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from importer import import_pack
+from question_bank import DIFFICULTY_LEVELS, QuestionBank
+
+
+def write_pack(path: str, size: int, error_rate: float, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            options = [f"keyword_{i % 500}", f"keyword_{(i + 1) % 500}", f"choice {i % 97}", "None of these"]
+            record = {"text": f"Synthetic question number {i}: which keyword fits this snippet?",
+                      "answer": options[0], "options": options, "difficulty": DIFFICULTY_LEVELS[i % 3]}
+            if rng.random() < error_rate:
+                record["answer"] = "missing"
+            f.write(json.dumps(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pack = os.path.join(workdir, "pack.jsonl")
+        write_pack(pack, args.size, args.error_rate, random.Random(0))
+
+        print(f"{args.size} questions, {os.cpu_count()} CPUs")
+        print(f"{'WORKERS':>7} | {'SECONDS':>8} | {'QUESTIONS/S':>11} | {'REJECTED':>8}")
+        print("-" * 44)
+        for workers in args.workers:
+            report = import_pack(QuestionBank(compact=True), pack, workers, args.chunk_size)
+            print(f"{workers:>7} | {report.seconds:>8.2f} | {report.questions_per_second:>11,.0f} | "
+                  f"{len(report.errors):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Memory per question: dict-based objects vs. __slots__ objects vs. compact columnar storage
+
+Run from the repository root:
+
+    python benchmarks/bench_memory.py --size 200000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import DIFFICULTY_LEVELS, Question, QuestionBank
+from sampling import QuestionSampler
+
+
+class DictQuestion:
+    """The original Question layout: a regular class with a per-instance __dict__"""
+
+    def __init__(self, text, answer, options, difficulty):
+        self.text = text
+        self.answer = answer
+        self.options = options
+        self.difficulty = difficulty
+
+
+def records(size: int):
+    """Synthetic pack records, decoded fresh like a real pack load would produce"""
+    for i in range(size):
+        options = [f"keyword_{i % 500}", f"keyword_{(i + 1) % 500}", f"choice {i % 97}", "None of these"]
+        yield f"Synthetic question number {i}: which keyword fits this snippet?", options[0], options, \
+            DIFFICULTY_LEVELS[i % 3]
+
+
+def measure(build) -> tuple:
+    """Return (bytes retained, seconds) for building a structure"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    def dict_objects():
+        return [DictQuestion(*record) for record in records(args.size)]
+
+    def slots_bank():
+        bank = QuestionBank()
+        bank.extend(Question(*record) for record in records(args.size))
+        return bank
+
+    def compact_bank():
+        bank = QuestionBank(compact=True)
+        bank.extend(Question(*record) for record in records(args.size))
+        return bank
+
+    print(f"{args.size} questions")
+    print(f"{'STORAGE':<28} | {'BYTES/QUESTION':>14} | {'BUILD s':>8} | {'ROUND us':>8}")
+    print("-" * 68)
+    for label, build in [("dict objects (no index)", dict_objects),
+                         ("__slots__ objects + index", slots_bank),
+                         ("compact columnar + index", compact_bank)]:
+        result, retained, elapsed = measure(build)
+        round_us = ""
+        if isinstance(result, QuestionBank):
+            sampler = QuestionSampler(result)
+            start = time.perf_counter()
+            for _ in range(1000):
+                sampler.sample("hard", 10)
+            round_us = f"{(time.perf_counter() - start) * 1000:.1f}"
+        print(f"{label:<28} | {retained / args.size:>14.1f} | {elapsed:>8.2f} | {round_us:>8}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
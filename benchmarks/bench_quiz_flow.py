@@ -0,0 +1,282 @@
+"""Scripted-player benchmark for the full terminal quiz flow
+
+Synthetic players drive QuizGame through its normal screens (welcome, menu,
+rounds, results, exit) with injected answers and a fake clock, so think time
+costs nothing. The sweep covers bank size, leaderboard size and rounds per
+player, and results are saved as JSON so runs can be compared. Run from the
+repository root:
+
+    python benchmarks/bench_quiz_flow.py --bank-sizes 1000 100000 --leaderboard-sizes 0 100000
+    python benchmarks/bench_quiz_flow.py --compare benchmarks/results/<earlier run>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import QuizGame
+from render import NullRenderer
+from score_store import JournalScoreStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a player 'thinks'"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CapturingRenderer(NullRenderer):
+    """Keeps the last screen so a scripted player can read the options off it"""
+
+    def __init__(self, input_func):
+        super().__init__(input_func=input_func)
+        self.screen: List[str] = []
+
+    def show(self, lines: List[str]):
+        self.screen = lines
+
+
+class SyntheticPlayer:
+    """Answers every prompt of the terminal flow and times the game between prompts"""
+
+    def __init__(self, name: str, accuracy: float, think_time: float, rounds: int, rng: random.Random,
+                 clock: FakeClock):
+        self.name = name
+        self.accuracy = accuracy
+        self.think_time = think_time
+        self.rounds_left = rounds
+        self.rng = rng
+        self.clock = clock
+        self.game: Optional[QuizGame] = None
+        self.renderer = CapturingRenderer(self.respond)
+        self.question_latencies: List[float] = []
+        self._returned_at: Optional[float] = None
+        self._answered = False
+        self._menu_step = 0
+
+    def respond(self, prompt: str) -> str:
+        now = time.perf_counter()
+        if self._returned_at is not None and "Your answer" in prompt and self._answered:
+            # Game time from the previous answer to this question being ready for input
+            self.question_latencies.append(now - self._returned_at)
+        reply = self._reply(prompt)
+        self._returned_at = time.perf_counter()
+        return reply
+
+    def _reply(self, prompt: str) -> str:
+        if "Enter your name" in prompt:
+            return self.name
+        if "Your answer" in prompt:
+            return self._answer()
+        if "Enter your choice (1-6)" in prompt:
+            # Set difficulty to hard once, then play, then exit
+            self._menu_step += 1
+            if self._menu_step == 1:
+                return "3"
+            return "1" if self._menu_step == 2 else "6"
+        if "Enter your choice (1-4)" in prompt:
+            return "3"
+        if "Enter your choice (1-2)" in prompt:
+            self.rounds_left -= 1
+            return "1" if self.rounds_left > 0 else "2"
+        return ""
+
+    def _answer(self) -> str:
+        self.clock.now += self.rng.uniform(0, self.think_time)
+        self._answered = True
+        options = [line.split(". ", 1)[1] for line in self.renderer.screen
+                   if line[:1].isdigit() and ". " in line]
+        answer = self.game.current_question.answer
+        if self.rng.random() < self.accuracy:
+            return str(options.index(answer) + 1)
+        wrong = [i for i, option in enumerate(options, 1) if option != answer]
+        return str(self.rng.choice(wrong))
+
+
+class TimedStore(JournalScoreStore):
+    """Journal store that records how long each round-end write takes"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.record_times: List[float] = []
+
+    def record(self, *args, **kwargs):
+        start = time.perf_counter()
+        entry = super().record(*args, **kwargs)
+        self.record_times.append(time.perf_counter() - start)
+        return entry
+
+
+def write_pack(path: str, size: int):
+    levels = ["easy", "medium", "hard"]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(json.dumps({
+                "text": f"Synthetic question {i}?",
+                "answer": f"answer {i % 101}",
+                "options": [f"answer {i % 101}", f"wrong {i % 7}", f"wrong {i % 11 + 7}", "none"],
+                "difficulty": levels[i % 3]
+            }) + "\n")
+
+
+def prefill_scores(path: str, players: int):
+    """Create a snapshot with the given number of existing players"""
+    store = JournalScoreStore(path)
+    store.load()
+    for i in range(players):
+        store.leaderboard.put({"name": f"existing{i}", "score": i % 30, "best_score": i % 30,
+                               "last_score": i % 30, "attempts": 1, "difficulty": "hard", "date": "2024-01-01"})
+    store.journal.compact(store.leaderboard)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_case(bank_size: int, leaderboard_size: int, rounds: int, players: int, accuracy: float,
+             think_time: float, seed: int, trace_memory: bool) -> Dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        pack = os.path.join(workdir, "pack.jsonl")
+        scores = os.path.join(workdir, "high_scores.json")
+        write_pack(pack, bank_size)
+        prefill_scores(scores, leaderboard_size)
+
+        if trace_memory:
+            tracemalloc.start()
+        rng = random.Random(seed)
+        clock = FakeClock()
+        store = TimedStore(scores)
+        question_latencies: List[float] = []
+        start = time.perf_counter()
+        game = None
+        for number in range(players):
+            player = SyntheticPlayer(f"bench{number}", accuracy, think_time, rounds, rng, clock)
+            if game is None:
+                game = QuizGame([pack], store, player.renderer, clock)
+                # The first round compiles the pack and finds its near-duplicates, as a fresh kiosk would
+                game.config["question_cache"] = os.path.join(workdir, "question_cache.bin")
+                game.config["duplicates_cache"] = os.path.join(workdir, "question_duplicates.bin")
+                game.config["analytics_path"] = os.path.join(workdir, "question_analytics.bin")
+                game.config["sessions_path"] = os.path.join(workdir, "sessions.bin")
+                game.config["review_path"] = os.path.join(workdir, "review")
+            else:
+                # Same process, bank and store; a new player at the kiosk
+                game.renderer = player.renderer
+                game.player_name = None
+            player.game = game
+            game.welcome()
+            question_latencies.extend(player.question_latencies)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "bank_size": bank_size,
+        "leaderboard_size": leaderboard_size,
+        "rounds": rounds,
+        "players": players,
+        "questions_answered": len(question_latencies),
+        "total_s": elapsed,
+        "question_latency_us": {
+            "mean": statistics.mean(question_latencies) * 1e6,
+            "p50": percentile(question_latencies, 0.5) * 1e6,
+            "p99": percentile(question_latencies, 0.99) * 1e6,
+        },
+        "persist_us": {
+            "mean": statistics.mean(store.record_times) * 1e6,
+            "max": max(store.record_times) * 1e6,
+        },
+        "peak_traced_mib": peak / 2 ** 20 if peak is not None else None,
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def case_key(case: Dict) -> tuple:
+    return case["bank_size"], case["leaderboard_size"], case["rounds"]
+
+
+def print_cases(cases: List[Dict], baseline: Optional[Dict] = None):
+    previous = {case_key(case): case for case in (baseline or {}).get("cases", [])}
+    # Without --trace-memory the memory column is the process's peak RSS so far instead
+    traced = all(case["peak_traced_mib"] is not None for case in cases)
+    print(f"{'BANK':>8} {'BOARD':>8} {'ROUNDS':>6} | {'Q p50 us':>9} {'Q p99 us':>9} | "
+          f"{'SAVE us':>9} | {'PEAK MiB' if traced else 'RSS MiB':>8} | {'vs BASE':>8}")
+    print("-" * 86)
+    for case in cases:
+        latency = case["question_latency_us"]
+        peak = case["peak_traced_mib"] if traced else case["max_rss_mib"]
+        change = ""
+        old = previous.get(case_key(case))
+        if old:
+            change = f"{(latency['p50'] / old['question_latency_us']['p50'] - 1) * 100:+.0f}%"
+        print(f"{case['bank_size']:>8} {case['leaderboard_size']:>8} {case['rounds']:>6} | "
+              f"{latency['p50']:>9.1f} {latency['p99']:>9.1f} | {case['persist_us']['mean']:>9.1f} | "
+              f"{peak:>8.1f} | {change:>8}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bank-sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--leaderboard-sizes", type=int, nargs="+", default=[0, 100000])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--think-time", type=float, default=10.0, help="max simulated seconds per answer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="measure peak memory with tracemalloc (slower)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    cases = []
+    for bank_size in args.bank_sizes:
+        for leaderboard_size in args.leaderboard_sizes:
+            for rounds in args.rounds:
+                cases.append(run_case(bank_size, leaderboard_size, rounds, args.players, args.accuracy,
+                                      args.think_time, args.seed, args.trace_memory))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_cases(cases, baseline)
+
+    if not args.no_save:
+        revision = git_revision()
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"quiz_flow-{time.strftime('%Y%m%d-%H%M%S')}-{revision}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"revision": revision, "python": platform.python_version(), "args": vars(args),
+                       "cases": cases}, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
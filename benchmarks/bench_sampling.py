@@ -0,0 +1,69 @@
+"""Round-start latency vs. bank size: legacy scan+shuffle against the indexed sampler
+
+Run from the repository root:
+
+    python benchmarks/bench_sampling.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import DIFFICULTY_LEVELS, Question, QuestionBank
+from sampling import QuestionSampler
+
+OPTIONS = ["a", "b", "c", "d"]
+
+
+def build_bank(size: int) -> QuestionBank:
+    """Build a synthetic bank with an even mix of difficulties"""
+    bank = QuestionBank()
+    for i in range(size):
+        bank.add(Question(f"Question {i}", "a", OPTIONS, DIFFICULTY_LEVELS[i % 3]))
+    return bank
+
+
+def legacy_round(bank: QuestionBank, difficulty: str, k: int):
+    """The original start_quiz selection: filter everything, shuffle everything, keep k"""
+    available = bank.levels_at_or_below(difficulty)
+    filtered = [q for q in bank if q.difficulty in available]
+    random.shuffle(filtered)
+    return filtered[:k]
+
+
+def time_rounds(func, rounds: int) -> float:
+    """Return the mean time per call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 300000])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--difficulty", default="medium", choices=DIFFICULTY_LEVELS)
+    args = parser.parse_args()
+
+    print(f"{'BANK SIZE':>10} | {'LEGACY us':>12} | {'SAMPLER us':>10} | {'+HISTORY us':>11} | {'+WEIGHTS us':>11}")
+    print("-" * 66)
+    for size in args.sizes:
+        bank = build_bank(size)
+        sampler = QuestionSampler(bank, history_rounds=5, rng=random.Random(0))
+        weights = {"easy": 1, "medium": 3}
+        # The legacy path is O(n) per round, so give it fewer rounds on big banks
+        legacy_rounds = max(1, min(args.rounds, 2_000_000 // size))
+        legacy = time_rounds(lambda: legacy_round(bank, args.difficulty, args.k), legacy_rounds)
+        plain = time_rounds(lambda: sampler.sample(args.difficulty, args.k), args.rounds)
+        history = time_rounds(lambda: sampler.sample(args.difficulty, args.k, player="bench"), args.rounds)
+        weighted = time_rounds(lambda: sampler.sample(args.difficulty, args.k, weights), args.rounds)
+        print(f"{size:>10} | {legacy:>12.1f} | {plain:>10.1f} | {history:>11.1f} | {weighted:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
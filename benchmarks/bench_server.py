@@ -0,0 +1,104 @@
+"""Load test for the asyncio quiz server with many concurrent local clients
+
+Run from the repository root:
+
+    python benchmarks/bench_server.py --clients 2000 --time-limit 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import QuizGame
+from score_store import JournalScoreStore
+from server import QuizServer
+from session_log import read_sessions
+
+
+async def play(port: int, name: str, rng: random.Random, think_time: float, silent_rate: float,
+               timeout_errors: list, time_limit: float):
+    """One scripted client: answers at random, or stays silent to hit the deadline"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    asked_at = 0.0
+    try:
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line or line == "BYE" or line == "BUSY":
+                return line
+            if line == "NAME?":
+                writer.write(f"{name}\n".encode())
+            elif line.startswith("DIFFICULTY?"):
+                writer.write(b"hard\n")
+            elif line == "ANSWER?":
+                asked_at = time.monotonic()
+                if rng.random() >= silent_rate:
+                    await asyncio.sleep(rng.uniform(0, think_time))
+                    writer.write(f"{rng.randint(1, 4)}\n".encode())
+            elif line.startswith("TIMEOUT"):
+                # How late the server's deadline fired compared to the time limit
+                timeout_errors.append(time.monotonic() - asked_at - time_limit)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as scores_dir:
+        game = QuizGame(score_store=JournalScoreStore(os.path.join(scores_dir, "high_scores.json")))
+        game.config["time_limit"] = args.time_limit
+        game.config["analytics_path"] = os.path.join(scores_dir, "question_analytics.bin")
+        game.config["sessions_path"] = os.path.join(scores_dir, "sessions.bin")
+        game.config["sessions_fsync"] = False
+        server = QuizServer(game, max_sessions=args.clients)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        rng = random.Random(args.seed)
+        timeout_errors: list = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            play(port, f"player{i}", random.Random(rng.random()), args.think_time, args.silent_rate,
+                 timeout_errors, args.time_limit)
+            for i in range(args.clients)
+        ])
+        elapsed = time.perf_counter() - start
+        await server.close()
+
+        print(f"Clients:             {args.clients}")
+        print(f"Completed sessions:  {results.count('BYE')}")
+        print(f"Wall time:           {elapsed:.2f}s")
+        print(f"Players recorded:    {len(game.high_scores)}")
+        logged = sum(session.finished for session in read_sessions(game.config["sessions_path"]))
+        print(f"Sessions logged:     {logged}")
+        if timeout_errors:
+            print(f"Timeouts:            {len(timeout_errors)}")
+            print(f"Deadline lateness:   mean {statistics.mean(timeout_errors) * 1000:.1f}ms, "
+                  f"max {max(timeout_errors) * 1000:.1f}ms")
+        print(f"Peak RSS:            {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    parser.add_argument("--think-time", type=float, default=0.5)
+    parser.add_argument("--silent-rate", type=float, default=0.1,
+                        help="fraction of questions a client never answers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Each client and server connection needs a file descriptor
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, args.clients * 2 + 64))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
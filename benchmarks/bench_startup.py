@@ -0,0 +1,89 @@
+"""Startup time: cold JSON pack load vs. the memory-mapped question cache
+
+Each measurement runs in a fresh interpreter, so it includes imports. Run from
+the repository root:
+
+    python benchmarks/bench_startup.py --size 200000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import game
+quiz = game.QuizGame({packs!r})
+quiz.config["question_cache"] = {cache!r}
+quiz.config["duplicates_cache"] = {duplicates!r}
+ready = time.perf_counter()
+if {load_questions!r}:
+    quiz.sampler.sample("hard", 10)
+print(ready - start, time.perf_counter() - start)
+"""
+
+
+def write_pack(path: str, size: int):
+    levels = ["easy", "medium", "hard"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{
+            "text": f"Synthetic question number {i}: which keyword fits this snippet?",
+            "answer": f"keyword_{i % 500}",
+            "options": [f"keyword_{i % 500}", f"keyword_{(i + 1) % 500}", f"choice {i % 97}", "None of these"],
+            "difficulty": levels[i % 3]
+        } for i in range(size)], f)
+
+
+def run(packs, cache, load_questions: bool, repeats: int):
+    """Return median (seconds to welcome screen, seconds to first round)"""
+    duplicates = os.path.join(os.path.dirname(cache), "question_duplicates.bin") if cache else None
+    code = SCRIPT.format(root=ROOT, packs=packs, cache=cache, duplicates=duplicates, load_questions=load_questions)
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                stdin=subprocess.DEVNULL).stdout
+        samples.append([float(value) for value in output.split()])
+    return statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pack = os.path.join(workdir, "pack.json")
+        cache = os.path.join(workdir, "question_cache.bin")
+        write_pack(pack, args.size)
+
+        start = time.perf_counter()
+        run([pack], cache, True, 1)
+        build = time.perf_counter() - start
+
+        duplicates = os.path.join(workdir, "question_duplicates.bin")
+        print(f"{args.size} questions in {os.path.getsize(pack) / 1e6:.1f} MB of JSON "
+              f"(cache files {os.path.getsize(cache) / 1e6:.1f} + {os.path.getsize(duplicates) / 1e6:.1f} MB, "
+              f"first build with near-duplicates {build:.2f}s)")
+        print(f"{'MODE':<34} | {'WELCOME s':>9} | {'FIRST ROUND s':>13}")
+        print("-" * 62)
+        for label, packs, cache_path, load in [
+            ("built-in questions only", [], None, True),
+            ("pack, lazy (nothing loaded yet)", [pack], None, False),
+            ("pack, cold JSON load", [pack], None, True),
+            ("pack, mmap cache", [pack], cache, True),
+        ]:
+            welcome, first_round = run(packs, cache_path, load, args.repeats)
+            print(f"{label:<34} | {welcome:>9.3f} | {first_round:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
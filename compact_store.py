@@ -0,0 +1,201 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class StringTable:
+    """All strings in one UTF-8 blob addressed by offset, with optional interning"""
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._offsets = array("Q", [0])
+        # Only interned strings (options, tags) are kept in the lookup dict
+        self._interned: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, string_id: int) -> str:
+        return str(self._blob[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8")
+
+    def add(self, value: str) -> int:
+        """Store a string and return its id"""
+        self._blob += value.encode("utf-8")
+        self._offsets.append(len(self._blob))
+        return len(self._offsets) - 2
+
+    def intern(self, value: str) -> int:
+        """Return the id of an equal string already stored, adding it if needed"""
+        string_id = self._interned.get(value)
+        if string_id is None:
+            string_id = self._interned[value] = self.add(value)
+        return string_id
+
+    def nbytes(self) -> int:
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+    def blob(self) -> bytes:
+        return self._blob
+
+
+class CompactQuestionStore:
+    """Columnar question rows: string ids in typed arrays, difficulty and answer as small ints
+
+    Row i is text[i], options opt[opt_start[i]:opt_start[i + 1]], answer[i] as an
+    index into those options, level[i] as an index into the bank's difficulty
+    levels and tags tag[tag_start[i]:tag_start[i + 1]].
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.text = array("I")
+        self.opt_start = array("I", [0])
+        self.opt = array("I")
+        self.answer = array("B")
+        self.level = array("B")
+        self.tag_start = array("I", [0])
+        self.tag = array("I")
+        self._frozen = False
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def append(self, text: str, options: List[str], answer_index: int, level: int,
+               tags: Iterable[str] = ()) -> int:
+        """Add one question row and return its id"""
+        if self._frozen:
+            self._thaw()
+        self.text.append(self.strings.add(text))
+        self.opt.extend(self.strings.intern(option) for option in options)
+        self.opt_start.append(len(self.opt))
+        self.answer.append(answer_index)
+        self.level.append(level)
+        self.tag.extend(self.strings.intern(tag) for tag in tags)
+        self.tag_start.append(len(self.tag))
+        return len(self.text) - 1
+
+    def options(self, row: int) -> List[str]:
+        strings = self.strings
+        return [strings[i] for i in self.opt[self.opt_start[row]:self.opt_start[row + 1]]]
+
+    def tags(self, row: int) -> Tuple[str, ...]:
+        strings = self.strings
+        return tuple(strings[i] for i in self.tag[self.tag_start[row]:self.tag_start[row + 1]])
+
+    def row(self, row: int) -> Tuple[str, List[str], int, int, Tuple[str, ...]]:
+        """Return (text, options, answer index, level, tags) for one row"""
+        return (self.strings[self.text[row]], self.options(row), self.answer[row],
+                self.level[row], self.tags(row))
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the columns and string table"""
+        return len(self.strings.blob()) + sum(column.itemsize * len(column) for column in self.columns().values())
+
+    def columns(self) -> Dict[str, array]:
+        """Return the named columns, e.g. for writing a cache file"""
+        return {
+            "strings.offsets": self.strings._offsets,
+            "text": self.text, "opt_start": self.opt_start, "opt": self.opt,
+            "answer": self.answer, "level": self.level,
+            "tag_start": self.tag_start, "tag": self.tag
+        }
+
+    @classmethod
+    def from_columns(cls, blob, columns: Dict[str, Sequence]) -> "CompactQuestionStore":
+        """Build a read-only store on top of existing buffers (e.g. memoryviews into an mmap)"""
+        store = cls()
+        store.strings._blob = blob
+        store.strings._offsets = columns["strings.offsets"]
+        for name in ("text", "opt_start", "opt", "answer", "level", "tag_start", "tag"):
+            setattr(store, name, columns[name])
+        store._frozen = True
+        return store
+
+    def _thaw(self):
+        """Copy mapped buffers into growable arrays before the first append"""
+        strings = self.strings
+        strings._blob = bytearray(strings._blob)
+        strings._offsets = array("Q", strings._offsets)
+        for name in ("text", "opt_start", "opt", "answer", "level", "tag_start", "tag"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.format, column))
+        # Options and tags were interned when the store was built, so re-register them
+        for string_id in set(self.opt) | set(self.tag):
+            strings._interned.setdefault(strings[string_id], string_id)
+        self._frozen = False
+
+
+CACHE_MAGIC = b"PQBC"
+CACHE_VERSION = 1
+_HEADER = struct.Struct("<4sI32sI")
+
+
+def write_columns(path: str, key: bytes, meta: dict, blob: bytes, columns: Dict[str, Sequence]):
+    """Write a blob plus typed columns to a cache file, atomically
+
+    Layout: header (magic, version, 32-byte key, JSON length), JSON describing
+    each section's typecode, offset and length, then the 8-byte aligned sections.
+    """
+    sections = [("blob", "B", memoryview(blob).cast("B"))]
+    for name, column in columns.items():
+        # Columns are arrays, or memoryviews when re-saving a store loaded from a cache
+        typecode = getattr(column, "typecode", None) or column.format
+        sections.append((name, typecode, memoryview(column).cast("B")))
+    layout = {}
+    offset = 0
+    for name, typecode, data in sections:
+        layout[name] = [typecode, offset, len(data)]
+        offset += (len(data) + 7) // 8 * 8
+    header_json = json.dumps({"meta": meta, "sections": layout}).encode("utf-8")
+    start = (_HEADER.size + len(header_json) + 7) // 8 * 8
+
+    # A temp file of its own, so processes saving the same cache at once never mix their output
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(path) or ".")
+    try:
+        with open(fd, "wb") as f:
+            f.write(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, key, len(header_json)))
+            f.write(header_json)
+            f.write(b"\0" * (start - f.tell()))
+            for name, _, data in sections:
+                f.write(data)
+                f.write(b"\0" * ((8 - len(data) % 8) % 8))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_columns(path: str, key: bytes) -> Optional[Tuple[dict, memoryview, Dict[str, memoryview]]]:
+    """Map a cache file and return (meta, blob, columns) as zero-copy views, or None if stale"""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(mapped)
+    if len(view) < _HEADER.size:
+        return None
+    magic, version, stored_key, header_length = _HEADER.unpack_from(view)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or stored_key != key:
+        return None
+    # A truncated or partly written file with the right key is as stale as one with the wrong key
+    try:
+        header = json.loads(bytes(view[_HEADER.size:_HEADER.size + header_length]))
+        start = (_HEADER.size + header_length + 7) // 8 * 8
+        sections = {}
+        for name, (typecode, offset, length) in header["sections"].items():
+            if offset < 0 or length < 0 or start + offset + length > len(view):
+                return None
+            sections[name] = view[start + offset:start + offset + length].cast(typecode)
+        # The views keep the mapping alive for as long as the store uses them
+        return header["meta"], sections.pop("blob"), sections
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
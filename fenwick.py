@@ -0,0 +1,102 @@
+from typing import List, Tuple
+
+
+class FenwickTree:
+    """Counts per non-negative integer value with O(log n) updates and prefix sums
+
+    The tree grows (doubling) when a value beyond its current size is added.
+    """
+
+    def __init__(self, size: int = 64):
+        self._size = max(1, size)
+        self._tree = [0] * (self._size + 1)
+        self._counts = [0] * self._size
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, value: int):
+        size = self._size
+        while size <= value:
+            size *= 2
+        counts = self._counts + [0] * (size - self._size)
+        # Rebuild in O(n) by pushing each node's sum to its parent
+        tree = [0] + counts
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._size, self._tree, self._counts = size, tree, counts
+
+    def add(self, value: int, amount: int = 1):
+        """Add amount to the count for value"""
+        if value < 0:
+            raise ValueError("Values must be non-negative")
+        if value >= self._size:
+            self._grow(value)
+        self._counts[value] += amount
+        self.total += amount
+        i = value + 1
+        while i <= self._size:
+            self._tree[i] += amount
+            i += i & -i
+
+    def count(self, value: int) -> int:
+        """Count for exactly value"""
+        return self._counts[value] if 0 <= value < self._size else 0
+
+    def prefix(self, value: int) -> int:
+        """Sum of counts for values 0..value"""
+        if value < 0:
+            return 0
+        i = min(value, self._size - 1) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class ScoreDistribution:
+    """Multiset of integer scores answering rank, percentile and histogram queries in O(log n)"""
+
+    def __init__(self):
+        self._tree = FenwickTree()
+
+    def __len__(self) -> int:
+        return self._tree.total
+
+    def add(self, score: int):
+        self._tree.add(max(0, score))
+
+    def remove(self, score: int):
+        self._tree.add(max(0, score), -1)
+
+    def replace(self, old: int, new: int):
+        if old != new:
+            self.remove(old)
+            self.add(new)
+
+    def above(self, score: int) -> int:
+        """Number of scores strictly greater than score"""
+        return self._tree.total - self._tree.prefix(score)
+
+    def rank(self, score: int) -> int:
+        """1-based rank of a score; equal scores share a rank"""
+        return self.above(score) + 1
+
+    def percentile(self, score: int) -> float:
+        """Percentage of scores at or below score"""
+        if not self._tree.total:
+            return 0.0
+        return self._tree.prefix(score) / self._tree.total * 100
+
+    def histogram(self, width: int = 5) -> List[Tuple[int, int]]:
+        """(bucket start, count) for every bucket of width points up to the highest score"""
+        buckets = []
+        start = 0
+        while start < len(self._tree) and self._tree.prefix(start - 1) < self._tree.total:
+            buckets.append((start, self._tree.prefix(start + width - 1) - self._tree.prefix(start - 1)))
+            start += width
+        return buckets
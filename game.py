@@ -1,51 +1,261 @@
+import argparse
+import math
 import random
+import sqlite3
 import time
-from typing import List, Dict, Callable, Generator, Any, Optional, Union
-import json
-import os
-import sys
+from typing import Callable, List, Optional
 
-class Question:
-    def __init__(self, text: str, answer: str, options: List[str], difficulty: str):
-        self.text = text
-        self.answer = answer
-        self.options = options
-        self.difficulty = difficulty
-        
-        # Validate the answer is in options
-        assert answer in options, f"Answer '{answer}' not found in options!"
+from importer import import_pack
+from question_bank import Question, QuestionBank, pack_cache_key
+from sampling import QuestionSampler
+from session import QuizSession
+from journal import JournalError
+from score_store import ScoreStore, open_score_store
+from render import Renderer, make_renderer
+from metrics import Metrics
+from analytics import QuestionAnalytics
+from adaptive import ADAPTIVE, AdaptiveEngine, AdaptiveSession
+from similarity import THRESHOLD, NearDuplicateIndex, NearDuplicates
+from session_log import QuestionLookup, SessionLog, restore_session
+from review import REVIEW, ReviewScheduler
 
 class QuizGame:
-    def __init__(self):
-        self.questions = []
+    def __init__(self, question_packs: Optional[List[str]] = None,
+                 score_store: Optional[ScoreStore] = None, renderer: Optional[Renderer] = None,
+                 clock: Callable[[], float] = time.monotonic, metrics: Optional[Metrics] = None):
         self.score = 0
         self.current_question = None
         self.total_questions = 0
+        self.session = None
         self.player_name = None
-        self.high_scores = []
-        
-        # Try to load high scores from file
-        try:
-            with open("high_scores.json", "r") as f:
-                self.high_scores = json.load(f)
-        except:
-            # If file doesn't exist or is corrupted, start with empty high scores
-            self.high_scores = []
+        self.renderer = renderer or make_renderer()
+        self.clock = clock
+        # Disabled metrics cost one attribute check per call, so they stay wired in
+        self.metrics = metrics or Metrics()
+        self.question_packs = question_packs or []
+        
+        # High scores and questions are loaded on first use, so the welcome screen shows at once
+        self._score_store = score_store
+        self._high_scores = None
+        self._questions = None
+        self._sampler = None
+        self._analytics = None
+        self._adaptive = None
+        self._near_duplicates = None
+        self._cache_key = None
+        self._session_log = None
+        self._session_number = None
+        self._review = None
+        self._question_lookup = None
         
         # Global configuration for the game
         self.config = {
             "time_limit": 30,  # seconds per question
             "difficulty_levels": ["easy", "medium", "hard"],
-            "current_difficulty": "easy"
+            "current_difficulty": "easy",
+            "questions_per_round": 10,
+            "question_weights": None,  # optional {difficulty: weight} for round selection
+            "history_rounds": 3,  # skip questions the player saw in their last N rounds
+            "high_scores_shown": 20,  # rows on the high score screen
+            "question_cache": "question_cache.bin",  # compiled question packs; None disables it
+            "metrics_path": None,  # write metrics here (.json snapshot, else Prometheus text) after each quiz
+            "analytics_path": "question_analytics.bin",  # per-question answer log; None disables it
+            "ratings_path": "ratings.json",  # player and question ratings for adaptive rounds
+            "avoid_near_duplicates": True,  # keep near-duplicate questions out of the same round
+            "duplicates_cache": "question_duplicates.bin",  # near-duplicates found when the packs are compiled
+            "lookup_cache": "question_keys.bin",  # question text keys of the cached packs, for review and resume
+            "sessions_path": "sessions.bin",  # every round's seed, questions and answers; None disables it
+            "sessions_fsync": True,  # sync the session log after every answer, so a crashed round can resume
+            "review_path": "review"  # directory of per-player decks of missed questions; None disables review
         }
+
+    @property
+    def high_scores(self) -> ScoreStore:
+        """The score store, loaded on first use"""
+        if self._high_scores is None:
+            # Snapshot + journal by default, or a shared SQLite store
+            store = self._score_store if self._score_store is not None else open_score_store("high_scores.json")
+            try:
+                with self.metrics.time("quiz_high_scores_load_seconds"):
+                    store.load()
+            except JournalError as e:
+                # A corrupted snapshot is moved aside, so start with empty high scores
+                self.renderer.add([f"Warning: {e}"])
+            self._high_scores = store
+        return self._high_scores
+
+    @property
+    def questions(self) -> QuestionBank:
+        """The question bank, built (or mapped from the cache) on first use"""
+        if self._questions is None:
+            with self.metrics.time("quiz_question_bank_load_seconds"):
+                self._questions = self._init_questions(self.question_packs)
+        return self._questions
+
+    @property
+    def sampler(self) -> QuestionSampler:
+        if self._sampler is None:
+            self._sampler = QuestionSampler(self.questions, self.config["history_rounds"],
+                                            near_duplicates=self.near_duplicates)
+        return self._sampler
+
+    @property
+    def near_duplicates(self) -> Optional[NearDuplicates]:
+        """Near-duplicate questions of the bank; None when disabled"""
+        # They are found or mapped along with the question bank, never when a round starts
+        self.questions
+        return self._near_duplicates
+
+    def _init_near_duplicates(self, bank: QuestionBank, cache_key: Optional[bytes]) -> Optional[NearDuplicates]:
+        """Map the packs' near-duplicates from their cache, or find (and cache) them
+
+        Finding them takes minutes for large packs, so packs keep them next to
+        the question cache and pay once per change. Without a cache key (the
+        built-in questions alone, or the question cache turned off) they are
+        found in memory on every start.
+        """
+        if not self.config["avoid_near_duplicates"]:
+            return None
+        cache_path = self.config["duplicates_cache"] if cache_key else None
+        duplicates = NearDuplicates.load(cache_path, cache_key, THRESHOLD) if cache_path else None
+        if duplicates is None:
+            with self.metrics.time("quiz_near_duplicates_build_seconds"):
+                duplicates = NearDuplicateIndex.build(bank).near_duplicates()
+            if cache_path:
+                try:
+                    duplicates.save(cache_path, cache_key)
+                except OSError:
+                    pass
+        return duplicates
+
+    @property
+    def analytics(self) -> Optional[QuestionAnalytics]:
+        """Per-question answer analytics, or None when disabled"""
+        if self._analytics is None and self.config["analytics_path"]:
+            self._analytics = QuestionAnalytics(self.config["analytics_path"])
+        return self._analytics
+
+    @property
+    def adaptive(self) -> AdaptiveEngine:
+        """Ratings for adaptive rounds, loaded on first use"""
+        if self._adaptive is None:
+            engine = AdaptiveEngine(self.questions, self.config["ratings_path"])
+            try:
+                engine.load()
+            except (OSError, ValueError) as e:
+                self.renderer.add([f"Warning: could not load ratings: {e}"])
+            self._adaptive = engine
+        return self._adaptive
+
+    @property
+    def session_log(self) -> Optional[SessionLog]:
+        """Record of every round for replay and crash resume, or None when disabled"""
+        if self._session_log is None and self.config["sessions_path"]:
+            self._session_log = SessionLog(self.config["sessions_path"], self.config["sessions_fsync"])
+        return self._session_log
+
+    @property
+    def review(self) -> Optional[ReviewScheduler]:
+        """Spaced-repetition decks of missed questions, or None when disabled"""
+        if self._review is None and self.config["review_path"]:
+            self._review = ReviewScheduler(self.config["review_path"])
+        return self._review
+
+    @property
+    def question_lookup(self) -> QuestionLookup:
+        """Finds bank questions by their text key; the key columns are mapped from their cache when there is one"""
+        if self._question_lookup is None:
+            bank = self.questions
+            cache_path = self.config["lookup_cache"] if self._cache_key else None
+            lookup = QuestionLookup.load(cache_path, bank, self._cache_key) if cache_path else None
+            if lookup is None:
+                lookup = QuestionLookup(bank)
+                if cache_path:
+                    try:
+                        lookup.save(cache_path, self._cache_key)
+                    except OSError:
+                        pass
+            self._question_lookup = lookup
+        return self._question_lookup
+
+    def save_review(self):
+        """Write the review decks that changed"""
+        if self._review is not None:
+            try:
+                self._review.save()
+            except OSError:
+                pass
+
+    def _log_session(self, method, *args):
+        """Write to the session log; a failed write only costs the round its resume point"""
+        if self._session_number is None:
+            return
+        try:
+            method(self.session_log, self._session_number, *args)
+        except (OSError, ValueError):
+            self._session_number = None
+
+    def _resume_session(self) -> Optional[QuizSession]:
+        """Offer to continue the player's round that was cut off, e.g. by a crash"""
+        log = self.session_log
+        if log is None:
+            return None
+        try:
+            record = log.unfinished(self.player_name)
+            if record is None:
+                return None
+            session = restore_session(record, self.question_lookup, self.clock)
+            if session is not None:
+                choice = self.renderer.prompt(
+                    f"\nYou have an unfinished {record.difficulty} round ({len(record.answers)} of "
+                    f"{len(record.keys)} questions answered). Resume it? (y/n): ")
+                if choice.strip().lower().startswith("y"):
+                    self._session_number = record.number
+                    return session
+            log.abandon(record.number)
+        except (OSError, ValueError) as e:
+            self.renderer.add([f"Warning: could not read the session log: {e}"])
+            self.config["sessions_path"] = None
+            self._session_log = None
+        return None
+
+    def close(self):
+        """Flush and close everything that was opened"""
+        if self._high_scores is not None:
+            self._high_scores.close()
+        if self._adaptive is not None:
+            try:
+                self._adaptive.save()
+            except OSError:
+                pass
+        if self._session_log is not None:
+            self._session_log.close()
+        self.save_review()
+        self.flush_analytics()
+        self.export_metrics()
+
+    def flush_analytics(self):
+        """Append recorded answers to the analytics log"""
+        if self._analytics is not None:
+            try:
+                self._analytics.flush()
+            except OSError:
+                pass
+
+    def export_metrics(self):
+        """Write the metrics file, if one is configured"""
+        if self.metrics.enabled and self.config["metrics_path"]:
+            try:
+                self.metrics.export(self.config["metrics_path"])
+            except OSError:
+                pass
+
+    def _init_questions(self, question_packs: List[str]) -> QuestionBank:
+        """Initialize the quiz questions with fun Python facts and any extra packs"""
+        questions = []
         
-        # Initialize questions
-        self._init_questions()
-    
-    def _init_questions(self):
-        """Initialize the quiz questions with fun Python facts"""
         # Easy questions
-        self.questions.extend([
+        questions.extend([
             Question(
                 "What keyword is used to define a function in Python?",
                 "def",
@@ -85,7 +295,7 @@ class QuizGame:
         ])
         
         # Medium questions
-        self.questions.extend([
+        questions.extend([
             Question(
                 "Which keyword is used to handle exceptions?",
                 "try",
@@ -125,7 +335,7 @@ class QuizGame:
         ])
         
         # Hard questions
-        self.questions.extend([
+        questions.extend([
             Question(
                 "Which keyword creates anonymous functions?",
                 "lambda",
@@ -163,71 +373,109 @@ class QuizGame:
                 "hard"
             )
         ])
-    
-    def _clear_screen(self):
-        """Clear the console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+
+        # Packs are compiled once into a cache that later starts simply memory-map;
+        # it is keyed on these questions and each pack's size and mtime
+        levels = self.config["difficulty_levels"]
+        cache_path = self.config["question_cache"] if question_packs else None
+        if cache_path:
+            cache_key = self._cache_key = pack_cache_key([q.to_dict() for q in questions], question_packs, levels)
+            bank = QuestionBank.load_cache(cache_path, cache_key)
+            if bank is not None:
+                self._near_duplicates = self._init_near_duplicates(bank, cache_key)
+                return bank
+        
+        # Indexed by difficulty so rounds never scan the bank, and stored column-wise
+        # so large packs cost bytes per question rather than objects
+        bank = QuestionBank(levels, compact=True)
+        bank.extend(questions)
+        
+        # Extra question packs loaded from disk; bad records are skipped and reported
+        for path in question_packs:
+            report = import_pack(bank, path, workers=1)
+            if report.errors:
+                self.metrics.increment("quiz_pack_records_rejected_total", len(report.errors))
+                first = report.errors[0]
+                self.renderer.add([f"Warning: {len(report.errors)} bad questions skipped in {path} "
+                                   f"(first at {first.number}: {first.message})"])
+        
+        if cache_path:
+            try:
+                bank.save_cache(cache_path, cache_key)
+            except OSError:
+                pass
+        self._near_duplicates = self._init_near_duplicates(bank, self._cache_key)
+        return bank
     
     def _display_ascii_art(self):
-        """Display a centered and larger Python Quiz title"""
+        """Return a centered and larger Python Quiz title"""
         title = "🚀 PYTHON MASTERY QUIZ 🚀"
-        print(title.center(50))  # Adjust the width as needed
+        return title.center(50)  # Adjust the width as needed
 
     def welcome(self):
         """Display welcome message and get player name"""
-        self._clear_screen()
-        self._display_ascii_art()
-        print("\n" + "=" * 50)
-        print("\nTest your knowledge of Python keywords and concepts.")
+        self.renderer.show([
+            self._display_ascii_art(),
+            "\n" + "=" * 50,
+            "\nTest your knowledge of Python keywords and concepts."
+        ])
         
         # Get player name
         while True:
-            name = input("\nEnter your name: ").strip()
+            name = self.renderer.prompt("\nEnter your name: ").strip()
             if name:
                 self.player_name = name
                 break
             else:
-                print("Please enter a valid name.")
+                self.renderer.add(["Please enter a valid name."])
         
-        print(f"\nHello, {self.player_name}! Let's test your Python knowledge.")
-        input("\nPress Enter to continue...")
+        self.renderer.add([f"\nHello, {self.player_name}! Let's test your Python knowledge."])
+        self.renderer.prompt("\nPress Enter to continue...")
         self._show_menu()
     
     def _show_menu(self):
         """Display the main menu"""
         while True:
-            self._clear_screen()
-            self._display_ascii_art()
-            print("\n" + "=" * 50)
-            print("MAIN MENU")
-            print("=" * 50)
-            print("1. Start New Quiz")
-            print("2. Set Difficulty")
-            print("3. View High Scores")
-            print("4. Rules")
-            print("5. Exit")
+            self.renderer.show([
+                self._display_ascii_art(),
+                "\n" + "=" * 50,
+                "MAIN MENU",
+                "=" * 50,
+                "1. Start New Quiz",
+                "2. Review Missed Questions",
+                "3. Set Difficulty",
+                "4. View High Scores",
+                "5. Rules",
+                "6. Exit"
+            ])
             
-            choice = input("\nEnter your choice (1-5): ")
+            choice = self.renderer.prompt("\nEnter your choice (1-6): ")
             
             if choice == "1":
-                input("\nPress Enter to start the quiz...")
+                self.renderer.prompt("\nPress Enter to start the quiz...")
                 self.start_quiz()
             elif choice == "2":
-                self._set_difficulty()
+                self.start_review()
             elif choice == "3":
-                self._show_high_scores()
+                self._set_difficulty()
             elif choice == "4":
-                self._show_rules()
+                self._show_high_scores()
             elif choice == "5":
+                self._show_rules()
+            elif choice == "6":
                 self._exit_game()
                 break
             else:
-                print("Invalid choice. Please try again.")
-                input("\nPress Enter to continue...")
+                self.renderer.add(["Invalid choice. Please try again."])
+                self.renderer.prompt("\nPress Enter to continue...")
     
     def _exit_game(self):
         """Exit the game with a nice farewell message"""
-        self._clear_screen()
+        # Make pending scores durable
+        try:
+            self.high_scores.flush()
+        except (OSError, sqlite3.Error):
+            pass
         
         farewell_message = f"""
         {self.player_name}, we're sad to see you go!
@@ -243,85 +491,94 @@ class QuizGame:
         Come back soon to test your Python knowledge again!
         """
         
-        print(farewell_message)
-        input("\nPress Enter to exit the game...")
-        print("\nExiting game... Goodbye!")
+        self.renderer.show([farewell_message])
+        self.renderer.prompt("\nPress Enter to exit the game...")
+        self.renderer.add(["\nExiting game... Goodbye!"])
     
     def _get_player_high_score(self):
         """Get the player's highest score"""
-        player_scores = [score["best_score"] for score in self.high_scores 
-                         if score["name"] == self.player_name]
-        return max(player_scores) if player_scores else 0
+        return self.high_scores.best_score(self.player_name)
     
     def _set_difficulty(self):
         """Set the quiz difficulty"""
-        self._clear_screen()
-        print("\n" + "=" * 50)
-        print("SET DIFFICULTY")
-        print("=" * 50)
-        print("1. Easy - Perfect for beginners!")
-        print("2. Medium - For those who know their Python basics.")
-        print("3. Hard - Only for Python masters!")
+        self.renderer.show([
+            "\n" + "=" * 50,
+            "SET DIFFICULTY",
+            "=" * 50,
+            "1. Easy - Perfect for beginners!",
+            "2. Medium - For those who know their Python basics.",
+            "3. Hard - Only for Python masters!",
+            "4. Adaptive - Questions follow your skill as you answer."
+        ])
         
-        choice = input("\nEnter your choice (1-3): ")
+        choice = self.renderer.prompt("\nEnter your choice (1-4): ")
         
         if choice == "1":
             self.config["current_difficulty"] = "easy"
-            print("Difficulty set to Easy. You'll get basic Python questions.")
+            self.renderer.add(["Difficulty set to Easy. You'll get basic Python questions."])
         elif choice == "2":
             self.config["current_difficulty"] = "medium"
-            print("Difficulty set to Medium. Prepare for some challenges!")
+            self.renderer.add(["Difficulty set to Medium. Prepare for some challenges!"])
         elif choice == "3":
             self.config["current_difficulty"] = "hard"
-            print("Difficulty set to Hard. Good luck, Python master!")
+            self.renderer.add(["Difficulty set to Hard. Good luck, Python master!"])
+        elif choice == "4":
+            self.config["current_difficulty"] = ADAPTIVE
+            self.renderer.add(["Difficulty set to Adaptive. Questions get harder as you get them right!"])
         else:
-            print("Invalid choice. Keeping current difficulty.")
+            self.renderer.add(["Invalid choice. Keeping current difficulty."])
         
-        input("\nPress Enter to continue...")
+        self.renderer.prompt("\nPress Enter to continue...")
     
     def _show_high_scores(self):
         """Show the high scores with attempts tracking"""
-        self._clear_screen()
-        print("\n" + "=" * 50)
-        print("HIGH SCORES")
-        print("=" * 50)
-        
-        if not self.high_scores:
-            print("No high scores yet. Be the first!")
-            input("\nPress Enter to continue...")
+        lines = [
+            "\n" + "=" * 50,
+            "HIGH SCORES",
+            "=" * 50
+        ]
+        
+        if not len(self.high_scores):
+            lines.append("No high scores yet. Be the first!")
+            self.renderer.show(lines)
+            self.renderer.prompt("\nPress Enter to continue...")
             return
         
-        # Sort high scores by best score (descending)
-        sorted_scores = sorted(self.high_scores, 
-                                key=lambda x: x.get('best_score', 0), 
-                                reverse=True)
+        # Only the rows shown are read from the best score index
+        top_scores = self.high_scores.top(self.config["high_scores_shown"])
         
-        print("\nRANK | NAME               | BEST | LAST | ATTEMPTS | DIFFICULTY | DATE")
-        print("-" * 80)
+        lines.append("\nRANK | NAME               | BEST | LAST | ATTEMPTS | DIFFICULTY | DATE")
+        lines.append("-" * 80)
         
-        for idx, entry in enumerate(sorted_scores, 1):
+        for idx, entry in enumerate(top_scores, 1):
             name_display = entry['name'][:18] + '...' if len(entry['name']) > 18 else entry['name'].ljust(18)
-            print(f"{idx:4} | {name_display} | {entry.get('best_score', 0):4} | {entry.get('last_score', 0):4} | {entry.get('attempts', 1):8} | {entry['difficulty'].ljust(10)} | {entry['date']}")
+            lines.append(f"{idx:4} | {name_display} | {entry.get('best_score', 0):4} | {entry.get('last_score', 0):4} | {entry.get('attempts', 1):8} | {entry['difficulty'].ljust(10)} | {entry['date']}")
+        
+        player_rank = self.high_scores.rank(self.player_name)
+        if player_rank:
+            lines.append(f"\nYour rank: {player_rank} of {len(self.high_scores)}")
         
-        input("\nPress Enter to continue...")
+        self.renderer.show(lines)
+        self.renderer.prompt("\nPress Enter to continue...")
     
     def _show_rules(self):
         """Show the game rules"""
-        self._clear_screen()
-        print("\n" + "=" * 50)
-        print("RULES")
-        print("=" * 50)
-        print("1. You'll be presented with multiple-choice questions about Python.")
-        print(f"2. You have {self.config['time_limit']} seconds to answer each question.")
-        print("3. Each correct answer earns you points based on difficulty:")
-        print("   - Easy: 1 point")
-        print("   - Medium: 2 points")
-        print("   - Hard: 3 points")
-        print("4. There's no penalty for wrong answers.")
-        print("5. Try to get the highest score possible!")
-        print("6. Have fun while learning about Python!")
-        
-        input("\nPress Enter to continue...")
+        self.renderer.show([
+            "\n" + "=" * 50,
+            "RULES",
+            "=" * 50,
+            "1. You'll be presented with multiple-choice questions about Python.",
+            f"2. You have {self.config['time_limit']} seconds to answer each question.",
+            "3. Each correct answer earns you points based on difficulty:",
+            "   - Easy: 1 point",
+            "   - Medium: 2 points",
+            "   - Hard: 3 points",
+            "4. There's no penalty for wrong answers.",
+            "5. Try to get the highest score possible!",
+            "6. Have fun while learning about Python!"
+        ])
+        
+        self.renderer.prompt("\nPress Enter to continue...")
     
     def _get_fun_fact(self):
         """Return a random fun fact about Python"""
@@ -344,98 +601,177 @@ class QuizGame:
         # Reset score
         self.score = 0
         
+        self._session_number = None
+        resumed = self._resume_session()
+        if resumed is not None:
+            # The round carries on at its own difficulty, so it is scored and ranked there
+            self.session = resumed
+            self.score = resumed.score
+            self.config["current_difficulty"] = resumed.difficulty
+        
         # Filter questions by current difficulty
         current_diff = self.config["current_difficulty"]
         
-        # Get all questions for current difficulty and below
-        available_difficulties = []
-        if current_diff == "easy":
-            available_difficulties = ["easy"]
-        elif current_diff == "medium":
-            available_difficulties = ["easy", "medium"]
-        else:  # hard
-            available_difficulties = ["easy", "medium", "hard"]
+        # Option shuffles come from a logged seed, so the round can be replayed exactly
+        seed = random.getrandbits(64)
+        if resumed is None and current_diff == ADAPTIVE:
+            # Each question is picked from the player's rating when the previous one is answered
+            self.session = AdaptiveSession(self.adaptive, self.player_name, self.config["questions_per_round"],
+                                           self.config["time_limit"], self.sampler.recent_ids(self.player_name),
+                                           random.Random(seed), clock=self.clock)
+        elif resumed is None:
+            # Draw a round from current difficulty and below straight from the index
+            with self.metrics.time("quiz_question_selection_seconds"):
+                selected_questions = self.sampler.sample(current_diff,
+                                                         self.config["questions_per_round"],
+                                                         self.config["question_weights"],
+                                                         player=self.player_name)
+            self.session = QuizSession(selected_questions, current_diff, self.config["time_limit"],
+                                       random.Random(seed), clock=self.clock)
+        if resumed is None and self.session_log is not None:
+            try:
+                self._session_number = self.session_log.start(self.player_name, current_diff, seed,
+                                                              self.config["time_limit"], self.session.questions)
+            except (OSError, ValueError):
+                self._session_number = None
+        self.metrics.increment("quiz_rounds_total", difficulty=current_diff)
+        self.total_questions = self.session.total_questions
+        
+        self.renderer.show([
+            "\n" + "=" * 50,
+            f"STARTING QUIZ - {current_diff.upper()} DIFFICULTY",
+            "=" * 50,
+            f"You'll have {self.total_questions} questions to answer.",
+            f"\nFun fact: {self._get_fun_fact()}"
+        ])
         
-        filtered_questions = [q for q in self.questions if q.difficulty in available_difficulties]
+        self.renderer.prompt("\nPress Enter when you're ready to start...")
         
-        # Shuffle questions
-        random.shuffle(filtered_questions)
+        self._play_questions()
         
-        # Select a subset of questions
-        self.total_questions = min(10, len(filtered_questions))
-        selected_questions = filtered_questions[:self.total_questions]
+        # Quiz finished
+        self._end_quiz()
+    
+    def start_review(self):
+        """Re-ask the player's missed questions that are due, most overdue first"""
+        if self.review is None:
+            self.renderer.add(["Review is turned off."])
+            self.renderer.prompt("\nPress Enter to continue...")
+            return
         
-        self._clear_screen()
-        print("\n" + "=" * 50)
-        print(f"STARTING QUIZ - {current_diff.upper()} DIFFICULTY")
-        print("=" * 50)
-        print(f"You'll have {self.total_questions} questions to answer.")
-        print(f"\nFun fact: {self._get_fun_fact()}")
+        questions = []
+        for key in self.review.pull_due(self.player_name, self.config["questions_per_round"]):
+            question = self.question_lookup(key)
+            if question is None:
+                # No longer in the question packs
+                self.review.forget(self.player_name, key)
+            else:
+                questions.append(question)
         
-        input("\nPress Enter when you're ready to start...")
+        if not questions:
+            next_due = self.review.next_due(self.player_name)
+            if next_due is None:
+                message = "You have no missed questions to review. Questions you get wrong will show up here."
+            else:
+                minutes = max(1, math.ceil((next_due - self.review.clock()) / 60))
+                message = f"Nothing is due for review yet. Your next review is in {minutes} minute(s)."
+            self.renderer.show(["\n" + "=" * 50, "REVIEW", "=" * 50, message])
+            self.renderer.prompt("\nPress Enter to continue...")
+            return
         
-        # Loop through questions
-        for i, question in enumerate(selected_questions, 1):
-            self.current_question = question
-            
-            self._clear_screen()
-            # Display the question
-            print(f"\nQuestion {i}/{self.total_questions}")
-            print("-" * 30)
-            print(question.text)
-            
-            # Display options
-            options = question.options.copy()
-            random.shuffle(options)
-            
-            for idx, option in enumerate(options, 1):
-                print(f"{idx}. {option}")
+        # Review rounds are practice, so they are not logged or saved to the high scores
+        self.score = 0
+        self._session_number = None
+        self.session = QuizSession(questions, REVIEW, self.config["time_limit"], random.Random(), clock=self.clock)
+        self.total_questions = self.session.total_questions
+        self.metrics.increment("quiz_rounds_total", difficulty=REVIEW)
+        self.renderer.show([
+            "\n" + "=" * 50,
+            "REVIEW - QUESTIONS YOU MISSED",
+            "=" * 50,
+            f"{self.total_questions} question(s) are due. Answer them right to see them less often."
+        ])
+        self.renderer.prompt("\nPress Enter when you're ready to start...")
+        
+        self._play_questions()
+        
+        result = self.session.finish()
+        self.save_review()
+        self.flush_analytics()
+        self.export_metrics()
+        self.renderer.show([
+            "\n" + "=" * 50,
+            "REVIEW COMPLETE",
+            "=" * 50,
+            f"You got {result.correct} of {result.total_questions} right.",
+            f"Questions left in your review deck: {len(self.review.deck(self.player_name))}"
+        ])
+        self.renderer.prompt("\nPress Enter to continue...")
+    
+    def _play_questions(self):
+        """Ask the session's questions until the round is over"""
+        # Loop through questions; the session keeps score and enforces the time limit
+        for prompt in iter(self.session.next_question, None):
+            self.current_question = prompt.question
             
-            # Start timer
-            start_time = time.time()
-            time_is_up = False
+            # Display the question and its options as one screen
+            lines = [
+                f"\nQuestion {prompt.number}/{prompt.total}",
+                "-" * 30,
+                prompt.question.text
+            ]
+            lines.extend(f"{idx}. {option}" for idx, option in enumerate(prompt.options, 1))
+            self.renderer.show(lines)
+            self._log_session(SessionLog.asked, prompt.question, prompt.options)
             
             # Get user answer with timeout
-            answer = None
+            option_count = len(prompt.options)
             while True:
-                # Check if time is up
-                if time.time() - start_time > self.config["time_limit"]:
-                    time_is_up = True
+                time_remaining = self.session.time_remaining()
+                if time_remaining <= 0:
+                    result = self.session.submit_answer(None)
                     break
                 
-                # Display time remaining every 5 seconds
-                time_elapsed = time.time() - start_time
-                time_remaining = max(0, self.config["time_limit"] - time_elapsed)
-                
-                user_input = input(f"\nYour answer (1-4) [{time_remaining:.0f}s remaining]: ")
+                user_input = self.renderer.prompt(f"\nYour answer (1-{option_count}) [{time_remaining:.0f}s remaining]: ").strip()
                 
-                if user_input.strip() and user_input in "1234":
-                    answer = options[int(user_input) - 1]
+                if user_input.isdigit() and 1 <= int(user_input) <= option_count:
+                    result = self.session.submit_answer(int(user_input) - 1)
                     break
                 else:
-                    print("Invalid input. Please enter a number between 1 and 4.")
+                    self.renderer.add([f"Invalid input. Please enter a number between 1 and {option_count}."])
+            
+            self.score = result.score
+            chosen = None if result.timed_out else prompt.options.index(result.chosen)
+            self._log_session(SessionLog.answered, chosen, result.elapsed, result.timed_out)
+            if self.metrics.enabled:
+                outcome = "timeout" if result.timed_out else "correct" if result.correct else "wrong"
+                self.metrics.observe("quiz_answer_seconds", result.elapsed,
+                                     difficulty=prompt.question.difficulty, outcome=outcome)
+            # Review answers come from players who already missed the question, so they would skew its stats
+            if self.analytics is not None and self.session.difficulty != REVIEW:
+                self.analytics.record(prompt.question, result.chosen, result.correct, result.timed_out,
+                                      result.elapsed)
+            if self.review is not None:
+                self.review.answered(self.player_name, prompt.question, result.correct,
+                                     reviewing=self.session.difficulty == REVIEW)
             
             # Handle timeout
-            if time_is_up:
-                print("\nTime's up! Moving to the next question.")
-                print(f"The correct answer was: {question.answer}")
-                input("\nPress Enter to continue...")
+            if result.timed_out:
+                self.renderer.add([
+                    "\nTime's up! Moving to the next question.",
+                    f"The correct answer was: {result.answer}"
+                ])
+                self.renderer.prompt("\nPress Enter to continue...")
                 continue
             
             # Check answer
-            if answer == question.answer:
-                # Award points based on difficulty
-                points = 1  # easy
-                if question.difficulty == "medium":
-                    points = 2
-                elif question.difficulty == "hard":
-                    points = 3
-                
-                self.score += points
-                print(f"\n🎉 Correct! You earned {points} point(s).")
-                print(f"Current score: {self.score}")
+            if result.correct:
+                feedback = [
+                    f"\n🎉 Correct! You earned {result.points} point(s).",
+                    f"Current score: {self.score}"
+                ]
             else:
-                print(f"\n❌ Wrong! The correct answer was: {question.answer}")
+                feedback = [f"\n❌ Wrong! The correct answer was: {result.answer}"]
             
             # Show a random encouragement after each question
             encouragements = [
@@ -446,108 +782,113 @@ class QuizGame:
                 "Knowledge is power!",
                 "Every question makes you stronger!"
             ]
-            print(f"\n{random.choice(encouragements)}")
+            feedback.append(f"\n{random.choice(encouragements)}")
+            self.renderer.add(feedback)
             
             # Pause before next question
-            input("\nPress Enter for the next question...")
-        
-        # Quiz finished
-        self._end_quiz()
+            self.renderer.prompt("\nPress Enter for the next question...")
     
     def _end_quiz(self):
         """End the quiz and show results"""
-        self._clear_screen()
-        print("\n" + "=" * 50)
-        print("🎮 QUIZ COMPLETED! 🎮")
-        print("=" * 50)
-        print(f"Your final score: {self.score} points")
-        
-        # Calculate max possible score
-        max_score = self.total_questions
-        if self.config["current_difficulty"] == "medium":
-            max_score = self.total_questions * 2
-        elif self.config["current_difficulty"] == "hard":
-            max_score = self.total_questions * 3
-        
-        percentage = (self.score / max_score) * 100
-        print(f"You got {percentage:.1f}% of the maximum possible score.")
+        result = self.session.finish()
+        self._log_session(SessionLog.finished, result.score, result.max_score)
+        self._session_number = None
+        
+        lines = [
+            "\n" + "=" * 50,
+            "🎮 QUIZ COMPLETED! 🎮",
+            "=" * 50,
+            f"Your final score: {result.score} points",
+            f"You got {result.percentage:.1f}% of the maximum possible score."
+        ]
         
         # Evaluate performance
-        if percentage >= 90:
-            print("\n🏆 Excellent! You're a Python master! 🏆")
-            print("Your Python knowledge is truly impressive!")
-        elif percentage >= 70:
-            print("\n🌟 Great job! You know your Python well. 🌟")
-            print("You've got solid Python knowledge!")
-        elif percentage >= 50:
-            print("\n👍 Good effort! Keep learning. 👍")
-            print("You're on your way to becoming a Python expert!")
-        else:
-            print("\n📚 Keep practicing your Python knowledge. 📚")
-            print("Every master was once a beginner!")
-        
-        # Track quiz attempts
-        player_attempts = next((entry for entry in self.high_scores 
-                                if entry['name'] == self.player_name), None)
-        
-        if player_attempts:
-            # Increment attempts for existing player
-            player_attempts['attempts'] = player_attempts.get('attempts', 1) + 1
-            player_attempts['best_score'] = max(player_attempts.get('best_score', 0), self.score)
-            player_attempts['last_score'] = self.score
-            
-            # Update existing entry
-            for i, entry in enumerate(self.high_scores):
-                if entry['name'] == self.player_name:
-                    self.high_scores[i] = player_attempts
-                    break
+        if result.band == "excellent":
+            lines.append("\n🏆 Excellent! You're a Python master! 🏆")
+            lines.append("Your Python knowledge is truly impressive!")
+        elif result.band == "great":
+            lines.append("\n🌟 Great job! You know your Python well. 🌟")
+            lines.append("You've got solid Python knowledge!")
+        elif result.band == "good":
+            lines.append("\n👍 Good effort! Keep learning. 👍")
+            lines.append("You're on your way to becoming a Python expert!")
         else:
-            # Add new player entry with attempts
-            self.high_scores.append({
-                "name": self.player_name,
-                "score": self.score,
-                "best_score": self.score,
-                "last_score": self.score,
-                "attempts": 1,
-                "difficulty": self.config["current_difficulty"],
-                "date": time.strftime("%Y-%m-%d")
-            })
-        
-        # Save high scores
+            lines.append("\n📚 Keep practicing your Python knowledge. 📚")
+            lines.append("Every master was once a beginner!")
+        
+        if isinstance(self.session, AdaptiveSession):
+            lines.append(f"Your rating: {self.adaptive.player_rating(self.player_name):.0f}")
+            self.sampler.remember(self.player_name, self.session.ids)
+            try:
+                self.adaptive.round_finished()
+            except OSError:
+                pass
+        
+        # Track quiz attempts in the score store
         try:
-            with open("high_scores.json", "w") as f:
-                json.dump(self.high_scores, f)
-            print("\nYour score has been saved to the high scores!")
-        except:
-            print("\nCould not save high score.")
+            with self.metrics.time("quiz_score_persist_seconds"):
+                self.high_scores.record(self.player_name, self.score, self.config["current_difficulty"])
+            lines.append("\nYour score has been saved to the high scores!")
+            lines.extend(self._standing_lines())
+        except (OSError, sqlite3.Error):
+            lines.append("\nCould not save high score.")
+        self.save_review()
+        self.flush_analytics()
+        self.export_metrics()
         
         # Ask if they want to play again
-        print("\nWould you like to play again?")
-        print("1. Yes, let's play another round!")
-        print("2. No, return to main menu")
+        lines.extend([
+            "\nWould you like to play again?",
+            "1. Yes, let's play another round!",
+            "2. No, return to main menu"
+        ])
+        self.renderer.show(lines)
         
         while True:
-            choice = input("\nEnter your choice (1-2): ")
+            choice = self.renderer.prompt("\nEnter your choice (1-2): ")
             if choice == "1":
                 self.start_quiz()
                 break
             elif choice == "2":
                 break
             else:
-                print("Invalid choice. Please try again.")
+                self.renderer.add(["Invalid choice. Please try again."])
         
         # If they chose not to play again, we return to the main menu
 
+    def _standing_lines(self) -> List[str]:
+        """Describe the player's rank and percentile overall and at the current difficulty"""
+        difficulty = self.config["current_difficulty"]
+        lines = []
+        for label, standing in [("all players", self.high_scores.standing(self.player_name)),
+                                (f"{difficulty} players", self.high_scores.standing(self.player_name, difficulty))]:
+            if standing:
+                lines.append(f"Your best score ranks {standing.rank} of {standing.players} among {label} "
+                             f"(percentile {standing.percentile:.0f})")
+        return lines
+
 class NewPlayer:
     """Class to handle new player creation"""
     @staticmethod
-    def create_new_player():
+    def create_new_player(question_packs: Optional[List[str]] = None,
+                          scores_path: str = "high_scores.json", metrics_path: Optional[str] = None):
         """Create a new player and start the game"""
-        game = QuizGame()
-        game.welcome()
+        game = QuizGame(question_packs, open_score_store(scores_path), metrics=Metrics(enabled=bool(metrics_path)))
+        game.config["metrics_path"] = metrics_path
+        try:
+            game.welcome()
+        finally:
+            game.close()
 
 # Run the game when script is executed
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Python Mastery Quiz")
+    parser.add_argument("question_packs", nargs="*", help="extra question packs (.json, .jsonl, .csv, .db)")
+    parser.add_argument("--scores", default="high_scores.json",
+                        help="high score file; use a .db file to share scores between processes")
+    parser.add_argument("--metrics", help="write metrics to this file (.json snapshot, else Prometheus text)")
+    args = parser.parse_args()
+
     # Create a new player instance
     new_player = NewPlayer()
-    new_player.create_new_player()
\ No newline at end of file
+    new_player.create_new_player(args.question_packs, args.scores, args.metrics)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Batch grading of offline answer sheets with NumPy
+
+Sheets are graded against the same questions and scoring rules as the
+terminal quiz: per-difficulty points from session.POINTS and the bands from
+session.PERFORMANCE_BANDS. NumPy is only needed for this module:
+
+    pip install numpy
+    python grading.py sheets.csv --pack exam.json > results.csv
+
+sheets.csv has one row per player: an id, then the option number (1-based, in
+the order the options appear in the pack) picked for each question; 0 or an
+empty cell means unanswered.
+"""
+import argparse
+import csv
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from importer import validate_record
+from question_bank import DIFFICULTY_LEVELS, Question, read_pack
+from session import PERFORMANCE_BANDS, POINTS
+
+UNANSWERED = -1
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Batch grading needs NumPy; install it with 'pip install numpy'")
+
+
+class AnswerKey(NamedTuple):
+    answers: "np.ndarray"  # correct option index per question
+    points: "np.ndarray"  # points per question
+    max_score: int
+
+
+class GradingResult(NamedTuple):
+    scores: "np.ndarray"
+    correct: "np.ndarray"
+    percentages: "np.ndarray"
+    bands: "np.ndarray"
+    max_score: int
+
+
+def answer_key(questions: Sequence[Question], points: Optional[Dict[str, int]] = None) -> AnswerKey:
+    """Build the answer-key and point-weight arrays for a fixed list of questions"""
+    _require_numpy()
+    points = points or POINTS
+    key = np.fromiter((q.options.index(q.answer) for q in questions), dtype=np.int16, count=len(questions))
+    weights = np.fromiter((points.get(q.difficulty, 1) for q in questions), dtype=np.int32, count=len(questions))
+    return AnswerKey(key, weights, int(weights.sum()))
+
+
+def grade(answers, key: AnswerKey) -> GradingResult:
+    """Grade a players x questions matrix of 0-based option indices (UNANSWERED for blanks)"""
+    _require_numpy()
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != len(key.answers):
+        raise ValueError(f"Expected a players x {len(key.answers)} answer matrix, got shape {answers.shape}")
+
+    # One comparison and one matrix-vector product grade the whole batch
+    hits = answers == key.answers
+    scores = hits.astype(np.int32) @ key.points
+    correct = hits.sum(axis=1)
+    if key.max_score:
+        percentages = scores * (100.0 / key.max_score)
+    else:
+        percentages = np.zeros(len(scores))
+
+    # PERFORMANCE_BANDS runs best to worst, searchsorted needs ascending thresholds
+    thresholds = np.array([minimum for minimum, _ in reversed(PERFORMANCE_BANDS)], dtype=float)
+    names = np.array([band for _, band in reversed(PERFORMANCE_BANDS)])
+    band_index = np.maximum(np.searchsorted(thresholds, percentages, side="right") - 1, 0)
+    return GradingResult(scores, correct, percentages, names[band_index], key.max_score)
+
+
+def read_sheets(path: str, question_count: int):
+    """Read a sheets CSV into (player ids, 0-based answer matrix)"""
+    _require_numpy()
+    players: List[str] = []
+    rows: List[List[int]] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            players.append(row[0])
+            picks = [int(cell) - 1 if cell.strip() not in ("", "0") else UNANSWERED
+                     for cell in row[1:question_count + 1]]
+            picks.extend([UNANSWERED] * (question_count - len(picks)))
+            rows.append(picks)
+    return players, np.array(rows, dtype=np.int16).reshape(len(rows), question_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade offline answer sheets")
+    parser.add_argument("sheets", help="CSV of player id followed by 1-based option numbers")
+    parser.add_argument("--pack", required=True, help="question pack giving the exam questions in order")
+    args = parser.parse_args()
+
+    # Every question is part of the exam, so any bad record stops grading
+    questions = []
+    for number, record in enumerate(read_pack(args.pack), 1):
+        fields, problems = validate_record(record, DIFFICULTY_LEVELS)
+        if problems:
+            parser.error(f"{args.pack} question {number}: {'; '.join(problems)}")
+        questions.append(Question(*fields))
+    key = answer_key(questions)
+    players, answers = read_sheets(args.sheets, len(questions))
+    result = grade(answers, key)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["player", "score", "max_score", "correct", "percentage", "band"])
+    for player, score, correct, percentage, band in zip(players, result.scores, result.correct,
+                                                         result.percentages, result.bands):
+        writer.writerow([player, int(score), result.max_score, int(correct), f"{percentage:.1f}", band])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Bulk import of large question packs with parallel validation
+
+Packs are read as a stream and cut into chunks. Worker processes parse and
+validate each chunk, and the valid questions are added to the bank in pack
+order. Bad records are collected into a report instead of stopping the import.
+Run from the repository root:
+
+    python importer.py community.jsonl --output checked.jsonl
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from question_bank import DIFFICULTY_LEVELS, Question, QuestionBank, csv_record, read_pack
+from similarity import NearDuplicateIndex
+
+# Answers are stored as a one-byte option index
+MAX_OPTIONS = 255
+
+QuestionRow = Tuple[str, str, List[str], str, Tuple[str, ...]]
+
+
+class RecordError(NamedTuple):
+    number: int  # line number for JSONL and CSV, record number otherwise
+    message: str
+
+
+class ImportReport:
+    """Outcome of one pack import"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self.imported = 0
+        self.errors: List[RecordError] = []
+        self.seconds = 0.0
+
+    @property
+    def questions_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.path}: {self.imported} of {self.records} questions imported, "
+                f"{len(self.errors)} rejected, {self.seconds:.2f}s ({self.questions_per_second:,.0f} questions/s)")
+
+
+def validate_record(record, levels: List[str], min_options: int = 2) -> Tuple[Optional[QuestionRow], List[str]]:
+    """Check one pack record, returning (question fields, []) or (None, problems)"""
+    if not isinstance(record, dict):
+        return None, ["record is not an object"]
+    problems = []
+    text = record.get("text")
+    answer = record.get("answer")
+    options = record.get("options")
+    difficulty = record.get("difficulty")
+
+    if not isinstance(text, str) or not text.strip():
+        problems.append("missing question text")
+    if not isinstance(options, list) or not all(isinstance(option, str) for option in options):
+        problems.append("options must be a list of strings")
+        options = None
+    elif not min_options <= len(options) <= MAX_OPTIONS:
+        problems.append(f"has {len(options)} options, expected {min_options} to {MAX_OPTIONS}")
+    if options is not None and len(set(options)) != len(options):
+        duplicates = sorted({option for option in options if options.count(option) > 1})
+        problems.append(f"duplicate options: {', '.join(duplicates)}")
+    if not isinstance(answer, str) or not answer:
+        problems.append("missing answer")
+    elif options is not None and answer not in options:
+        problems.append(f"answer '{answer}' not found in options")
+    if difficulty not in levels:
+        problems.append(f"unknown difficulty '{difficulty}'")
+    tags = record.get("tags") or ()
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    elif not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags):
+        problems.append("tags must be a string or a list of strings")
+    if problems:
+        return None, problems
+    return (text, answer, options, difficulty, tuple(tags)), []
+
+
+def _parse(kind: str, item, header: Optional[List[str]]):
+    if kind == "jsonl":
+        return json.loads(item)
+    if kind == "csv":
+        return csv_record(header, item)
+    return item
+
+
+def validate_chunk(kind: str, numbered_items: List[Tuple[int, object]], levels: List[str],
+                   header: Optional[List[str]] = None) -> Tuple[List[QuestionRow], List[RecordError]]:
+    """Parse and validate a chunk of (number, raw item); runs in the worker processes"""
+    valid = []
+    errors = []
+    for number, item in numbered_items:
+        try:
+            record = _parse(kind, item, header)
+        except ValueError as e:
+            errors.append(RecordError(number, f"unreadable record: {e}"))
+            continue
+        question, problems = validate_record(record, levels)
+        if question is None:
+            errors.append(RecordError(number, "; ".join(problems)))
+        else:
+            valid.append(question)
+    return valid, errors
+
+
+def _numbered_items(path: str) -> Tuple[str, Optional[List[str]], Iterator[Tuple[int, object]]]:
+    """Return (kind, csv header, iterator of (number, raw item)) for a pack"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".jsonl":
+        # Lines are shipped unparsed so json.loads runs in the workers
+        def lines():
+            with open(path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if line.strip():
+                        yield number, line
+        return "jsonl", None, lines()
+    if extension == ".csv":
+        f = open(path, "r", encoding="utf-8", newline="")
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+
+        def rows():
+            with f:
+                for row in reader:
+                    if any(cell.strip() for cell in row):
+                        yield reader.line_num, row
+        return "csv", header, rows()
+    return "records", None, enumerate(read_pack(path), 1)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_pack(bank: QuestionBank, path: str, workers: Optional[int] = None,
+                chunk_size: int = 2000) -> ImportReport:
+    """Validate a pack in parallel and add its valid questions to the bank"""
+    report = ImportReport(path)
+    start = time.perf_counter()
+    kind, header, items = _numbered_items(path)
+    levels = list(bank.difficulty_levels)
+    workers = workers or os.cpu_count() or 1
+
+    def apply(result: Tuple[List[QuestionRow], List[RecordError]]):
+        valid, errors = result
+        bank.extend(Question(*fields) for fields in valid)
+        report.imported += len(valid)
+        report.records += len(valid) + len(errors)
+        report.errors.extend(errors)
+
+    if workers == 1:
+        for chunk in _chunks(items, chunk_size):
+            apply(validate_chunk(kind, chunk, levels, header))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            # A few chunks in flight per worker keeps them busy without reading the whole pack
+            pending = deque()
+            for chunk in _chunks(items, chunk_size):
+                pending.append(pool.submit(validate_chunk, kind, chunk, levels, header))
+                if len(pending) >= workers * 2:
+                    apply(pending.popleft().result())
+            while pending:
+                apply(pending.popleft().result())
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and import question packs")
+    parser.add_argument("packs", nargs="+", help="question packs (.jsonl, .csv, .json, .db)")
+    parser.add_argument("--workers", type=int, default=None, help="validation processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--output", help="write the valid questions to this .jsonl pack")
+    parser.add_argument("--show-errors", type=int, default=20, help="rejected records to list per pack")
+    parser.add_argument("--near-duplicates", action="store_true", help="list near-duplicate questions after importing")
+    args = parser.parse_args()
+
+    bank = QuestionBank(DIFFICULTY_LEVELS, compact=True)
+    for path in args.packs:
+        report = import_pack(bank, path, args.workers, args.chunk_size)
+        print(report.summary())
+        for error in report.errors[:args.show_errors]:
+            print(f"  {path}:{error.number}: {error.message}")
+        if len(report.errors) > args.show_errors:
+            print(f"  ... and {len(report.errors) - args.show_errors} more")
+
+    if args.near_duplicates:
+        pairs = list(NearDuplicateIndex.build(bank).near_duplicates().pairs())
+        for a, b in pairs[:args.show_errors]:
+            print(f"  near-duplicates: {bank.text_of(a)!r} ~ {bank.text_of(b)!r}")
+        if len(pairs) > args.show_errors:
+            print(f"  ... and {len(pairs) - args.show_errors} more")
+        print(f"{len(pairs)} near-duplicate pairs among {len(bank)} questions")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for question in bank:
+                f.write(json.dumps(question.to_dict()) + "\n")
+        print(f"Wrote {len(bank)} questions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
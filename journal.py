@@ -0,0 +1,139 @@
+import json
+import os
+import time
+from typing import List, Optional
+
+from leaderboard import Leaderboard
+
+
+class JournalError(Exception):
+    """Raised when the high score snapshot cannot be read
+
+    `leaderboard` holds what could still be recovered from the journal.
+    """
+
+    def __init__(self, message: str, leaderboard: Optional[Leaderboard] = None):
+        super().__init__(message)
+        self.leaderboard = leaderboard
+
+
+class ScoreJournal:
+    """Snapshot file plus an append-only journal of finished quizzes
+
+    The snapshot is rewritten atomically only every `compact_every` records;
+    each finished quiz appends one line `[seq, name, score, difficulty, date]`
+    to the journal. Loading reads the snapshot and replays journal records
+    newer than the snapshot's sequence number, so a crash between writing the
+    snapshot and truncating the journal never applies a record twice.
+    """
+
+    def __init__(self, snapshot_path: str = "high_scores.json", journal_path: Optional[str] = None,
+                 compact_every: int = 100, fsync: bool = True):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.seq = 0
+        self.pending = 0
+
+    def load(self) -> Leaderboard:
+        """Read the snapshot and replay the journal tail into a leaderboard"""
+        try:
+            entries = self._read_snapshot()
+        except JournalError as e:
+            # The snapshot's sequence number is lost, so replay the whole journal; it may be
+            # the only surviving copy of recent results, and the next compaction would erase it
+            self.seq = 0
+            e.leaderboard = Leaderboard()
+            self.pending = self._replay(e.leaderboard)
+            raise
+        leaderboard = Leaderboard(entries)
+        self.pending = self._replay(leaderboard)
+        return leaderboard
+
+    def _read_snapshot(self) -> List[dict]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self.seq = 0
+            return []
+        except (OSError, ValueError) as e:
+            # Keep the unreadable file for inspection instead of overwriting it later
+            corrupt_path = self.snapshot_path + ".corrupt"
+            try:
+                os.replace(self.snapshot_path, corrupt_path)
+            except OSError:
+                corrupt_path = self.snapshot_path
+            raise JournalError(f"Could not read {self.snapshot_path} (kept as {corrupt_path}): {e}")
+
+        # Older files are a bare list of entries with no sequence number
+        if isinstance(data, list):
+            self.seq = 0
+            return data
+        self.seq = data.get("seq", 0)
+        return data.get("entries", [])
+
+    def _replay(self, leaderboard: Leaderboard) -> int:
+        """Apply journal records newer than the snapshot, returning how many were applied"""
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        good_offset = 0
+        with f:
+            for line in f:
+                try:
+                    seq, name, score, difficulty, date = json.loads(line)
+                except ValueError:
+                    # A torn write from a crash can only be the last line
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good_offset += len(line)
+                if seq <= self.seq:
+                    continue
+                leaderboard.record(name, score, difficulty, date)
+                self.seq = seq
+                applied += 1
+        if good_offset < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_offset)
+        return applied
+
+    def append(self, name: str, score: int, difficulty: str, date: str):
+        """Append one finished quiz to the journal"""
+        self.seq += 1
+        line = json.dumps([self.seq, name, score, difficulty, date], separators=(",", ":")) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.pending += 1
+
+    def record(self, leaderboard: Leaderboard, name: str, score: int, difficulty: str,
+               date: Optional[str] = None) -> dict:
+        """Update the leaderboard, journal the attempt and compact when due"""
+        date = date or time.strftime("%Y-%m-%d")
+        entry = leaderboard.record(name, score, difficulty, date)
+        self.append(name, score, difficulty, date)
+        if self.pending >= self.compact_every:
+            self.compact(leaderboard)
+        return entry
+
+    def compact(self, leaderboard: Leaderboard):
+        """Atomically write a new snapshot and empty the journal"""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # json.dumps uses the C encoder; json.dump to a file falls back to pure Python
+            f.write(json.dumps({"seq": self.seq, "entries": leaderboard.to_list()}))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Records up to self.seq are now in the snapshot, so replay would skip them anyway
+        with open(self.journal_path, "w"):
+            pass
+        self.pending = 0
@@ -0,0 +1,143 @@
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from fenwick import ScoreDistribution
+from skiplist import IndexableSkipList
+
+
+class Standing(NamedTuple):
+    rank: int  # 1-based, players with equal scores share a rank
+    players: int
+    percentile: float  # percentage of players scoring at or below this player
+
+
+class Leaderboard:
+    """High score entries keyed by player name with an ordered index on best_score"""
+
+    def __init__(self, entries: Optional[Iterable[dict]] = None):
+        self._entries: Dict[str, dict] = {}
+        # Keys sort best score first, then by name so equal scores stay stable
+        self._ranking = IndexableSkipList()
+        # Best scores overall and per difficulty, for rank and percentile queries
+        self._scores = ScoreDistribution()
+        self._level_scores: Dict[str, ScoreDistribution] = {}
+        for entry in entries or []:
+            self.put(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._entries.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    @staticmethod
+    def _key(entry: dict):
+        return (-entry.get("best_score", 0), entry["name"])
+
+    @staticmethod
+    def _level_bests(entry: dict) -> Dict[str, int]:
+        # Entries written before per-difficulty bests were kept count at their first difficulty
+        return entry.get("best_by_difficulty") or {entry.get("difficulty", ""): entry.get("best_score", 0)}
+
+    def _index_scores(self, entry: dict, amount: int):
+        """Add (amount 1) or remove (amount -1) an entry's scores from the distributions"""
+        update = ScoreDistribution.add if amount > 0 else ScoreDistribution.remove
+        update(self._scores, entry.get("best_score", 0))
+        for level, best in self._level_bests(entry).items():
+            distribution = self._level_scores.get(level)
+            if distribution is None:
+                distribution = self._level_scores[level] = ScoreDistribution()
+            update(distribution, best)
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return a player's entry, or None if they have not played"""
+        return self._entries.get(name)
+
+    def put(self, entry: dict):
+        """Insert or replace a player's entry as-is"""
+        previous = self._entries.get(entry["name"])
+        if previous is not None:
+            self._ranking.remove(self._key(previous))
+            self._index_scores(previous, -1)
+        self._entries[entry["name"]] = entry
+        self._ranking.insert(self._key(entry), entry)
+        self._index_scores(entry, 1)
+
+    def best_score(self, name: str) -> int:
+        """Return a player's best score, or 0 if they have not played"""
+        entry = self._entries.get(name)
+        return entry.get("best_score", 0) if entry else 0
+
+    @classmethod
+    def apply(cls, entry: Optional[dict], name: str, score: int, difficulty: str,
+              date: Optional[str] = None) -> dict:
+        """Fold a finished quiz into a player's entry (None for a new player), without any indexing"""
+        if entry:
+            # Increment attempts for existing player
+            levels = entry["best_by_difficulty"] = dict(cls._level_bests(entry))
+            levels[difficulty] = max(levels.get(difficulty, 0), score)
+            entry["attempts"] = entry.get("attempts", 1) + 1
+            entry["best_score"] = max(entry.get("best_score", 0), score)
+            entry["last_score"] = score
+            return entry
+        # Add new player entry with attempts
+        return {
+            "name": name,
+            "score": score,
+            "best_score": score,
+            "last_score": score,
+            "attempts": 1,
+            "difficulty": difficulty,
+            "date": date or time.strftime("%Y-%m-%d"),
+            "best_by_difficulty": {difficulty: score}
+        }
+
+    def record(self, name: str, score: int, difficulty: str, date: Optional[str] = None) -> dict:
+        """Record a finished quiz for a player and return their updated entry"""
+        entry = self._entries.get(name)
+        if entry:
+            self._ranking.remove(self._key(entry))
+            self._index_scores(entry, -1)
+        entry = self._entries[name] = self.apply(entry, name, score, difficulty, date)
+        self._ranking.insert(self._key(entry), entry)
+        self._index_scores(entry, 1)
+        return entry
+
+    def top(self, count: int, start: int = 0) -> Iterator[dict]:
+        """Iterate the entries ranked start+1 .. start+count by best score"""
+        for _, entry in self._ranking.items(start, start + count):
+            yield entry
+
+    def rank(self, name: str) -> Optional[int]:
+        """Return a player's 1-based rank, or None if they have not played"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        return self._ranking.rank(self._key(entry)) + 1
+
+    def standing(self, name: str, difficulty: Optional[str] = None) -> Optional[Standing]:
+        """Rank and percentile of a player's best score, overall or among players of one difficulty"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if difficulty is None:
+            distribution, score = self._scores, entry.get("best_score", 0)
+        else:
+            score = self._level_bests(entry).get(difficulty)
+            if score is None:
+                return None
+            distribution = self._level_scores[difficulty]
+        return Standing(distribution.rank(score), len(distribution), distribution.percentile(score))
+
+    def distribution(self, difficulty: Optional[str] = None) -> Optional[ScoreDistribution]:
+        """Best scores overall or for one difficulty, e.g. for distribution.histogram()"""
+        if difficulty is None:
+            return self._scores
+        return self._level_scores.get(difficulty)
+
+    def to_list(self) -> List[dict]:
+        """Return the entries in the high_scores.json layout"""
+        return list(self._entries.values())
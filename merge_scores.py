@@ -0,0 +1,177 @@
+"""Merge the high scores of many machines into one global leaderboard
+
+Each shard (a high_scores.json snapshot plus its .journal tail) is read on its
+own, sorted by player name and spilled to a temporary run file. The runs are
+then k-way merged by name with a heap, so a player's entries from every shard
+arrive together and are combined, and the top K are kept in a bounded heap.
+Memory stays at one shard plus K entries, however many shards there are.
+Run from the repository root:
+
+    python merge_scores.py kiosk*/high_scores.json --top 20 --output global_scores.json
+"""
+import argparse
+import heapq
+import json
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from leaderboard import Leaderboard
+
+_name = itemgetter("name")
+
+
+def shard_entries(path: str) -> List[dict]:
+    """Read a shard's entries without modifying it: its snapshot plus any complete journal records"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = []
+    # Older files are a bare list of entries with no sequence number
+    if isinstance(data, list):
+        seq, entries = 0, data
+    else:
+        seq, entries = data.get("seq", 0), data.get("entries", [])
+    try:
+        f = open(path + ".journal", "rb")
+    except FileNotFoundError:
+        return entries
+
+    # Replay the journal the way the game does on start, without truncating a torn tail
+    players = None
+    with f:
+        for line in f:
+            try:
+                record_seq, name, score, difficulty, date = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            if record_seq <= seq:
+                continue
+            if players is None:
+                players = {entry["name"]: entry for entry in entries}
+            players[name] = Leaderboard.apply(players.get(name), name, score, difficulty, date)
+    return list(players.values()) if players is not None else entries
+
+
+def merge_player(entries: List[dict]) -> dict:
+    """Combine one player's entries from several shards
+
+    Attempts add up and best scores take the maximum, overall and per
+    difficulty. The first-played fields (score, difficulty, date) come from the
+    earliest entry. Entries carry no time of the last round, so last_score is
+    taken from the last shard.
+    """
+    if len(entries) == 1:
+        return entries[0]
+    first = min(entries, key=lambda entry: entry.get("date", ""))
+    levels: Dict[str, int] = {}
+    for entry in entries:
+        for level, best in Leaderboard._level_bests(entry).items():
+            levels[level] = max(levels.get(level, 0), best)
+    return {
+        "name": first["name"],
+        "score": first.get("score", 0),
+        "best_score": max(entry.get("best_score", 0) for entry in entries),
+        "last_score": entries[-1].get("last_score", 0),
+        "attempts": sum(entry.get("attempts", 1) for entry in entries),
+        "difficulty": first.get("difficulty", ""),
+        "date": first.get("date", ""),
+        "best_by_difficulty": levels
+    }
+
+
+def _write_run(entries: Iterable[dict], directory: str) -> str:
+    f = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".run", delete=False)
+    with f:
+        for entry in entries:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    return f.name
+
+
+def _read_run(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _merge_runs(paths: List[str]) -> Iterator[dict]:
+    """Entries of several name-sorted runs in name order; equal names keep run order"""
+    return heapq.merge(*(_read_run(path) for path in paths), key=_name)
+
+
+def merged_players(shards: Iterable[str], workdir: Optional[str] = None, fan_in: int = 128) -> Iterator[dict]:
+    """Yield one combined entry per player across all shards, in name order
+
+    At most fan_in run files are open at once; beyond that, runs are merged
+    into longer runs first.
+    """
+    with tempfile.TemporaryDirectory(dir=workdir) as directory:
+        runs = []
+        for path in shards:
+            # Names are unique within a shard, so this is the only sort a shard needs
+            runs.append(_write_run(sorted(shard_entries(path), key=_name), directory))
+        while len(runs) > fan_in:
+            group, runs = runs[:fan_in], runs[fan_in:]
+            runs.append(_write_run(_merge_runs(group), directory))
+            for path in group:
+                os.remove(path)
+        for _, entries in groupby(_merge_runs(runs), key=_name):
+            yield merge_player(list(entries))
+
+
+def top_players(players: Iterable[dict], count: int) -> List[dict]:
+    """The count best players of a stream, ranked like the game's leaderboard, keeping only count in memory"""
+    return heapq.nsmallest(count, players, key=Leaderboard._key)
+
+
+def write_scores(players: Iterable[dict], path: str) -> int:
+    """Stream players into a high_scores.json snapshot, atomically; returns the number written"""
+    tmp_path = path + ".tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write('{"seq": 0, "entries": [')
+        for entry in players:
+            f.write((", " if written else "") + json.dumps(entry))
+            written += 1
+        f.write("]}")
+    os.replace(tmp_path, path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge high score files from many machines")
+    parser.add_argument("shards", nargs="+", help="high_scores.json files (their .journal files are read too)")
+    parser.add_argument("--top", type=int, default=20, help="players to list")
+    parser.add_argument("--output", help="also write the merged leaderboard to this high_scores.json")
+    args = parser.parse_args()
+
+    players = merged_players(args.shards)
+    if args.output:
+        # Merge once, writing every player while keeping the top ones
+        top: List[dict] = []
+
+        def keep_top(stream: Iterable[dict]) -> Iterator[dict]:
+            for entry in stream:
+                top.append(entry)
+                if len(top) > 2 * args.top:
+                    top[:] = top_players(top, args.top)
+                yield entry
+
+        total = write_scores(keep_top(players), args.output)
+        top = top_players(top, args.top)
+        print(f"Wrote {total} players to {args.output}")
+    else:
+        top = top_players(players, args.top)
+
+    print(f"{'RANK':4} | {'NAME':20} | {'BEST':>5} | {'ATTEMPTS':>8}")
+    for rank, entry in enumerate(top, 1):
+        print(f"{rank:4} | {entry['name'][:20]:20} | {entry.get('best_score', 0):5} | {entry.get('attempts', 1):8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# Upper bounds in seconds, covering fast in-process steps up to the answer time limit
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+
+Hook = Callable[[str, float, Dict[str, str]], None]
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NullTimer:
+    """Shared do-nothing context manager handed out while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, str]):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """Counters and latency histograms for the quiz lifecycle
+
+    While disabled every call returns immediately (timers are a shared no-op
+    context manager), so instrumentation can stay in production code paths.
+    Hooks registered with add_hook see every observation as it happens.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._hooks: List[Hook] = []
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def add_hook(self, hook: Hook):
+        """Call hook(name, value, labels) for every observation and increment"""
+        self._hooks.append(hook)
+
+    def time(self, name: str, **labels: str):
+        """Context manager that observes how long its block took, in seconds"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Add a value to a histogram"""
+        if not self.enabled:
+            return
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram(self.buckets)
+        histogram.observe(value)
+        for hook in self._hooks:
+            hook(name, value, labels)
+
+    def increment(self, name: str, amount: float = 1, **labels: str):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+        for hook in self._hooks:
+            hook(name, amount, labels)
+
+    def snapshot(self) -> dict:
+        """Return every counter and histogram as plain data"""
+        return {
+            "timestamp": time.time(),
+            "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                         for name, series in self._counters.items()},
+            "histograms": {name: [{"labels": dict(key), "count": h.count, "sum": h.sum,
+                                   "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"],
+                                                       _cumulative(h.counts)))}
+                                  for key, h in series.items()]
+                           for name, series in self._histograms.items()}
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(key)} {value}")
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in series.items():
+                bounds = [repr(float(b)) for b in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, _cumulative(histogram.counts)):
+                    lines.append(f"{name}_bucket{_labels(key + (('le', bound),))} {count}")
+                lines.append(f"{name}_sum{_labels(key)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """Atomically write a JSON snapshot (.json) or Prometheus text file (anything else)"""
+        if path.endswith(".json"):
+            content = json.dumps(self.snapshot(), indent=2)
+        else:
+            content = self.to_prometheus()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in key) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,299 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from compact_store import CompactQuestionStore, read_columns, write_columns
+
+DIFFICULTY_LEVELS = ["easy", "medium", "hard"]
+
+
+class Question:
+    __slots__ = ("text", "answer", "options", "difficulty", "tags")
+
+    def __init__(self, text: str, answer: str, options: List[str], difficulty: str,
+                 tags: Optional[Iterable[str]] = None):
+        self.text = text
+        self.answer = answer
+        self.options = options
+        self.difficulty = difficulty
+        self.tags = tuple(tags) if tags else ()
+
+        # Validate the answer is in options; a ValueError (unlike assert) survives python -O
+        if answer not in options:
+            raise ValueError(f"Answer '{answer}' not found in options!")
+
+    def to_dict(self) -> dict:
+        """Convert the question to a pack record"""
+        record = {
+            "text": self.text,
+            "answer": self.answer,
+            "options": list(self.options),
+            "difficulty": self.difficulty
+        }
+        if self.tags:
+            record["tags"] = list(self.tags)
+        return record
+
+
+class QuestionView(Sequence):
+    """Read-only view over one or more index lists, without copying them"""
+
+    def __init__(self, bank: "QuestionBank", segments: List[Sequence]):
+        self._bank = bank
+        self._segments = [segment for segment in segments if segment]
+        self._length = sum(len(segment) for segment in self._segments)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("question view index out of range")
+        # Only a handful of difficulty segments, so walking them is O(levels)
+        for segment in self._segments:
+            if index < len(segment):
+                return self._bank[segment[index]]
+            index -= len(segment)
+        raise IndexError("question view index out of range")
+
+
+class QuestionBank:
+    """Question storage with per-difficulty and per-tag indexes
+
+    With compact=True questions are kept as columnar rows (see
+    CompactQuestionStore) and a Question object is only built when a
+    question is actually read, e.g. the handful drawn for a round.
+    """
+
+    def __init__(self, difficulty_levels: Optional[List[str]] = None, compact: bool = False):
+        self.difficulty_levels = list(difficulty_levels or DIFFICULTY_LEVELS)
+        self.compact = compact
+        self._questions: List[Question] = []
+        self._rows = CompactQuestionStore() if compact else None
+        # Index lists are arrays of 4-byte ids rather than lists of int objects
+        self._by_difficulty: Dict[str, array] = {level: array("I") for level in self.difficulty_levels}
+        self._by_tag: Dict[Tuple[str, str], array] = {}
+        # True while the indexes are read-only views into a cache file
+        self._mapped = False
+
+    def __len__(self) -> int:
+        return len(self._rows) if self.compact else len(self._questions)
+
+    def __iter__(self) -> Iterator[Question]:
+        if not self.compact:
+            return iter(self._questions)
+        return (self[question_id] for question_id in range(len(self._rows)))
+
+    def __getitem__(self, question_id: int) -> Question:
+        if not self.compact:
+            return self._questions[question_id]
+        text, options, answer_index, level, tags = self._rows.row(question_id)
+        return Question(text, options[answer_index], options, self.difficulty_levels[level], tags)
+
+    def text_of(self, question_id: int) -> str:
+        """Return a question's text without building the question"""
+        if not self.compact:
+            return self._questions[question_id].text
+        return self._rows.strings[self._rows.text[question_id]]
+
+    def difficulty_of(self, question_id: int) -> str:
+        """Return a question's difficulty without building the question"""
+        if not self.compact:
+            return self._questions[question_id].difficulty
+        return self.difficulty_levels[self._rows.level[question_id]]
+
+    def tags_of(self, question_id: int) -> Tuple[str, ...]:
+        """Return a question's tags without building the question"""
+        if not self.compact:
+            return self._questions[question_id].tags
+        return self._rows.tags(question_id)
+
+    def nbytes(self) -> Optional[int]:
+        """Approximate bytes used by compact storage and indexes (None for object storage)"""
+        if not self.compact:
+            return None
+        indexes = list(self._by_difficulty.values()) + list(self._by_tag.values())
+        return self._rows.nbytes() + sum(ids.itemsize * len(ids) for ids in indexes)
+
+    def add(self, question: Question) -> int:
+        """Add a question to the bank and its indexes, returning its id"""
+        if question.difficulty not in self._by_difficulty:
+            raise ValueError(f"Unknown difficulty '{question.difficulty}'")
+        if self._mapped:
+            self._thaw_indexes()
+        if self.compact:
+            question_id = self._rows.append(question.text, question.options,
+                                            question.options.index(question.answer),
+                                            self.difficulty_levels.index(question.difficulty),
+                                            question.tags)
+        else:
+            question_id = len(self._questions)
+            self._questions.append(question)
+        self._by_difficulty[question.difficulty].append(question_id)
+        for tag in question.tags:
+            self._by_tag.setdefault((tag, question.difficulty), array("I")).append(question_id)
+        return question_id
+
+    def extend(self, questions: Iterable[Question]):
+        """Add several questions to the bank"""
+        for question in questions:
+            self.add(question)
+
+    def levels_at_or_below(self, difficulty: str) -> List[str]:
+        """Return the difficulty levels up to and including the given one"""
+        return self.difficulty_levels[:self.difficulty_levels.index(difficulty) + 1]
+
+    def segments_at_or_below(self, difficulty: str, tag: Optional[str] = None) -> List[Tuple[str, Sequence]]:
+        """Return (level, question ids) index lists at or below the given difficulty"""
+        levels = self.levels_at_or_below(difficulty)
+        if tag is None:
+            return [(level, self._by_difficulty[level]) for level in levels]
+        return [(level, self._by_tag.get((tag, level), array("I"))) for level in levels]
+
+    def at_or_below(self, difficulty: str, tag: Optional[str] = None) -> QuestionView:
+        """Return a view of the questions at or below the given difficulty"""
+        segments = self.segments_at_or_below(difficulty, tag)
+        return QuestionView(self, [ids for _, ids in segments])
+
+    def tags(self) -> List[str]:
+        """Return every tag known to the bank"""
+        return sorted({tag for tag, _ in self._by_tag})
+
+    def count(self, difficulty: str, tag: Optional[str] = None) -> int:
+        """Count the questions at exactly the given difficulty"""
+        if tag is None:
+            return len(self._by_difficulty[difficulty])
+        return len(self._by_tag.get((tag, difficulty), []))
+
+    def save_cache(self, path: str, key: bytes):
+        """Write the compact bank and its indexes to a binary cache file"""
+        if not self.compact:
+            raise ValueError("Only compact question banks can be cached")
+        columns = {f"row.{name}": column for name, column in self._rows.columns().items()}
+        tags = []
+        for number, ((tag, level), ids) in enumerate(self._by_tag.items()):
+            tags.append([tag, level])
+            columns[f"tag.{number}"] = ids
+        for level, ids in self._by_difficulty.items():
+            columns[f"difficulty.{level}"] = ids
+        write_columns(path, key, {"levels": self.difficulty_levels, "tags": tags},
+                      self._rows.strings.blob(), columns)
+
+    @classmethod
+    def load_cache(cls, path: str, key: bytes) -> Optional["QuestionBank"]:
+        """Memory-map a cache written by save_cache, or return None if it is missing or stale"""
+        cached = read_columns(path, key)
+        if cached is None:
+            return None
+        meta, blob, columns = cached
+        bank = cls(meta["levels"], compact=True)
+        bank._rows = CompactQuestionStore.from_columns(
+            blob, {name[4:]: column for name, column in columns.items() if name.startswith("row.")})
+        bank._by_difficulty = {level: columns[f"difficulty.{level}"] for level in bank.difficulty_levels}
+        bank._by_tag = {(tag, level): columns[f"tag.{number}"]
+                        for number, (tag, level) in enumerate(meta["tags"])}
+        bank._mapped = True
+        return bank
+
+    def _thaw_indexes(self):
+        """Swap mapped index views for growable arrays before adding questions"""
+        self._by_difficulty = {level: array("I", ids) for level, ids in self._by_difficulty.items()}
+        self._by_tag = {key: array("I", ids) for key, ids in self._by_tag.items()}
+        self._mapped = False
+
+
+def pack_cache_key(records: List[dict], pack_paths: List[str], difficulty_levels: List[str]) -> bytes:
+    """Cache key from the built-in questions and each pack's path, size and mtime"""
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(json.dumps([records, difficulty_levels], sort_keys=True).encode("utf-8"))
+    for path in pack_paths:
+        stat = os.stat(path)
+        digest.update(f"\0{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.digest()
+
+
+def read_pack(path: str) -> Iterator[dict]:
+    """Yield question records from a pack file, picking the format from the extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        return _read_json_pack(path)
+    if extension == ".jsonl":
+        return _read_jsonl_pack(path)
+    if extension == ".csv":
+        return _read_csv_pack(path)
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return _read_sqlite_pack(path)
+    raise ValueError(f"Unsupported question pack format: {path}")
+
+
+def _read_json_pack(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # Packs may be a bare list or {"questions": [...]}
+    if isinstance(data, dict):
+        data = data.get("questions", [])
+    yield from data
+
+
+def _read_jsonl_pack(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def csv_record(header: List[str], row: List[str]) -> dict:
+    """Turn a CSV pack row into a record
+
+    Options come from an `options` column separated by "|", or else from every
+    column whose name starts with "option", in column order.
+    """
+    values = dict(zip(header, row))
+    if "options" in values:
+        options = [option.strip() for option in values["options"].split("|") if option.strip()]
+    else:
+        options = [value.strip() for name, value in zip(header, row) if name.startswith("option") and value.strip()]
+    return {
+        "text": values.get("text", "").strip(),
+        "answer": values.get("answer", "").strip(),
+        "options": options,
+        "difficulty": values.get("difficulty", "").strip().lower(),
+        "tags": values.get("tags", "")
+    }
+
+
+def _read_csv_pack(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                yield csv_record(header, row)
+
+
+def _read_sqlite_pack(path: str) -> Iterator[dict]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(questions)")}
+        query = "SELECT text, answer, options, difficulty"
+        query += ", tags FROM questions" if "tags" in columns else " FROM questions"
+        for row in conn.execute(query):
+            record = dict(row)
+            record["options"] = json.loads(record["options"])
+            tags = record.get("tags")
+            if tags and tags.startswith("["):
+                record["tags"] = json.loads(tags)
+            yield record
+    finally:
+        conn.close()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import sys
+import unicodedata
+from typing import Callable, List, Optional, TextIO
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+
+
+def _rows(lines: List[str]) -> List[str]:
+    """Split lines that contain newlines into screen rows"""
+    return "\n".join(lines).split("\n")
+
+
+def _width(row: str) -> int:
+    """Terminal columns a row takes up; wide characters such as emoji take two"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in row)
+
+
+class Renderer:
+    """Writes whole screens in one buffered write; plain output for pipes and logs"""
+
+    def __init__(self, stream: Optional[TextIO] = None, input_func: Callable[[str], str] = input):
+        self.stream = stream or sys.stdout
+        self.input_func = input_func
+
+    def _write(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
+
+    def show(self, lines: List[str]):
+        """Replace the screen with these lines"""
+        self._write("\n".join(_rows(lines)) + "\n")
+
+    def add(self, lines: List[str]):
+        """Add lines below what is already on the screen"""
+        self._write("\n".join(_rows(lines)) + "\n")
+
+    def prompt(self, text: str) -> str:
+        """Show a prompt (which may start with blank lines) and read the player's reply"""
+        rows = text.split("\n")
+        if len(rows) > 1:
+            self.add(rows[:-1])
+        return self.input_func(rows[-1])
+
+
+class AnsiRenderer(Renderer):
+    """Clears with escape sequences and only rewrites the rows that changed"""
+
+    def __init__(self, stream: Optional[TextIO] = None, input_func: Callable[[str], str] = input):
+        super().__init__(stream, input_func)
+        # What is on each screen row; None marks rows we cannot trust (e.g. typed input)
+        self._frame: Optional[List[Optional[str]]] = None
+        if os.name == "nt":
+            # An empty command once at startup switches the Windows console to VT mode
+            os.system("")
+
+    def _height(self) -> int:
+        return shutil.get_terminal_size().lines
+
+    def _fits(self, rows: List[Optional[str]]) -> bool:
+        """Whether every row stays on one screen line; wrapped rows shift the ones below"""
+        columns = shutil.get_terminal_size().columns
+        return all(row is None or _width(row) < columns for row in rows)
+
+    def show(self, lines: List[str]):
+        rows = _rows(lines)
+        frame = self._frame
+        parts = []
+        fits = self._fits(rows)
+        if frame is None or not fits or len(rows) >= self._height():
+            # First screen, wrapped rows, or the screen scrolled: absolute rows are unknown, so redraw all
+            parts.append(CLEAR_SCREEN)
+            parts.append("\n".join(rows) + "\n")
+        else:
+            for row, line in enumerate(rows):
+                if row < len(frame) and frame[row] == line:
+                    continue
+                parts.append(f"\x1b[{row + 1};1H{line}{CLEAR_LINE}")
+            # Park the cursor below the screen and wipe anything left from the old one
+            parts.append(f"\x1b[{len(rows) + 1};1H{CLEAR_BELOW}")
+        self._write("".join(parts))
+        self._frame = rows if fits and len(rows) < self._height() else None
+
+    def add(self, lines: List[str]):
+        rows = _rows(lines)
+        self._write("\n".join(rows) + "\n")
+        self._extend(rows)
+
+    def prompt(self, text: str) -> str:
+        rows = text.split("\n")
+        if len(rows) > 1:
+            self.add(rows[:-1])
+        reply = self.input_func(rows[-1])
+        # The prompt row now also holds whatever the player typed
+        self._extend([None])
+        return reply
+
+    def _extend(self, rows: List[Optional[str]]):
+        if self._frame is not None:
+            self._frame.extend(rows)
+            if len(self._frame) >= self._height() or not self._fits(rows):
+                self._frame = None
+
+
+class NullRenderer(Renderer):
+    """Discards all output; replies still come from input_func (for headless runs and benchmarks)"""
+
+    def _write(self, text: str):
+        pass
+
+    def show(self, lines: List[str]):
+        pass
+
+    def add(self, lines: List[str]):
+        pass
+
+    def prompt(self, text: str) -> str:
+        return self.input_func(text)
+
+
+def make_renderer(stream: Optional[TextIO] = None, input_func: Callable[[str], str] = input) -> Renderer:
+    """Use ANSI redraws on a real terminal and plain buffered output otherwise"""
+    stream = stream or sys.stdout
+    if stream.isatty() and os.environ.get("TERM") != "dumb":
+        return AnsiRenderer(stream, input_func)
+    return Renderer(stream, input_func)
@@ -0,0 +1,171 @@
+"""Spaced-repetition review of missed questions, Leitner style
+
+A question a player misses goes into box 0 of their deck and is due at once.
+Answering it correctly in a review round moves it up a box, and each box
+waits longer before the question is due again; after the last box it is
+learned and leaves the deck. A miss sends it back to box 0. Each deck keeps
+a heap of (due time, question key), so building a review round pops the most
+overdue questions in O(log n) each without scanning the player's history.
+Decks are stored one small binary file per player and loaded when that
+player first reviews or misses a question.
+"""
+import hashlib
+import heapq
+import os
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analytics import text_key
+from compact_store import read_columns, write_columns
+from question_bank import Question
+
+REVIEW = "review"
+
+# Seconds a question waits in each box before it is due again; past the last box it is learned
+INTERVALS = [0, 10 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 21 * 24 * 3600]
+
+
+class ReviewDeck:
+    """One player's tracked questions: key -> (box, due time), plus a heap of (due, key)
+
+    Heap entries are never updated in place; rescheduling pushes a new entry
+    and the old one is skipped when it reaches the top, as its due time no
+    longer matches.
+    """
+
+    __slots__ = ("_items", "_heap")
+
+    def __init__(self, items: Optional[Dict[int, Tuple[int, int]]] = None):
+        self._items: Dict[int, Tuple[int, int]] = items or {}
+        self._heap: List[Tuple[int, int]] = [(due, key) for key, (_, due) in self._items.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._items
+
+    def box(self, key: int) -> Optional[int]:
+        item = self._items.get(key)
+        return item[0] if item else None
+
+    def schedule(self, key: int, box: int, now: float):
+        """Put a question in a box, due once that box's interval has passed"""
+        due = int(now) + INTERVALS[box]
+        self._items[key] = (box, due)
+        heapq.heappush(self._heap, (due, key))
+
+    def remove(self, key: int):
+        # Its heap entry goes stale and is dropped when it surfaces
+        self._items.pop(key, None)
+
+    def answered(self, key: int, correct: bool, now: float):
+        """Move a reviewed question up a box, or back to box 0 when missed"""
+        if not correct:
+            self.schedule(key, 0, now)
+            return
+        box = self.box(key)
+        if box is None:
+            return
+        if box + 1 >= len(INTERVALS):
+            self.remove(key)
+        else:
+            self.schedule(key, box + 1, now)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap:
+            due, key = heap[0]
+            item = self._items.get(key)
+            if item is not None and item[1] == due:
+                return
+            heapq.heappop(heap)
+
+    def pull_due(self, now: float, count: int) -> List[int]:
+        """Take up to count due question keys, most overdue first
+
+        Pulled questions stay in the deck; answering them schedules them again.
+        """
+        keys = []
+        while len(keys) < count:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            keys.append(heapq.heappop(self._heap)[1])
+        return keys
+
+    def next_due(self) -> Optional[int]:
+        """When the next question is due, or None for an empty deck"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def columns(self) -> Dict[str, array]:
+        keys = array("Q", self._items)
+        return {"keys": keys,
+                "boxes": array("B", (self._items[key][0] for key in keys)),
+                "due": array("I", (self._items[key][1] for key in keys))}
+
+    @classmethod
+    def from_columns(cls, columns) -> "ReviewDeck":
+        return cls(dict(zip(columns["keys"].tolist(), zip(columns["boxes"].tolist(), columns["due"].tolist()))))
+
+
+def _player_key(player: str) -> bytes:
+    return hashlib.blake2b(player.encode("utf-8"), digest_size=32).digest()
+
+
+class ReviewScheduler:
+    """Every player's review deck, each loaded on first use and saved after it changes"""
+
+    def __init__(self, directory: str = "review", clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.clock = clock
+        self._decks: Dict[str, ReviewDeck] = {}
+        self._dirty = set()
+
+    def _path(self, player: str) -> str:
+        return os.path.join(self.directory, _player_key(player)[:8].hex() + ".bin")
+
+    def deck(self, player: str) -> ReviewDeck:
+        deck = self._decks.get(player)
+        if deck is None:
+            # The file's key is the full name hash, so a clashing file name reads as no deck
+            cached = read_columns(self._path(player), _player_key(player))
+            deck = self._decks[player] = ReviewDeck.from_columns(cached[2]) if cached else ReviewDeck()
+        return deck
+
+    def answered(self, player: str, question: Question, correct: bool, reviewing: bool = False):
+        """Track an answer: misses from any round join the deck, review answers move between boxes"""
+        if correct and not reviewing:
+            return
+        key = text_key(question.text)
+        deck = self.deck(player)
+        if reviewing:
+            deck.answered(key, correct, self.clock())
+        else:
+            deck.schedule(key, 0, self.clock())
+        self._dirty.add(player)
+
+    def pull_due(self, player: str, count: int) -> List[int]:
+        """Keys of up to count questions due for review, most overdue first"""
+        return self.deck(player).pull_due(self.clock(), count)
+
+    def next_due(self, player: str) -> Optional[int]:
+        return self.deck(player).next_due()
+
+    def forget(self, player: str, key: int):
+        """Drop a question from a deck, e.g. one no longer in the question bank"""
+        self.deck(player).remove(key)
+        self._dirty.add(player)
+
+    def save(self, player: Optional[str] = None):
+        """Atomically write the changed decks, or only one player's"""
+        players = [player] if player is not None else list(self._dirty)
+        for name in players:
+            if name not in self._dirty:
+                continue
+            os.makedirs(self.directory, exist_ok=True)
+            write_columns(self._path(name), _player_key(name), {}, b"", self._decks[name].columns())
+            self._dirty.discard(name)
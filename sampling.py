@@ -0,0 +1,153 @@
+import random
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from question_bank import Question, QuestionBank
+from similarity import NearDuplicates
+
+
+class QuestionSampler:
+    """Draw quiz rounds from the difficulty index in O(k) per round"""
+
+    def __init__(self, bank: QuestionBank, history_rounds: int = 0,
+                 rng: Optional[random.Random] = None, near_duplicates: Optional[NearDuplicates] = None):
+        self.bank = bank
+        self.history_rounds = history_rounds
+        self.rng = rng or random.Random()
+        # When set, a round never holds two questions that nearly duplicate each other
+        self.near_duplicates = near_duplicates
+        # Per-player ids from the last N rounds, plus counts for O(1) membership
+        self._history: Dict[str, Deque[List[int]]] = {}
+        self._recent: Dict[str, Counter] = {}
+
+    def sample(self, difficulty: str, k: int, weights: Optional[Dict[str, float]] = None,
+               player: Optional[str] = None, tag: Optional[str] = None) -> List[Question]:
+        """Pick up to k distinct questions at or below the given difficulty"""
+        ids = self.sample_ids(difficulty, k, weights, player, tag)
+        if player is not None:
+            self.remember(player, ids)
+        return [self.bank[question_id] for question_id in ids]
+
+    def sample_ids(self, difficulty: str, k: int, weights: Optional[Dict[str, float]] = None,
+                   player: Optional[str] = None, tag: Optional[str] = None) -> List[int]:
+        """Pick up to k distinct question ids without touching the whole pool"""
+        segments = [(level, ids) for level, ids in self.bank.segments_at_or_below(difficulty, tag)
+                    if ids and (weights is None or weights.get(level, 0) > 0)]
+        total = sum(len(ids) for _, ids in segments)
+        k = min(k, total)
+        if k <= 0:
+            return []
+
+        excluded = self._excluded(player, {level for level, _ in segments}, tag)
+        available = total - len(excluded)
+
+        chosen: List[int] = []
+        if available >= 2 * k:
+            chosen = self._rejection_sample(segments, k, weights, excluded)
+        if len(chosen) < k:
+            # Small pool (or unlucky rejection run): enumerate it exactly, it is at most ~2k + history
+            chosen = self._exact_sample(segments, k, weights, excluded, chosen)
+        return chosen
+
+    def remember(self, player: str, ids: List[int]):
+        """Record a round so its questions are skipped for the next rounds"""
+        if self.history_rounds <= 0:
+            return
+        history = self._history.setdefault(player, deque())
+        recent = self._recent.setdefault(player, Counter())
+        history.append(ids)
+        recent.update(ids)
+        if len(history) > self.history_rounds:
+            expired = history.popleft()
+            recent.subtract(expired)
+            for question_id in expired:
+                if recent[question_id] <= 0:
+                    del recent[question_id]
+
+    def recent_ids(self, player: str) -> Set[int]:
+        """Question ids served to a player in their remembered rounds"""
+        return set(self._recent.get(player, ()))
+
+    def forget(self, player: str):
+        """Drop a player's round history"""
+        self._history.pop(player, None)
+        self._recent.pop(player, None)
+
+    def _excluded(self, player: Optional[str], levels: Set[str], tag: Optional[str]) -> Set[int]:
+        """Recently seen ids that are actually part of this pool"""
+        if player is None or player not in self._recent:
+            return set()
+        return {question_id for question_id in self._recent[player]
+                if self.bank.difficulty_of(question_id) in levels
+                and (tag is None or tag in self.bank.tags_of(question_id))}
+
+    def _blocked(self, chosen: List[int]) -> Set[int]:
+        """Near-duplicates of the questions already in the round"""
+        blocked: Set[int] = set()
+        if self.near_duplicates is not None:
+            for question_id in chosen:
+                blocked.update(self.near_duplicates.of(question_id))
+        return blocked
+
+    def _rejection_sample(self, segments: List[Tuple[str, Sequence[int]]], k: int,
+                          weights: Optional[Dict[str, float]], excluded: Set[int]) -> List[int]:
+        """Draw random positions and retry collisions; expected O(k) when the pool is large"""
+        level_weights = [len(ids) * (weights[level] if weights else 1) for level, ids in segments]
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        blocked: Set[int] = set()
+        attempts = 20 * k + 100
+        while len(chosen) < k and attempts:
+            attempts -= 1
+            if len(segments) == 1:
+                ids = segments[0][1]
+            else:
+                ids = self.rng.choices(segments, level_weights)[0][1]
+            question_id = ids[self.rng.randrange(len(ids))]
+            if question_id in seen or question_id in excluded or question_id in blocked:
+                continue
+            seen.add(question_id)
+            chosen.append(question_id)
+            if self.near_duplicates is not None:
+                blocked.update(self.near_duplicates.of(question_id))
+        return chosen
+
+    def _exact_sample(self, segments: List[Tuple[str, Sequence[int]]], k: int,
+                      weights: Optional[Dict[str, float]], excluded: Set[int],
+                      chosen: List[int]) -> List[int]:
+        """Finish a round by enumerating the remaining pool"""
+        taken = set(chosen)
+        fresh = [(question_id, weights[level] if weights else 1)
+                 for level, ids in segments for question_id in ids
+                 if question_id not in taken and question_id not in excluded]
+        if self.near_duplicates is None:
+            chosen = chosen + self._weighted_sample(fresh, k - len(chosen))
+        else:
+            # Walk a random order of the whole pool, skipping near-duplicates of what is already in
+            chosen = list(chosen)
+            blocked = self._blocked(chosen)
+            for question_id in self._weighted_sample(fresh, len(fresh)):
+                if len(chosen) >= k:
+                    break
+                if question_id not in blocked:
+                    chosen.append(question_id)
+                    blocked.update(self.near_duplicates.of(question_id))
+        if len(chosen) < k:
+            # Not enough unseen questions left, so allow recent repeats and near-duplicates
+            taken = set(chosen)
+            repeats = [(question_id, weights[level] if weights else 1)
+                       for level, ids in segments for question_id in ids
+                       if question_id not in taken]
+            chosen += self._weighted_sample(repeats, k - len(chosen))
+        return chosen
+
+    def _weighted_sample(self, pool: List[Tuple[int, float]], k: int) -> List[int]:
+        if k >= len(pool):
+            picked = [question_id for question_id, _ in pool]
+            self.rng.shuffle(picked)
+            return picked
+        if all(weight == pool[0][1] for _, weight in pool):
+            return [question_id for question_id, _ in self.rng.sample(pool, k)]
+        # Efraimidis-Spirakis keys give weighted sampling without replacement
+        keyed = sorted(pool, key=lambda item: self.rng.random() ** (1.0 / item[1]), reverse=True)
+        return [question_id for question_id, _ in keyed[:k]]
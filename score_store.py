@@ -0,0 +1,333 @@
+import os
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from journal import JournalError, ScoreJournal
+from leaderboard import Leaderboard, Standing
+
+
+class ScoreStore:
+    """Interface the game uses to record finished quizzes and read the leaderboard"""
+
+    def load(self):
+        """Load existing scores; may raise JournalError for an unreadable file"""
+
+    def record(self, name: str, score: int, difficulty: str, date: Optional[str] = None) -> Optional[dict]:
+        """Record a finished quiz, returning the player's entry once it is stored"""
+        raise NotImplementedError
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return a player's entry, or None if they have not played"""
+        raise NotImplementedError
+
+    def best_score(self, name: str) -> int:
+        """Return a player's best score, or 0 if they have not played"""
+        entry = self.get(name)
+        return entry.get("best_score", 0) if entry else 0
+
+    def top(self, count: int, start: int = 0) -> Iterator[dict]:
+        """Iterate the entries ranked start+1 .. start+count by best score"""
+        raise NotImplementedError
+
+    def rank(self, name: str) -> Optional[int]:
+        """Return a player's 1-based rank, or None if they have not played"""
+        raise NotImplementedError
+
+    def standing(self, name: str, difficulty: Optional[str] = None) -> Optional[Standing]:
+        """Rank and percentile of a player's best score, overall or among one difficulty's players"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def flush(self):
+        """Make sure everything recorded so far is durable"""
+
+    def close(self):
+        """Flush and release any resources"""
+        self.flush()
+
+
+class JournalScoreStore(ScoreStore):
+    """In-memory Leaderboard persisted through a snapshot + append-only journal"""
+
+    def __init__(self, path: str = "high_scores.json", compact_every: int = 100):
+        self.journal = ScoreJournal(path, compact_every=compact_every)
+        self.leaderboard = Leaderboard()
+
+    def load(self):
+        try:
+            self.leaderboard = self.journal.load()
+        except JournalError as e:
+            # The unreadable snapshot has been moved aside, so start from what the journal held
+            self.leaderboard = e.leaderboard or Leaderboard()
+            raise
+
+    def record(self, name: str, score: int, difficulty: str, date: Optional[str] = None) -> dict:
+        return self.journal.record(self.leaderboard, name, score, difficulty, date)
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.leaderboard.get(name)
+
+    def best_score(self, name: str) -> int:
+        return self.leaderboard.best_score(name)
+
+    def top(self, count: int, start: int = 0) -> Iterator[dict]:
+        return self.leaderboard.top(count, start)
+
+    def rank(self, name: str) -> Optional[int]:
+        return self.leaderboard.rank(name)
+
+    def standing(self, name: str, difficulty: Optional[str] = None) -> Optional[Standing]:
+        return self.leaderboard.standing(name, difficulty)
+
+    def __len__(self) -> int:
+        return len(self.leaderboard)
+
+    def flush(self):
+        # Every record is already fsynced to the journal, so there is nothing to do here;
+        # compacting on every flush would rewrite the whole snapshot per player
+        pass
+
+    def close(self):
+        # Fold the journal into the snapshot so the next start replays nothing
+        if self.journal.pending:
+            self.journal.compact(self.leaderboard)
+
+
+class SQLiteScoreStore(ScoreStore):
+    """Scores and attempt history in SQLite, safe for many processes sharing one file
+
+    WAL mode lets leaderboard reads run while another process writes, and each
+    attempt is applied with a single UPSERT inside BEGIN IMMEDIATE, so
+    concurrent kiosks never lose each other's updates. With batch_size > 1,
+    attempts are buffered and committed together in one transaction. Triggers
+    keep a count of players per best score, overall and per difficulty, in
+    the same transaction, so standings sum a few hundred score buckets instead
+    of counting every player.
+    """
+
+    COLUMNS = "name, score, best_score, last_score, attempts, difficulty, date"
+
+    def __init__(self, path: str = "high_scores.db", batch_size: int = 1, pool_size: int = 4,
+                 timeout: float = 30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._pending: List[Tuple[str, int, str, str, float]] = []
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            self._create_schema(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so transactions are opened explicitly below
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @staticmethod
+    def _count_triggers(table: str, level: str) -> List[str]:
+        """Triggers that move a player between score_counts buckets as their best score in table changes"""
+        add = f"""
+            INSERT INTO score_counts (difficulty, best_score, players)
+            VALUES ({level.format(row="NEW")}, NEW.best_score, 1)
+            ON CONFLICT (difficulty, best_score) DO UPDATE SET players = players + 1;"""
+        remove = f"""
+            UPDATE score_counts SET players = players - 1
+            WHERE difficulty = {level.format(row="OLD")} AND best_score = OLD.best_score;
+            DELETE FROM score_counts
+            WHERE difficulty = {level.format(row="OLD")} AND best_score = OLD.best_score AND players = 0;"""
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} BEGIN {add} END",
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_count_update AFTER UPDATE OF best_score ON {table}
+                WHEN NEW.best_score != OLD.best_score BEGIN {remove} {add} END""",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} BEGIN {remove} END",
+        ]
+
+    @classmethod
+    def _create_schema(cls, conn: sqlite3.Connection):
+        # One transaction, so no player lands between creating the count triggers and the backfill
+        conn.executescript("""
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS players (
+                name TEXT PRIMARY KEY,
+                score INTEGER NOT NULL,
+                best_score INTEGER NOT NULL,
+                last_score INTEGER NOT NULL,
+                attempts INTEGER NOT NULL,
+                difficulty TEXT NOT NULL,
+                date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS players_best_score ON players (best_score DESC, name);
+            CREATE TABLE IF NOT EXISTS attempts (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                difficulty TEXT NOT NULL,
+                date TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS attempts_name ON attempts (name);
+            CREATE TABLE IF NOT EXISTS player_levels (
+                name TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                best_score INTEGER NOT NULL,
+                PRIMARY KEY (name, difficulty)
+            );
+            CREATE INDEX IF NOT EXISTS player_levels_best_score ON player_levels (difficulty, best_score);
+            -- Players per best score; difficulty '' counts overall bests from players
+            CREATE TABLE IF NOT EXISTS score_counts (
+                difficulty TEXT NOT NULL,
+                best_score INTEGER NOT NULL,
+                players INTEGER NOT NULL,
+                PRIMARY KEY (difficulty, best_score)
+            ) WITHOUT ROWID;
+        """)
+        try:
+            # Databases created before score_counts existed get it filled from the players
+            if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM score_counts)").fetchone()[0]:
+                conn.execute("""
+                    INSERT INTO score_counts (difficulty, best_score, players)
+                    SELECT '', best_score, COUNT(*) FROM players GROUP BY best_score
+                    UNION ALL
+                    SELECT difficulty, best_score, COUNT(*) FROM player_levels GROUP BY difficulty, best_score
+                """)
+            triggers = cls._count_triggers("players", "''") + cls._count_triggers("player_levels", "{row}.difficulty")
+            for trigger in triggers:
+                conn.execute(trigger)
+            # Databases created before player_levels existed get it filled from their attempts
+            if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM player_levels)").fetchone()[0]:
+                conn.execute("""
+                    INSERT OR IGNORE INTO player_levels (name, difficulty, best_score)
+                    SELECT name, difficulty, MAX(score) FROM attempts GROUP BY name, difficulty
+                """)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def record(self, name: str, score: int, difficulty: str, date: Optional[str] = None) -> Optional[dict]:
+        self._pending.append((name, score, difficulty, date or time.strftime("%Y-%m-%d"), time.time()))
+        if len(self._pending) < self.batch_size:
+            return None
+        self.flush()
+        return self.get(name)
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with self._connection() as conn:
+            try:
+                # IMMEDIATE takes the write lock up front, so two writers never deadlock on upgrade;
+                # it can time out on a busy database, and the batch must survive that too
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO attempts (name, score, difficulty, date, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    pending)
+                conn.executemany("""
+                    INSERT INTO players (name, score, best_score, last_score, attempts, difficulty, date)
+                    VALUES (?1, ?2, ?2, ?2, 1, ?3, ?4)
+                    ON CONFLICT (name) DO UPDATE SET
+                        attempts = attempts + 1,
+                        best_score = MAX(best_score, excluded.best_score),
+                        last_score = excluded.last_score
+                """, [(name, score, difficulty, date) for name, score, difficulty, date, _ in pending])
+                conn.executemany("""
+                    INSERT INTO player_levels (name, difficulty, best_score) VALUES (?, ?, ?)
+                    ON CONFLICT (name, difficulty) DO UPDATE SET
+                        best_score = MAX(best_score, excluded.best_score)
+                """, [(name, difficulty, score) for name, score, difficulty, _, _ in pending])
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self._pending = pending + self._pending
+                raise
+
+    def get(self, name: str) -> Optional[dict]:
+        self.flush()
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT {self.COLUMNS} FROM players WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def top(self, count: int, start: int = 0) -> Iterator[dict]:
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {self.COLUMNS} FROM players ORDER BY best_score DESC, name LIMIT ? OFFSET ?",
+                (count, start)).fetchall()
+        return iter([dict(row) for row in rows])
+
+    def rank(self, name: str) -> Optional[int]:
+        entry = self.get(name)
+        if entry is None:
+            return None
+        with self._connection() as conn:
+            ahead = conn.execute(
+                "SELECT COUNT(*) FROM players WHERE best_score > ? OR (best_score = ? AND name < ?)",
+                (entry["best_score"], entry["best_score"], name)).fetchone()[0]
+        return ahead + 1
+
+    def standing(self, name: str, difficulty: Optional[str] = None) -> Optional[Standing]:
+        # Summed from the per-score counts in SQL, so scores recorded by other processes are included
+        self.flush()
+        if difficulty is None:
+            table, level_filter, args = "players", "", ()
+        else:
+            table, level_filter, args = "player_levels", "difficulty = ? AND ", (difficulty,)
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT best_score FROM {table} WHERE {level_filter}name = ?",
+                               args + (name,)).fetchone()
+            if row is None:
+                return None
+            above, players = conn.execute("""
+                SELECT TOTAL(CASE WHEN best_score > ? THEN players END), TOTAL(players)
+                FROM score_counts WHERE difficulty = ?
+            """, (row[0], difficulty or "")).fetchone()
+        above, players = int(above), int(players)
+        return Standing(above + 1, players, (players - above) / players * 100)
+
+    def attempts(self, name: str) -> List[dict]:
+        """Return every recorded attempt for a player, oldest first"""
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT name, score, difficulty, date, recorded_at FROM attempts WHERE name = ? ORDER BY id",
+                (name,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        while not self._pool.empty():
+            self._pool.get().close()
+
+
+def open_score_store(path: str = "high_scores.json") -> ScoreStore:
+    """Open the score store for a path, using SQLite for .db/.sqlite files"""
+    if os.path.splitext(path)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteScoreStore(path)
+    return JournalScoreStore(path)
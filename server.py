@@ -0,0 +1,248 @@
+"""Multi-player quiz server: many concurrent players in one asyncio event loop
+
+Line-based protocol over TCP (try it with `nc localhost 8765`):
+
+    server: WELCOME Python Mastery Quiz
+    server: NAME?                          client: <name>
+    server: DIFFICULTY? easy|medium|hard|adaptive
+                                           client: <difficulty> (empty keeps the default)
+    server: QUESTION <n>/<total> <seconds>s
+    server: <question text>
+    server: <i>. <option>                  (one line per option)
+    server: ANSWER?                        client: <option number>
+    server: CORRECT +<points> score=<score> | WRONG answer=<answer> score=<score>
+            | TIMEOUT answer=<answer> score=<score> | INVALID
+    ...
+    server: RESULT score=<s> max=<m> percentage=<p> band=<band>
+    server: BYE
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import random
+from typing import List, Optional
+
+from adaptive import ADAPTIVE, AdaptiveSession
+from game import QuizGame
+from metrics import Metrics
+from score_store import open_score_store
+from session import QuizSession
+from session_log import SessionLog
+
+
+class QuizServer:
+    """Hosts quiz sessions for TCP clients, one coroutine per player"""
+
+    def __init__(self, game: QuizGame, max_sessions: int = 10000, idle_timeout: float = 120,
+                 max_line: int = 256):
+        self.game = game
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+        self.active_sessions = 0
+        # Score writes may block on disk or SQLite locks, so they run off the event loop
+        # on one thread, which also keeps the (single-threaded) stores safe
+        self._store_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Start listening; port 0 picks a free port"""
+        # The reader limit caps per-connection buffering for overlong lines
+        # and a deep accept backlog lets bursts of players connect without SYN retries
+        self._server = await asyncio.start_server(self._handle_client, host, port, limit=self.max_line,
+                                                  backlog=min(self.max_sessions, 4096))
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(self._store_executor, self.game.close)
+        self._store_executor.shutdown()
+
+    def _log_session(self, method, *args):
+        """Write to the session log on the store thread; a failed write only loses that record"""
+        try:
+            return method(self.game.session_log, *args)
+        except (OSError, ValueError):
+            return None
+
+    def _log_later(self, method, *args):
+        """Queue a session log write behind the earlier ones without waiting for it"""
+        try:
+            self._store_executor.submit(self._log_session, method, *args)
+        except RuntimeError:
+            # The store thread is shut down once the server closes
+            pass
+
+    async def _send(self, writer: asyncio.StreamWriter, lines: List[str]):
+        writer.write(("\n".join(lines) + "\n").encode("utf-8"))
+        # A client that stops reading must not make us buffer without limit
+        await asyncio.wait_for(writer.drain(), self.idle_timeout)
+
+    async def _read_line(self, reader: asyncio.StreamReader, timeout: float) -> Optional[str]:
+        """Read one line, returning None on timeout"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            raise ConnectionResetError("client disconnected")
+        return line.decode("utf-8", "replace").strip()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.active_sessions >= self.max_sessions:
+            writer.write(b"BUSY\n")
+            writer.close()
+            return
+        self.active_sessions += 1
+        try:
+            await self._play(reader, writer)
+        except (ConnectionError, asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+            # Disconnects, stalled clients and overlong lines just end that player's session
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def _play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        config = self.game.config
+
+        await self._send(writer, ["WELCOME Python Mastery Quiz", "NAME?"])
+        name = await self._read_line(reader, self.idle_timeout)
+        if not name:
+            return
+        difficulties = config["difficulty_levels"] + [ADAPTIVE]
+        await self._send(writer, [f"DIFFICULTY? {'|'.join(difficulties)}"])
+        difficulty = await self._read_line(reader, self.idle_timeout)
+        if difficulty not in difficulties:
+            difficulty = config["current_difficulty"]
+
+        # Deadlines use the event loop's monotonic clock; option shuffles come from a logged seed
+        seed = random.getrandbits(64)
+        if difficulty == ADAPTIVE:
+            session = AdaptiveSession(self.game.adaptive, name, config["questions_per_round"],
+                                      config["time_limit"], self.game.sampler.recent_ids(name),
+                                      random.Random(seed), clock=loop.time)
+        else:
+            with self.game.metrics.time("quiz_question_selection_seconds"):
+                questions = self.game.sampler.sample(difficulty, config["questions_per_round"],
+                                                     config["question_weights"], player=name)
+            session = QuizSession(questions, difficulty, config["time_limit"], random.Random(seed), clock=loop.time)
+        self.game.metrics.increment("quiz_rounds_total", difficulty=difficulty)
+
+        # Log writes queue on the store thread in order; only the start is waited for, for its number
+        number = None
+        if config["sessions_path"]:
+            number = await loop.run_in_executor(self._store_executor, self._log_session, SessionLog.start,
+                                                name, difficulty, seed, config["time_limit"], session.questions)
+        try:
+            final = await self._play_questions(reader, writer, session, number)
+        except BaseException:
+            # A player who drops out cannot resume over the network
+            if number is not None:
+                self._log_later(SessionLog.abandon, number)
+            raise
+
+        if isinstance(session, AdaptiveSession):
+            self.game.sampler.remember(name, session.ids)
+            await loop.run_in_executor(self._store_executor, self.game.adaptive.round_finished)
+        # Includes any wait behind other players' writes on the store thread
+        with self.game.metrics.time("quiz_score_persist_seconds"):
+            await loop.run_in_executor(self._store_executor, self.game.high_scores.record,
+                                       name, final.score, difficulty)
+        await loop.run_in_executor(self._store_executor, self.game.flush_analytics)
+        await self._send(writer, [
+            f"RESULT score={final.score} max={final.max_score} "
+            f"percentage={final.percentage:.1f} band={final.band}",
+            "BYE"
+        ])
+
+    async def _play_questions(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                              session: QuizSession, number: Optional[int]):
+        """Ask every question of the round and return its final result"""
+        loop = asyncio.get_running_loop()
+        for prompt in iter(session.next_question, None):
+            lines = [f"QUESTION {prompt.number}/{prompt.total} {prompt.time_limit:.0f}s", prompt.question.text]
+            lines.extend(f"{idx}. {option}" for idx, option in enumerate(prompt.options, 1))
+            lines.append("ANSWER?")
+            await self._send(writer, lines)
+            if number is not None:
+                self._log_later(SessionLog.asked, number, prompt.question, prompt.options)
+
+            while True:
+                answer = await self._read_line(reader, session.deadline() - loop.time())
+                if answer is None:
+                    result = session.submit_answer(None)
+                    break
+                if answer.isdigit() and 1 <= int(answer) <= len(prompt.options):
+                    result = session.submit_answer(int(answer) - 1)
+                    break
+                await self._send(writer, ["INVALID"])
+
+            if number is not None:
+                chosen = None if result.timed_out else prompt.options.index(result.chosen)
+                self._log_later(SessionLog.answered, number, chosen, result.elapsed, result.timed_out)
+            if self.game.metrics.enabled:
+                outcome = "timeout" if result.timed_out else "correct" if result.correct else "wrong"
+                self.game.metrics.observe("quiz_answer_seconds", result.elapsed,
+                                          difficulty=prompt.question.difficulty, outcome=outcome)
+            if self.game.analytics is not None:
+                self.game.analytics.record(prompt.question, result.chosen, result.correct, result.timed_out,
+                                           result.elapsed)
+            if result.timed_out:
+                await self._send(writer, [f"TIMEOUT answer={result.answer} score={result.score}"])
+            elif result.correct:
+                await self._send(writer, [f"CORRECT +{result.points} score={result.score}"])
+            else:
+                await self._send(writer, [f"WRONG answer={result.answer} score={result.score}"])
+
+        final = session.finish()
+        if number is not None:
+            self._log_later(SessionLog.finished, number, final.score, final.max_score)
+        return final
+
+
+async def export_metrics_periodically(game: QuizGame, interval: float):
+    """Rewrite the metrics file every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        game.export_metrics()
+
+
+async def serve(game: QuizGame, host: str, port: int, max_sessions: int, metrics_interval: float = 15):
+    server = QuizServer(game, max_sessions=max_sessions)
+    listener = await server.start(host, port)
+    address = listener.sockets[0].getsockname()
+    print(f"Quiz server listening on {address[0]}:{address[1]}")
+    exporter = asyncio.create_task(export_metrics_periodically(game, metrics_interval))
+    try:
+        await listener.serve_forever()
+    finally:
+        exporter.cancel()
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Python Mastery Quiz server")
+    parser.add_argument("question_packs", nargs="*", help="extra question packs (.json, .jsonl, .csv, .db)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scores", default="high_scores.json")
+    parser.add_argument("--time-limit", type=float, default=30)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--metrics", help="write metrics to this file (.json snapshot, else Prometheus text)")
+    args = parser.parse_args()
+
+    quiz = QuizGame(args.question_packs, open_score_store(args.scores), metrics=Metrics(enabled=bool(args.metrics)))
+    quiz.config["metrics_path"] = args.metrics
+    quiz.config["time_limit"] = args.time_limit
+    # Players who drop out cannot resume, so the log need not reach disk after every answer
+    quiz.config["sessions_fsync"] = False
+    # Compile or map the packs and their near-duplicates before listening, so no round waits on them
+    quiz.sampler
+    try:
+        asyncio.run(serve(quiz, args.host, args.port, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
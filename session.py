@@ -0,0 +1,153 @@
+import random
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from question_bank import Question
+
+# Points per correct answer by question difficulty
+POINTS = {"easy": 1, "medium": 2, "hard": 3}
+
+# (minimum percentage, band) from best to worst
+PERFORMANCE_BANDS = [(90, "excellent"), (70, "great"), (50, "good"), (0, "practice")]
+
+
+def points_for(difficulty: str) -> int:
+    """Points awarded for a correct answer at the given difficulty"""
+    return POINTS.get(difficulty, 1)
+
+
+def max_score_for(total_questions: int, difficulty: str) -> int:
+    """Maximum score for a round, counted as every question being at the round difficulty"""
+    return total_questions * points_for(difficulty)
+
+
+def performance_band(percentage: float) -> str:
+    """Return the performance band for a percentage of the maximum score"""
+    for minimum, band in PERFORMANCE_BANDS:
+        if percentage >= minimum:
+            return band
+    return PERFORMANCE_BANDS[-1][1]
+
+
+class QuizPrompt(NamedTuple):
+    number: int
+    total: int
+    question: Question
+    options: List[str]
+    time_limit: float
+
+
+class AnswerResult(NamedTuple):
+    correct: bool
+    timed_out: bool
+    points: int
+    chosen: Optional[str]
+    answer: str
+    score: int
+    elapsed: float
+
+
+class QuizResult(NamedTuple):
+    score: int
+    max_score: int
+    percentage: float
+    band: str
+    total_questions: int
+    correct: int
+
+
+class QuizSession:
+    """One quiz round as a state machine: next_question -> submit_answer ... -> finish
+
+    No input or output happens here, so the terminal game, the network server
+    and benchmarks all drive the same rules. Time is read from `clock`
+    (monotonic by default) when a question is shown and when it is answered.
+    """
+
+    __slots__ = ("questions", "difficulty", "time_limit", "rng", "clock", "score", "correct",
+                 "max_score", "_index", "_options", "_asked_at", "_result")
+
+    def __init__(self, questions: List[Question], difficulty: str, time_limit: float = 30,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        self.questions = questions
+        self.difficulty = difficulty
+        self.time_limit = time_limit
+        self.rng = rng or random
+        self.clock = clock
+        self.score = 0
+        self.correct = 0
+        self.max_score = max_score_for(len(questions), difficulty)
+        self._index = -1
+        self._options: Optional[List[str]] = None
+        self._asked_at = 0.0
+        self._result: Optional[QuizResult] = None
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    @property
+    def current_question(self) -> Optional[Question]:
+        if 0 <= self._index < len(self.questions):
+            return self.questions[self._index]
+        return None
+
+    @property
+    def awaiting_answer(self) -> bool:
+        return self._options is not None
+
+    @property
+    def finished(self) -> bool:
+        return self._result is not None
+
+    def next_question(self) -> Optional[QuizPrompt]:
+        """Move to the next question and start its timer, or return None when the round is over"""
+        if self._options is not None:
+            raise RuntimeError("The current question has not been answered yet")
+        if self._result is not None or self._index + 1 >= self.total_questions:
+            return None
+        self._index += 1
+        question = self.questions[self._index]
+        options = question.options.copy()
+        self.rng.shuffle(options)
+        self._options = options
+        self._asked_at = self.clock()
+        return QuizPrompt(self._index + 1, self.total_questions, question, options, self.time_limit)
+
+    def time_remaining(self, now: Optional[float] = None) -> float:
+        """Seconds left to answer the current question"""
+        if self._options is None:
+            return 0.0
+        now = self.clock() if now is None else now
+        return max(0.0, self.time_limit - (now - self._asked_at))
+
+    def deadline(self) -> float:
+        """Clock value at which the current question times out"""
+        return self._asked_at + self.time_limit
+
+    def submit_answer(self, choice: Optional[int], now: Optional[float] = None) -> AnswerResult:
+        """Answer the current question with a 0-based option index, or None to let it time out"""
+        if self._options is None:
+            raise RuntimeError("There is no question waiting for an answer")
+        if choice is not None and not 0 <= choice < len(self._options):
+            raise ValueError(f"Choice must be between 0 and {len(self._options) - 1}")
+        question = self.questions[self._index]
+        now = self.clock() if now is None else now
+        elapsed = now - self._asked_at
+        timed_out = choice is None or elapsed > self.time_limit
+        chosen = None if timed_out else self._options[choice]
+        correct = chosen == question.answer
+        points = points_for(question.difficulty) if correct else 0
+        self.score += points
+        self.correct += correct
+        self._options = None
+        return AnswerResult(correct, timed_out, points, chosen, question.answer, self.score, elapsed)
+
+    def finish(self) -> QuizResult:
+        """Close the round and return the final result"""
+        if self._result is None:
+            self._options = None
+            percentage = (self.score / self.max_score) * 100 if self.max_score else 0.0
+            self._result = QuizResult(self.score, self.max_score, percentage, performance_band(percentage),
+                                      len(self.questions), self.correct)
+        return self._result
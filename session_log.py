@@ -0,0 +1,486 @@
+"""Append-only binary log of quiz sessions, for replay and crash resume
+
+Each round is logged as it is played: a start record (seed, player,
+difficulty, time limit and the selected questions), then for every question
+the order its options were shown in and the answer with its timing, then the
+final score. Sessions draw their option shuffles from a random.Random seeded
+with the logged seed, so replaying a session through QuizSession reproduces
+it exactly. Once the log passes a size limit it is moved to sessions.bin.1
+and a new log starts with only the unfinished sessions, so opening it never
+scans more than that. Replay a log, checking every score, from the
+repository root:
+
+    python session_log.py sessions.bin [question packs...] [--repeat 10]
+"""
+import argparse
+import os
+import random
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from analytics import text_key
+from compact_store import read_columns, write_columns
+from question_bank import Question, QuestionBank
+from session import QuizSession
+
+MAGIC = b"PQSL\x01\x00\x00\x00"
+# kind, session number, payload length
+HEADER = struct.Struct("<BIH")
+# seed, wall-clock start, time limit, player name length, difficulty length, question count
+START = struct.Struct("<QddBBH")
+# question key; followed by one byte per option giving the shown order
+ASK = struct.Struct("<Q")
+# chosen option as shown (TIMED_OUT if none), elapsed milliseconds
+ANSWER = struct.Struct("<BI")
+# final score, maximum score
+FINISH = struct.Struct("<ii")
+
+KIND_START, KIND_ASK, KIND_ANSWER, KIND_FINISH, KIND_ABANDON = 1, 2, 3, 4, 5
+TIMED_OUT = 255
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(f):
+        # Locks the first byte; LK_LOCK retries for about ten seconds before raising OSError
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(f):
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+else:
+    import fcntl
+
+    def _lock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _clip(text: str) -> bytes:
+    """UTF-8 bytes that fit a one-byte length, cut on a character boundary"""
+    return text.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+
+
+class SessionRecord:
+    """Everything logged for one session"""
+
+    __slots__ = ("number", "seed", "started", "time_limit", "player", "difficulty", "keys", "asked",
+                 "answers", "final")
+
+    def __init__(self, number: int, seed: int, started: float, time_limit: float, player: str,
+                 difficulty: str, keys: Sequence[int]):
+        self.number = number
+        self.seed = seed
+        self.started = started
+        self.time_limit = time_limit
+        self.player = player
+        self.difficulty = difficulty
+        # Selected question keys; empty for adaptive rounds, which pick as they go
+        self.keys = list(keys)
+        # (question key, option order) per question shown
+        self.asked: List[Tuple[int, bytes]] = []
+        # (option index as shown or None, elapsed seconds) per answer
+        self.answers: List[Tuple[Optional[int], float]] = []
+        self.final: Optional[Tuple[int, int]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.final is not None
+
+    def apply(self, kind: int, payload: bytes):
+        """Fold one logged record into the session"""
+        if kind == KIND_ASK:
+            key, = ASK.unpack_from(payload)
+            # A question re-shown after a resume replaces the one left unanswered
+            if len(self.asked) > len(self.answers):
+                self.asked.pop()
+            self.asked.append((key, bytes(payload[ASK.size:])))
+        elif kind == KIND_ANSWER:
+            choice, elapsed_ms = ANSWER.unpack(payload)
+            self.answers.append((None if choice == TIMED_OUT else choice, elapsed_ms / 1000))
+        elif kind == KIND_FINISH:
+            self.final = FINISH.unpack(payload)
+
+    @classmethod
+    def from_start(cls, number: int, payload: bytes) -> "SessionRecord":
+        seed, started, time_limit, name_length, difficulty_length, count = START.unpack_from(payload)
+        offset = START.size
+        # Older logs may hold names cut mid-character
+        player = bytes(payload[offset:offset + name_length]).decode("utf-8", "replace")
+        offset += name_length
+        difficulty = bytes(payload[offset:offset + difficulty_length]).decode("utf-8", "replace")
+        offset += difficulty_length
+        keys = array("Q", bytes(payload[offset:offset + 8 * count]))
+        return cls(number, seed, started, time_limit, player, difficulty, keys)
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[Tuple[int, int, bytes, int]]:
+    """Yield (kind, session number, payload, end offset) for every complete record of a log
+
+    A non-zero offset must be the end of an earlier record; reading starts there.
+    """
+    with open(path, "rb") as f:
+        if offset:
+            f.seek(offset)
+        elif f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session log")
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            kind, number, length = HEADER.unpack(header)
+            payload = f.read(length)
+            # A torn record at the end of the log (crash mid-write) is ignored
+            if len(payload) < length:
+                return
+            yield kind, number, payload, f.tell()
+
+
+def read_sessions(path: str) -> Iterator[SessionRecord]:
+    """Yield sessions as they finish in the log, then those left unfinished"""
+    open_sessions: Dict[int, SessionRecord] = {}
+    for kind, number, payload, _ in read_records(path):
+        if kind == KIND_START:
+            open_sessions[number] = SessionRecord.from_start(number, payload)
+            continue
+        session = open_sessions.get(number)
+        if session is None:
+            continue
+        if kind == KIND_ABANDON:
+            del open_sessions[number]
+            continue
+        session.apply(kind, payload)
+        if session.finished:
+            yield open_sessions.pop(number)
+    yield from open_sessions.values()
+
+
+class SessionLog:
+    """Writer for the session log that also remembers which sessions never finished
+
+    Several processes (kiosks, the server) may share one log. Every append
+    holds an exclusive lock on the file and first folds in whatever the others
+    appended since, so session numbers never repeat and each process knows
+    every unfinished session. A torn tail left by a crash is dropped under the
+    lock so new records stay aligned. A shown question is written together with
+    its answer, and each write is flushed (and fsynced by default), so a crashed
+    kiosk can pick its round up again at the current question with one disk
+    sync per answer. Past max_bytes the log is rotated to path.1, carrying the
+    unfinished sessions over to the new log.
+    """
+
+    def __init__(self, path: str = "sessions.bin", fsync: bool = True, max_bytes: int = 16 * 1024 * 1024):
+        self.path = path
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self._open: Dict[int, SessionRecord] = {}
+        # Raw records of the unfinished sessions, copied to the new log on rotation
+        self._records: Dict[int, List[bytes]] = {}
+        self._next_number = 1
+        self._file = None
+        # End of the last record folded in; later bytes were appended by other processes
+        self._offset = 0
+        # The shown question's record, written with its answer; the seed re-creates it on resume
+        self._pending: List[Tuple[int, int, bytes]] = []
+
+    def _catch_up(self):
+        """Take the file lock and fold in the records appended since the last call
+
+        A log that another process rotated away is left for the new one, which
+        is read from the start.
+        """
+        while True:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+                self._offset = 0
+                self._open.clear()
+                self._records.clear()
+            _lock(self._file)
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(self._file.fileno()).st_ino:
+                break
+            self._file.close()
+            self._file = None
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._write_raw(MAGIC)
+            self._offset = len(MAGIC)
+            return
+        good_offset = max(self._offset, len(MAGIC))
+        if size > self._offset:
+            for kind, number, payload, end in read_records(self.path, self._offset):
+                good_offset = end
+                self._next_number = max(self._next_number, number + 1)
+                self._track(kind, number, payload)
+        if size > good_offset:
+            self._file.truncate(good_offset)
+        self._offset = good_offset
+
+    @contextmanager
+    def _locked(self):
+        try:
+            self._catch_up()
+            yield
+        finally:
+            if self._file is not None:
+                _unlock(self._file)
+
+    def _track(self, kind: int, number: int, payload: bytes):
+        """Fold a record into the unfinished sessions; finished and abandoned ones are dropped"""
+        if kind == KIND_START:
+            self._open[number] = SessionRecord.from_start(number, payload)
+            self._records[number] = []
+        session = self._open.get(number)
+        if session is None:
+            return
+        if kind == KIND_ABANDON:
+            del self._open[number], self._records[number]
+            return
+        session.apply(kind, payload)
+        self._records[number].append(HEADER.pack(kind, number, len(payload)) + payload)
+        if session.finished:
+            del self._open[number], self._records[number]
+
+    def _rotate(self):
+        """Move the log to path.1 and start a new one holding only the unfinished sessions"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            for records in self._records.values():
+                f.write(b"".join(records))
+            # Others may append to the new log before we lock it; catching up reads on from here
+            written = f.tell()
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        # Opened before it replaces the log, so it is this file even if another process rotates again
+        new_file = open(tmp_path, "ab")
+        # The log path never goes missing, or a process opening it then would start a log of its own
+        rotated = self.path + ".1"
+        if os.path.exists(rotated):
+            os.remove(rotated)
+        os.link(self.path, rotated)
+        os.replace(tmp_path, self.path)
+        # Closing drops the lock; processes waiting on it see the old file is gone and reopen
+        self._file.close()
+        self._file = new_file
+        self._offset = written
+
+    def _write_raw(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _append(self, records: List[Tuple[int, int, bytes]]):
+        """Write records, with the lock held, and rotate the log once it is too big"""
+        self._write_raw(b"".join(HEADER.pack(kind, number, len(payload)) + payload
+                                 for kind, number, payload in records))
+        # Under the lock the file ends with our records; tell() may not know what others appended
+        self._offset = os.fstat(self._file.fileno()).st_size
+        for record in records:
+            self._track(*record)
+        if self._offset >= self.max_bytes:
+            self._rotate()
+
+    def _write(self, kind: int, number: int, payload: bytes, hold: bool = False):
+        self._pending.append((kind, number, payload))
+        if hold:
+            return
+        with self._locked():
+            pending, self._pending = self._pending, []
+            self._append(pending)
+
+    def start(self, player: str, difficulty: str, seed: int, time_limit: float,
+              questions: Sequence[Question]) -> int:
+        """Log the start of a round and return its session number"""
+        name = _clip(player)
+        level = _clip(difficulty)
+        keys = array("Q", (text_key(question.text) for question in questions))
+        payload = (START.pack(seed, time.time(), time_limit, len(name), len(level), len(keys))
+                   + name + level + keys.tobytes())
+        # The number is picked under the lock, after every other process's sessions are known
+        with self._locked():
+            number = self._next_number
+            self._next_number += 1
+            pending, self._pending = self._pending + [(KIND_START, number, payload)], []
+            self._append(pending)
+        return number
+
+    def asked(self, number: int, question: Question, options: Sequence[str]):
+        """Log a question being shown, with the order of its options"""
+        order = bytes(question.options.index(option) for option in options)
+        self._write(KIND_ASK, number, ASK.pack(text_key(question.text)) + order, hold=True)
+
+    def answered(self, number: int, choice: Optional[int], elapsed: float, timed_out: bool = False):
+        """Log an answer as the 0-based index of the option shown, or None for a timeout"""
+        shown = TIMED_OUT if timed_out or choice is None else choice
+        self._write(KIND_ANSWER, number, ANSWER.pack(shown, min(int(elapsed * 1000), 0xFFFFFFFF)))
+
+    def finished(self, number: int, score: int, max_score: int):
+        self._write(KIND_FINISH, number, FINISH.pack(score, max_score))
+
+    def abandon(self, number: int):
+        """Mark an unfinished session as one that will not be resumed"""
+        self._write(KIND_ABANDON, number, b"")
+
+    def unfinished(self, player: str) -> Optional[SessionRecord]:
+        """The player's latest session that was started but never finished, by any process"""
+        # Long names are logged cut short, so compare them the same way
+        player = _clip(player).decode("utf-8")
+        with self._locked():
+            sessions = [session for session in self._open.values() if session.player == player]
+        return max(sessions, key=lambda session: session.number) if sessions else None
+
+    def close(self):
+        if self._pending:
+            with self._locked():
+                pending, self._pending = self._pending, []
+                self._append(pending)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class QuestionLookup:
+    """Resolves logged question keys to bank questions by binary search over a sorted key column
+
+    The columns take 12 bytes per question. Building them hashes every bank
+    text, so they are saved next to the question cache and mapped from it on
+    later starts; only the questions looked up are ever built.
+    """
+
+    def __init__(self, bank: QuestionBank, keys: Optional[Sequence[int]] = None,
+                 ids: Optional[Sequence[int]] = None):
+        self.bank = bank
+        if keys is None or ids is None:
+            hashed = [text_key(bank.text_of(question_id)) for question_id in range(len(bank))]
+            ids = array("I", sorted(range(len(hashed)), key=hashed.__getitem__))
+            keys = array("Q", (hashed[question_id] for question_id in ids))
+        self._keys = keys
+        self._ids = ids
+        self._questions: Dict[int, Question] = {}
+
+    def __call__(self, key: int) -> Optional[Question]:
+        question = self._questions.get(key)
+        if question is None:
+            question_id = self.id_of(key)
+            if question_id is not None:
+                question = self._questions[key] = self.bank[question_id]
+        return question
+
+    def id_of(self, key: int) -> Optional[int]:
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._ids[index]
+        return None
+
+    def save(self, path: str, key: bytes):
+        write_columns(path, key, {}, b"", {"keys": self._keys, "ids": self._ids})
+
+    @classmethod
+    def load(cls, path: str, bank: QuestionBank, key: bytes) -> Optional["QuestionLookup"]:
+        """Map the key columns saved for this bank, or return None if they are missing or stale"""
+        cached = read_columns(path, key)
+        if cached is None or len(cached[2]["keys"]) != len(bank):
+            return None
+        return cls(bank, cached[2]["keys"], cached[2]["ids"])
+
+
+def restore_session(record: SessionRecord, lookup: QuestionLookup, clock=time.monotonic) -> Optional[QuizSession]:
+    """Rebuild a logged round and play its logged answers, leaving it at the next unanswered question
+
+    Returns None when the round cannot be rebuilt, e.g. an adaptive round or
+    one whose questions are no longer in the bank.
+    """
+    questions = [lookup(key) for key in record.keys]
+    if not questions or any(question is None for question in questions):
+        return None
+    session = QuizSession(questions, record.difficulty, record.time_limit, random.Random(record.seed), clock)
+    for (_, order), (choice, elapsed) in zip(record.asked, record.answers):
+        prompt = session.next_question()
+        if prompt is None or order != bytes(prompt.question.options.index(o) for o in prompt.options):
+            return None
+        session.submit_answer(choice, now=session.deadline() - session.time_limit + elapsed)
+    return session
+
+
+class ReplayReport(NamedTuple):
+    sessions: int
+    answers: int
+    mismatches: List[str]
+    skipped: int  # unfinished sessions, or ones whose questions are not in the bank
+    seconds: float
+
+    @property
+    def answers_per_second(self) -> float:
+        return self.answers / self.seconds if self.seconds else 0.0
+
+
+def replay(records: Sequence[SessionRecord], lookup: QuestionLookup, repeat: int = 1) -> ReplayReport:
+    """Play finished sessions through QuizSession as fast as possible and check their option orders and scores"""
+    sessions = answers = skipped = 0
+    mismatches: List[str] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for record in records:
+            questions = [lookup(key) for key, _ in record.asked]
+            if not record.finished or any(question is None for question in questions):
+                skipped += 1
+                continue
+            # The clock stays at 0, so each answer is submitted at its logged elapsed time
+            session = QuizSession(questions, record.difficulty, record.time_limit, random.Random(record.seed),
+                                  clock=lambda: 0.0)
+            for (_, order), (choice, elapsed) in zip(record.asked, record.answers):
+                prompt = session.next_question()
+                if order != bytes(prompt.question.options.index(o) for o in prompt.options):
+                    mismatches.append(f"session {record.number}: options of question {prompt.number} "
+                                      f"were shown in a different order")
+                    break
+                session.submit_answer(choice, now=elapsed)
+                answers += 1
+            else:
+                if session.score != record.final[0]:
+                    mismatches.append(f"session {record.number}: replayed score {session.score}, "
+                                      f"logged {record.final[0]}")
+            sessions += 1
+    return ReplayReport(sessions, answers, mismatches, skipped, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged quiz sessions and check their scores")
+    parser.add_argument("log", help="session log written by the game")
+    parser.add_argument("question_packs", nargs="*", help="question packs used by the game")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+    args = parser.parse_args()
+
+    # Imported here since the game imports this module
+    from game import QuizGame
+    from render import NullRenderer
+
+    lookup = QuestionLookup(QuizGame(args.question_packs, renderer=NullRenderer()).questions)
+    records = list(read_sessions(args.log))
+    report = replay(records, lookup, args.repeat)
+    print(f"{report.sessions} sessions, {report.answers} answers replayed in {report.seconds:.2f}s "
+          f"({report.answers_per_second:,.0f} answers/s), {report.skipped} skipped")
+    for mismatch in report.mismatches:
+        print(f"  {mismatch}")
+
+
+if __name__ == "__main__":
+    main()
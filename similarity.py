@@ -0,0 +1,211 @@
+"""Near-duplicate question detection with MinHash and locality-sensitive hashing
+
+A question's tokens are the words of its text plus its whole options. Two
+questions are near-duplicates when the Jaccard similarity of their token sets
+reaches the threshold. MinHash signatures are cut into bands, and questions
+sharing a band land in the same bucket. Only bucket-mates are compared, so
+indexing is roughly linear in the bank size instead of comparing every pair.
+Run from the repository root to list the near-duplicates in the game's bank:
+
+    python similarity.py [question packs...]
+"""
+import argparse
+import hashlib
+import random
+import re
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from compact_store import read_columns, write_columns
+from question_bank import Question, QuestionBank
+
+MASK = (1 << 64) - 1
+WORD = re.compile(r"\w+")
+# Minimum Jaccard similarity of two near-duplicate questions
+THRESHOLD = 0.6
+
+
+def question_tokens(text: str, options: Iterable[str]) -> FrozenSet[str]:
+    """Words of the question text plus each whole option"""
+    tokens = set(WORD.findall(text.lower()))
+    tokens.update("option:" + option.strip().lower() for option in options)
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class NearDuplicates:
+    """Each question's near-duplicates, stored as row offsets into one flat array of ids
+
+    This is what the sampler consults to keep near-duplicates out of the same
+    round. It is saved next to the question cache and mapped back on start.
+    """
+
+    def __init__(self, offsets: Sequence[int], neighbors: Sequence[int], threshold: float):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.threshold = threshold
+
+    @classmethod
+    def from_dict(cls, size: int, neighbors: Dict[int, List[int]], threshold: float) -> "NearDuplicates":
+        offsets = array("I", [0])
+        flat = array("I")
+        for question_id in range(size):
+            flat.extend(sorted(neighbors.get(question_id, ())))
+            offsets.append(len(flat))
+        return cls(offsets, flat, threshold)
+
+    def __len__(self) -> int:
+        """Number of questions with at least one near-duplicate"""
+        offsets = self.offsets
+        return sum(1 for i in range(len(offsets) - 1) if offsets[i + 1] > offsets[i])
+
+    def of(self, question_id: int) -> Sequence[int]:
+        """Ids of a question's near-duplicates"""
+        if question_id + 1 >= len(self.offsets):
+            return ()
+        return self.neighbors[self.offsets[question_id]:self.offsets[question_id + 1]]
+
+    def pairs(self) -> Iterable[Tuple[int, int]]:
+        """Every near-duplicate pair once, lower id first"""
+        for question_id in range(len(self.offsets) - 1):
+            for other in self.of(question_id):
+                if other > question_id:
+                    yield question_id, other
+
+    def save(self, path: str, key: bytes):
+        """Write to a binary file tied to a question cache key"""
+        write_columns(path, key, {"threshold": self.threshold}, b"",
+                      {"offsets": self.offsets, "neighbors": self.neighbors})
+
+    @classmethod
+    def load(cls, path: str, key: bytes, threshold: float) -> Optional["NearDuplicates"]:
+        """Map a file written by save, or return None if it is missing, stale or for another threshold"""
+        cached = read_columns(path, key)
+        if cached is None:
+            return None
+        meta, _, columns = cached
+        if meta.get("threshold") != threshold:
+            return None
+        return cls(columns["offsets"], columns["neighbors"], threshold)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index that finds each question's near-duplicates as it is added
+
+    Signatures have bands * rows MinHash values. With the defaults, a pair at
+    Jaccard 0.6 shares a bucket about 90% of the time and a pair at 0.2
+    about 8% of the time. Bucket-mates are compared by signature first and
+    exactly only if the signatures mostly agree. A new question is compared
+    with at most max_checks members of each bucket and keeps at most
+    max_neighbors near-duplicates, so banks full of templated questions
+    cannot make indexing quadratic.
+    """
+
+    def __init__(self, bank: QuestionBank, threshold: float = THRESHOLD, bands: int = 10, rows: int = 3,
+                 max_checks: int = 4, max_neighbors: int = 16, seed: int = 1):
+        self.bank = bank
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_checks = max_checks
+        self.max_neighbors = max_neighbors
+        self.size = bands * rows
+        rng = random.Random(seed)
+        # Multiply-shift hash family, one (odd multiplier, offset) per MinHash value
+        self._hashes = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(self.size)]
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        # Low 32 bits of every signature, one after another, for the quick comparison
+        self._signatures = array("I")
+        self._neighbors: Dict[int, List[int]] = {}
+
+    def signature(self, tokens: FrozenSet[str]) -> List[int]:
+        hashes = [_token_hash(token) for token in tokens] or [0]
+        return [min((a * h + b) & MASK for h in hashes) for a, b in self._hashes]
+
+    def _agreement(self, signature: array, other: int) -> float:
+        """Share of equal MinHash values, an estimate of the Jaccard similarity"""
+        start = other * self.size
+        stored = self._signatures[start:start + self.size]
+        return sum(1 for a, b in zip(stored, signature) if a == b) / self.size
+
+    def _link(self, a: int, b: int):
+        for x, y in ((a, b), (b, a)):
+            neighbors = self._neighbors.setdefault(x, [])
+            if len(neighbors) < self.max_neighbors:
+                neighbors.append(y)
+
+    def add(self, question_id: int, question: Optional[Question] = None) -> List[int]:
+        """Index a bank question and return the ids of the near-duplicates found for it"""
+        question = question or self.bank[question_id]
+        tokens = question_tokens(question.text, question.options)
+        signature = self.signature(tokens)
+        short = array("I", (value & 0xFFFFFFFF for value in signature))
+        end = (question_id + 1) * self.size
+        if len(self._signatures) < end:
+            self._signatures.extend(array("I", bytes(4 * (end - len(self._signatures)))))
+        self._signatures[end - self.size:end] = short
+
+        found = []
+        checked = set()
+        for band, buckets in enumerate(self._buckets):
+            key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            bucket = buckets.setdefault(key, [])
+            # Only the newest few bucket-mates, so crowded buckets stay cheap
+            for other in bucket[-self.max_checks:]:
+                if other in checked or len(found) >= self.max_neighbors:
+                    continue
+                checked.add(other)
+                # Pairs whose signatures mostly disagree are skipped without building the question
+                if self._agreement(short, other) < self.threshold - 0.15:
+                    continue
+                existing = self.bank[other]
+                if jaccard(tokens, question_tokens(existing.text, existing.options)) >= self.threshold:
+                    self._link(question_id, other)
+                    found.append(other)
+            bucket.append(question_id)
+        return found
+
+    @classmethod
+    def build(cls, bank: QuestionBank, **options) -> "NearDuplicateIndex":
+        """Index every question of a bank"""
+        index = cls(bank, **options)
+        for question_id in range(len(bank)):
+            index.add(question_id)
+        return index
+
+    def near_duplicates(self) -> NearDuplicates:
+        """Snapshot of the near-duplicates found so far"""
+        return NearDuplicates.from_dict(len(self.bank), self._neighbors, self.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List near-duplicate questions")
+    parser.add_argument("question_packs", nargs="*", help="question packs used by the game")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="minimum Jaccard similarity")
+    args = parser.parse_args()
+
+    # Imported here since the game imports this module
+    from game import QuizGame
+    from render import NullRenderer
+
+    bank = QuizGame(args.question_packs, renderer=NullRenderer()).questions
+    duplicates = NearDuplicateIndex.build(bank, threshold=args.threshold).near_duplicates()
+    count = 0
+    for a, b in duplicates.pairs():
+        print(f"[{bank.difficulty_of(a)}] {bank.text_of(a)}")
+        print(f"  ~ [{bank.difficulty_of(b)}] {bank.text_of(b)}")
+        count += 1
+    print(f"{count} near-duplicate pairs among {len(bank)} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Monte Carlo simulation of round scores, for tuning point weights and performance bands
+
+Synthetic players answer rounds drawn by the game's own sampler and scored by
+QuizSession, so selection and scoring follow exactly the rules of start_quiz.
+Each skill model gives the chance of a correct answer per question difficulty
+and a chance of letting a question time out. Rounds are split into chunks
+that run in a process pool; every chunk has its own seeded random.Random, so
+results do not depend on the number of workers. Chunk histograms are merged.
+Run from the repository root:
+
+    python simulate.py --rounds 1000000 --difficulty hard --skill novice average expert
+
+The report also shows how far the game's maximum score is from the real one.
+The game counts every question at the round difficulty, although rounds also
+draw easier questions that are worth fewer points.
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import session
+from question_bank import QuestionBank
+from sampling import QuestionSampler
+from session import PERFORMANCE_BANDS, QuizSession, points_for
+from similarity import NearDuplicates
+
+
+class SkillModel(NamedTuple):
+    name: str
+    accuracy: Dict[str, float]  # chance of a correct answer by question difficulty
+    timeout_rate: float = 0.0
+
+
+SKILL_MODELS = {
+    "novice": SkillModel("novice", {"easy": 0.6, "medium": 0.35, "hard": 0.15}, 0.05),
+    "average": SkillModel("average", {"easy": 0.85, "medium": 0.6, "hard": 0.35}, 0.02),
+    "expert": SkillModel("expert", {"easy": 0.97, "medium": 0.9, "hard": 0.75}, 0.01),
+}
+
+# Percentages are histogrammed in tenths of a percent, so bands at whole or tenth percents are exact
+PERCENT_BINS = 10
+
+
+class SimulationResult:
+    """Histograms merged over every simulated round of one skill model"""
+
+    def __init__(self):
+        self.rounds = 0
+        self.scores: Counter = Counter()
+        # Percentage of the game's maximum (as shown by _end_quiz) and of the round's real maximum
+        self.shown_percent: Counter = Counter()
+        self.real_percent: Counter = Counter()
+        # Rounds whose real maximum is below the one the game uses
+        self.understated = 0
+        # Rounds that land in a lower band than their real percentage deserves
+        self.band_lowered = 0
+
+    def merge(self, other: "SimulationResult") -> "SimulationResult":
+        self.rounds += other.rounds
+        self.scores.update(other.scores)
+        self.shown_percent.update(other.shown_percent)
+        self.real_percent.update(other.real_percent)
+        self.understated += other.understated
+        self.band_lowered += other.band_lowered
+        return self
+
+    @staticmethod
+    def _mean(histogram: Counter, scale: float = 1.0) -> float:
+        total = sum(histogram.values())
+        return sum(value * count for value, count in histogram.items()) / scale / total if total else 0.0
+
+    def mean_score(self) -> float:
+        return self._mean(self.scores)
+
+    def mean_percent(self, real: bool = False) -> float:
+        return self._mean(self.real_percent if real else self.shown_percent, PERCENT_BINS)
+
+    def percentile(self, fraction: float, real: bool = False) -> float:
+        """Percentage of maximum reached by the given fraction of rounds (0.5 for the median)"""
+        histogram = self.real_percent if real else self.shown_percent
+        target = fraction * sum(histogram.values())
+        seen = 0
+        for value in sorted(histogram):
+            seen += histogram[value]
+            if seen >= target:
+                return value / PERCENT_BINS
+        return 0.0
+
+    def bands(self, bands: Sequence[Tuple[float, str]] = PERFORMANCE_BANDS, real: bool = False) -> Dict[str, float]:
+        """Share of rounds in each band, for any set of (minimum percentage, band) thresholds"""
+        histogram = self.real_percent if real else self.shown_percent
+        shares = {band: 0 for _, band in bands}
+        for value, count in histogram.items():
+            shares[_band(value / PERCENT_BINS, bands)] += count
+        total = sum(histogram.values()) or 1
+        return {band: count / total for band, count in shares.items()}
+
+
+def _band(percentage: float, bands: Sequence[Tuple[float, str]]) -> str:
+    for minimum, band in bands:
+        if percentage >= minimum:
+            return band
+    return bands[-1][1]
+
+
+# Per-process state, set up once by _init_worker
+_bank: Optional[QuestionBank] = None
+_near_duplicates: Optional[NearDuplicates] = None
+
+
+def _load_game(question_packs: List[str]):
+    # Imported here since the game imports the modules this one uses
+    from game import QuizGame
+    from render import NullRenderer
+
+    game = QuizGame(question_packs, renderer=NullRenderer())
+    # Loads the bank and its near-duplicates, compiling and caching them if they are stale
+    game.near_duplicates
+    return game
+
+
+def _init_worker(question_packs: List[str], points: Optional[Dict[str, int]]):
+    global _bank, _near_duplicates
+    game = _load_game(question_packs)
+    _bank = game.questions
+    _near_duplicates = game.near_duplicates
+    if points:
+        session.POINTS.update(points)
+
+
+def simulate_chunk(skill: SkillModel, difficulty: str, rounds: int, questions_per_round: int,
+                   weights: Optional[Dict[str, float]], seed: int) -> SimulationResult:
+    """Play rounds with one seeded generator; runs in the worker processes"""
+    rng = random.Random(seed)
+    sampler = QuestionSampler(_bank, rng=rng, near_duplicates=_near_duplicates)
+    result = SimulationResult()
+    for _ in range(rounds):
+        questions = sampler.sample(difficulty, questions_per_round, weights)
+        quiz = QuizSession(questions, difficulty, rng=rng, clock=lambda: 0.0)
+        for prompt in iter(quiz.next_question, None):
+            question = prompt.question
+            if rng.random() < skill.timeout_rate:
+                quiz.submit_answer(None)
+            elif rng.random() < skill.accuracy.get(question.difficulty, 0.0):
+                quiz.submit_answer(prompt.options.index(question.answer))
+            else:
+                wrong = [i for i, option in enumerate(prompt.options) if option != question.answer]
+                quiz.submit_answer(rng.choice(wrong))
+        final = quiz.finish()
+        real_max = sum(points_for(question.difficulty) for question in questions)
+        real_percentage = final.score / real_max * 100 if real_max else 0.0
+
+        result.rounds += 1
+        result.scores[final.score] += 1
+        result.shown_percent[int(final.percentage * PERCENT_BINS)] += 1
+        result.real_percent[int(real_percentage * PERCENT_BINS)] += 1
+        result.understated += real_max < final.max_score
+        result.band_lowered += final.band != _band(real_percentage, PERFORMANCE_BANDS)
+    return result
+
+
+def simulate(question_packs: List[str], skill: SkillModel, difficulty: str, rounds: int,
+             questions_per_round: int = 10, weights: Optional[Dict[str, float]] = None,
+             points: Optional[Dict[str, int]] = None, workers: Optional[int] = None,
+             chunk_rounds: int = 20000, seed: int = 0) -> SimulationResult:
+    """Simulate rounds across a process pool and merge their histograms"""
+    workers = workers or os.cpu_count() or 1
+    chunks = [min(chunk_rounds, rounds - start) for start in range(0, rounds, chunk_rounds)]
+    # Seeds depend on the chunk, not on which worker runs it; string seeds hash the same in every process
+    seeds = [random.Random(f"{seed}:{skill.name}:{difficulty}:{number}").getrandbits(64)
+             for number in range(len(chunks))]
+    result = SimulationResult()
+    if workers == 1:
+        saved_points = dict(session.POINTS)
+        _init_worker(question_packs, points)
+        try:
+            for size, chunk_seed in zip(chunks, seeds):
+                result.merge(simulate_chunk(skill, difficulty, size, questions_per_round, weights, chunk_seed))
+        finally:
+            session.POINTS.update(saved_points)
+        return result
+    # Compile the packs and find their near-duplicates once, so every worker just maps the caches
+    _load_game(question_packs)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(question_packs, points)) as pool:
+        futures = [pool.submit(simulate_chunk, skill, difficulty, size, questions_per_round, weights, chunk_seed)
+                   for size, chunk_seed in zip(chunks, seeds)]
+        for future in concurrent.futures.as_completed(futures):
+            result.merge(future.result())
+    return result
+
+
+def parse_skill(text: str) -> SkillModel:
+    """A named model, or name=easy:medium:hard[:timeout] accuracies such as coder=0.9:0.7:0.4"""
+    if "=" not in text:
+        if text not in SKILL_MODELS:
+            raise argparse.ArgumentTypeError(f"unknown skill model '{text}' (try {', '.join(SKILL_MODELS)})")
+        return SKILL_MODELS[text]
+    name, values = text.split("=", 1)
+    try:
+        numbers = [float(value) for value in values.split(":")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad skill model '{text}'")
+    if len(numbers) not in (3, 4):
+        raise argparse.ArgumentTypeError(f"skill model '{text}' needs easy:medium:hard[:timeout]")
+    return SkillModel(name, dict(zip(["easy", "medium", "hard"], numbers)), numbers[3] if len(numbers) == 4 else 0.0)
+
+
+def _parse_mapping(text: Optional[str], kind) -> Optional[dict]:
+    if not text:
+        return None
+    return {key: kind(value) for key, value in (item.split("=") for item in text.split(","))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate round scores for synthetic players")
+    parser.add_argument("question_packs", nargs="*", help="question packs used by the game")
+    parser.add_argument("--rounds", type=int, default=100000, help="rounds per skill model")
+    parser.add_argument("--difficulty", default="hard")
+    parser.add_argument("--questions", type=int, default=10, help="questions per round")
+    parser.add_argument("--skill", type=parse_skill, nargs="+", default=list(SKILL_MODELS.values()),
+                        help="named models or name=easy:medium:hard[:timeout] accuracies")
+    parser.add_argument("--points", help="points per difficulty, e.g. easy=1,medium=3,hard=5")
+    parser.add_argument("--weights", help="question weights per difficulty, e.g. easy=1,hard=2")
+    parser.add_argument("--bands", default=",".join(str(minimum) for minimum, _ in PERFORMANCE_BANDS[:-1]),
+                        help="band minimums from best to worst, e.g. 90,70,50")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    minimums = [float(value) for value in args.bands.split(",")] + [0]
+    names = [band for _, band in PERFORMANCE_BANDS]
+    if len(minimums) != len(names):
+        parser.error(f"--bands needs {len(names) - 1} minimums")
+    bands = list(zip(minimums, names))
+    points = _parse_mapping(args.points, int)
+    weights = _parse_mapping(args.weights, float)
+
+    print(f"{args.rounds} {args.difficulty} rounds of {args.questions} questions per skill model")
+    print(f"{'SKILL':10} | {'SCORE':>6} | {'SHOWN %':>7} | {'REAL %':>6} | {'P10/P50/P90 %':>16} | BANDS (shown)")
+    print("-" * 100)
+    start = time.perf_counter()
+    results = []
+    for skill in args.skill:
+        result = simulate(args.question_packs, skill, args.difficulty, args.rounds, args.questions, weights,
+                          points, args.workers, seed=args.seed)
+        results.append(result)
+        quantiles = "/".join(f"{result.percentile(fraction):.0f}" for fraction in (0.1, 0.5, 0.9))
+        shares = " ".join(f"{band} {share:.0%}" for band, share in result.bands(bands).items())
+        print(f"{skill.name:10} | {result.mean_score():6.2f} | {result.mean_percent():7.1f} | "
+              f"{result.mean_percent(real=True):6.1f} | {quantiles:>16} | {shares}")
+    elapsed = time.perf_counter() - start
+
+    total = sum(result.rounds for result in results)
+    understated = sum(result.understated for result in results)
+    lowered = sum(result.band_lowered for result in results)
+    print(f"\n{total:,} rounds in {elapsed:.1f}s ({total / elapsed:,.0f} rounds/s)")
+    print(f"Max score counts every question as {args.difficulty}: {understated / total:.1%} of rounds have a "
+          f"lower real maximum, and {lowered / total:.1%} are shown a lower band than their real percentage earns")
+
+
+if __name__ == "__main__":
+    main()
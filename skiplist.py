@@ -0,0 +1,145 @@
+import random
+from typing import Any, Iterator, List, Optional
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key: Any, value: Any, level: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * level
+        # width[i] is how many level-0 steps next[i] skips over
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """Sorted key/value list with O(log n) insert, remove, rank and positional lookup"""
+
+    MAX_LEVEL = 32
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self._head = _Node(None, None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the keys in sorted order"""
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_path(self, key: Any):
+        """Return the last node before key on every level and its position"""
+        update = [self._head] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        node = self._head
+        position = 0
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            positions[i] = position
+        return update, positions
+
+    def insert(self, key: Any, value: Any = None):
+        """Insert a key (keys must be unique and comparable)"""
+        update, positions = self._find_path(key)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                positions[i] = 0
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        node = _Node(key, value, level)
+        # The new node sits at position positions[0] + 1 counted from the head
+        rank = positions[0] + 1
+        for i in range(level):
+            previous = update[i]
+            node.next[i] = previous.next[i]
+            previous.next[i] = node
+            node.width[i] = previous.width[i] - (rank - positions[i]) + 1
+            previous.width[i] = rank - positions[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key: Any) -> Any:
+        """Remove a key and return its value, raising KeyError if it is missing"""
+        update, _ = self._find_path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for i in range(self._level):
+            if update[i].next[i] is node:
+                update[i].next[i] = node.next[i]
+                update[i].width[i] += node.width[i] - 1
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return node.value
+
+    def rank(self, key: Any) -> int:
+        """Number of keys strictly less than the given key"""
+        _, positions = self._find_path(key)
+        return positions[0]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the value stored for a key"""
+        update, _ = self._find_path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return default
+        return node.value
+
+    def _node_at(self, index: int) -> _Node:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+        node = self._head
+        remaining = index + 1
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        """Return the (key, value) pair at a sorted position"""
+        node = self._node_at(index)
+        return node.key, node.value
+
+    def items(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Any]:
+        """Iterate (key, value) pairs from position start up to stop"""
+        if self._size == 0 or start >= self._size:
+            return
+        stop = self._size if stop is None else min(stop, self._size)
+        node = self._node_at(start)
+        for _ in range(start, stop):
+            yield node.key, node.value
+            node = node.next[0]
+
+    def irange(self, minimum: Any) -> Iterator[Any]:
+        """Iterate (key, value) pairs with keys at or above minimum"""
+        update, _ = self._find_path(minimum)
+        node = update[0].next[0]
+        while node is not None:
+            yield node.key, node.value
+            node = node.next[0]
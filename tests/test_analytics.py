@@ -0,0 +1,25 @@
+import threading
+
+from analytics import EVENT, MAGIC, QuestionAnalytics
+from question_bank import Question
+
+QUESTION = Question("What keyword defines a function?", "def", ["def", "fun"], "easy")
+
+
+def test_flushing_while_recording_writes_every_event_once(tmp_path):
+    path = tmp_path / "question_analytics.bin"
+    analytics = QuestionAnalytics(str(path))
+    done = threading.Event()
+
+    def flush_until_done():
+        while not done.is_set():
+            analytics.flush()
+
+    flusher = threading.Thread(target=flush_until_done)
+    flusher.start()
+    for _ in range(20000):
+        analytics.record(QUESTION, "def", True, False, 0.5)
+    done.set()
+    flusher.join()
+    analytics.close()
+    assert path.stat().st_size == len(MAGIC) + 20000 * EVENT.size
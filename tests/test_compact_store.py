@@ -0,0 +1,35 @@
+import os
+import threading
+from array import array
+
+from compact_store import read_columns, write_columns
+
+KEY = b"k" * 32
+
+
+def test_truncated_cache_is_stale(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    write_columns(path, KEY, {"levels": ["easy"]}, b"some strings", {"ids": array("I", range(1000))})
+    meta, blob, columns = read_columns(path, KEY)
+    assert bytes(blob) == b"some strings" and columns["ids"].tolist() == list(range(1000))
+    del meta, blob, columns
+
+    size = os.path.getsize(path)
+    for keep in (size - 1, size // 2, 60, 41):
+        with open(path, "r+b") as f:
+            f.truncate(keep)
+        assert read_columns(path, KEY) is None
+
+
+def test_concurrent_writers_each_publish_a_whole_file(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    writers = [threading.Thread(target=write_columns,
+                                args=(path, KEY, {"writer": number}, b"", {"ids": array("I", [number] * 200000)}))
+               for number in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    meta, _, columns = read_columns(path, KEY)
+    assert set(columns["ids"].tolist()) == {meta["writer"]}
+    assert os.listdir(tmp_path) == ["cache.bin"]
@@ -0,0 +1,40 @@
+import random
+
+from fenwick import FenwickTree, ScoreDistribution
+
+
+def test_tree_grows_past_its_initial_size():
+    rng = random.Random(2)
+    tree = FenwickTree(4)
+    counts = {}
+    for _ in range(500):
+        value = rng.randrange(300)
+        tree.add(value)
+        counts[value] = counts.get(value, 0) + 1
+    assert len(tree) >= 300
+    for value in range(-1, 400, 7):
+        assert tree.count(value) == counts.get(value, 0)
+        assert tree.prefix(value) == sum(count for score, count in counts.items() if score <= value)
+
+
+def test_ties_share_a_rank_and_percentile():
+    rng = random.Random(4)
+    distribution = ScoreDistribution()
+    scores = [rng.randrange(120) for _ in range(400)]
+    for score in scores:
+        distribution.add(score)
+    for score in scores[:100]:
+        distribution.remove(score)
+    scores = scores[100:]
+
+    assert len(distribution) == len(scores)
+    for score in set(scores):
+        above = sum(other > score for other in scores)
+        assert distribution.rank(score) == above + 1
+        assert distribution.percentile(score) == (len(scores) - above) / len(scores) * 100
+
+    histogram = distribution.histogram(10)
+    assert sum(count for _, count in histogram) == len(scores)
+    for start, count in histogram:
+        assert count == sum(start <= score < start + 10 for score in scores)
+    assert histogram[-1][0] <= max(scores) < histogram[-1][0] + 10
@@ -0,0 +1,53 @@
+import json
+
+import game as game_module
+from game import QuizGame
+from render import NullRenderer
+
+
+def make_game(tmp_path, packs):
+    game = QuizGame(packs, renderer=NullRenderer())
+    game.config["question_cache"] = str(tmp_path / "question_cache.bin")
+    game.config["duplicates_cache"] = str(tmp_path / "question_duplicates.bin")
+    return game
+
+
+def test_near_duplicates_are_found_when_packs_compile(tmp_path, monkeypatch):
+    pack = tmp_path / "pack.json"
+    pack.write_text(json.dumps([{
+        "text": f"Which keyword starts the definition of function number {i}?",
+        "answer": "def", "options": ["def", "fun", "func"], "difficulty": "easy"
+    } for i in range(2)]))
+
+    game = make_game(tmp_path, [str(pack)])
+    duplicates = game.near_duplicates
+    assert duplicates is not None and list(duplicates.pairs())
+    assert (tmp_path / "question_duplicates.bin").exists()
+
+    # A second start maps both caches instead of searching again
+    monkeypatch.setattr(game_module.NearDuplicateIndex, "build", None)
+    again = make_game(tmp_path, [str(pack)])
+    assert list(again.near_duplicates.pairs()) == list(duplicates.pairs())
+
+
+def test_builtin_questions_are_deduplicated_without_a_cache(tmp_path):
+    game = make_game(tmp_path, [])
+    pairs = {frozenset((game.questions.text_of(a), game.questions.text_of(b)))
+             for a, b in game.near_duplicates.pairs()}
+    assert frozenset(("Which keyword is used to handle exceptions?",
+                      "Which keyword is used with 'try' to handle specific exceptions?")) in pairs
+    assert not (tmp_path / "question_duplicates.bin").exists()
+
+
+def test_bad_pack_records_are_skipped(tmp_path):
+    pack = tmp_path / "pack.jsonl"
+    good = {"text": "What keyword defines a function?", "answer": "def", "options": ["def", "fun"],
+            "difficulty": "easy"}
+    pack.write_text("\n".join(json.dumps(record) for record in [
+        good, dict(good, text="Which tag breaks?", tags=[1, 2]), dict(good, answer="lambda")]))
+    output = []
+    game = make_game(tmp_path, [str(pack)])
+    game.renderer.add = output.extend
+    builtin = len(make_game(tmp_path, []).questions)
+    assert len(game.questions) == builtin + 1
+    assert "2 bad questions skipped" in output[0]
@@ -0,0 +1,18 @@
+from importer import validate_record
+
+LEVELS = ["easy", "medium", "hard"]
+
+
+def record(**fields):
+    base = {"text": "What keyword defines a function?", "answer": "def", "options": ["def", "fun"],
+            "difficulty": "easy"}
+    base.update(fields)
+    return base
+
+
+def test_tags_must_be_strings():
+    for tags in (5, [1, 2], {"a": 1}):
+        question, problems = validate_record(record(tags=tags), LEVELS)
+        assert question is None and problems == ["tags must be a string or a list of strings"]
+    assert validate_record(record(tags="a, b"), LEVELS)[0][4] == ("a", "b")
+    assert validate_record(record(tags=["a"]), LEVELS)[0][4] == ("a",)
@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+from journal import JournalError, ScoreJournal
+from score_store import JournalScoreStore
+
+
+def test_corrupt_snapshot_keeps_journal_tail(tmp_path):
+    path = str(tmp_path / "high_scores.json")
+    journal = ScoreJournal(path, fsync=False)
+    leaderboard = journal.load()
+    journal.record(leaderboard, "alice", 5, "easy", "2024-01-01")
+    journal.compact(leaderboard)
+    journal.record(leaderboard, "carol", 7, "hard", "2024-01-02")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    store = JournalScoreStore(path)
+    with pytest.raises(JournalError):
+        store.load()
+    assert store.get("carol")["best_score"] == 7
+    assert os.path.exists(path + ".corrupt")
+
+    # A later round and a clean shutdown must keep the recovered record
+    store.record("bob", 3, "easy")
+    store.close()
+    reloaded = JournalScoreStore(path)
+    reloaded.load()
+    assert reloaded.get("carol")["best_score"] == 7
+    assert reloaded.get("bob")["best_score"] == 3
+    with open(path, encoding="utf-8") as f:
+        assert {entry["name"] for entry in json.load(f)["entries"]} == {"carol", "bob"}
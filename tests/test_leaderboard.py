@@ -0,0 +1,33 @@
+import random
+
+from leaderboard import Leaderboard
+
+
+def test_ranking_matches_a_sorted_list():
+    rng = random.Random(8)
+    leaderboard = Leaderboard()
+    for _ in range(2000):
+        leaderboard.record(f"player{rng.randrange(300)}", rng.randrange(50), rng.choice(["easy", "hard"]))
+
+    expected = sorted(leaderboard, key=lambda entry: (-entry["best_score"], entry["name"]))
+    assert [entry["name"] for entry in leaderboard.top(len(expected))] == [entry["name"] for entry in expected]
+    assert [entry["name"] for entry in leaderboard.top(10, 25)] == [entry["name"] for entry in expected[25:35]]
+    for position, entry in enumerate(expected, 1):
+        assert leaderboard.rank(entry["name"]) == position
+    assert leaderboard.rank("nobody") is None
+
+
+def test_record_keeps_bests_and_attempts():
+    leaderboard = Leaderboard()
+    leaderboard.record("alice", 5, "easy", "2024-01-01")
+    leaderboard.record("alice", 3, "hard")
+    entry = leaderboard.record("alice", 4, "easy")
+    assert entry["best_score"] == 5 and entry["last_score"] == 4 and entry["attempts"] == 3
+    assert entry["best_by_difficulty"] == {"easy": 5, "hard": 3}
+    assert entry["date"] == "2024-01-01"
+
+    # Replacing an entry moves it in the ranking
+    leaderboard.record("bob", 6, "easy")
+    assert leaderboard.rank("alice") == 2
+    leaderboard.put(dict(entry, best_score=9))
+    assert leaderboard.rank("alice") == 1 and len(leaderboard) == 2
@@ -0,0 +1,36 @@
+import io
+
+import render
+from render import CLEAR_SCREEN, AnsiRenderer
+
+
+def make(monkeypatch, columns=40, lines=24):
+    monkeypatch.setattr(render.shutil, "get_terminal_size", lambda: render.os.terminal_size((columns, lines)))
+    stream = io.StringIO()
+    return AnsiRenderer(stream, lambda prompt: ""), stream
+
+
+def test_unchanged_rows_are_skipped(monkeypatch):
+    renderer, stream = make(monkeypatch)
+    renderer.show(["title", "row one"])
+    stream.truncate(0)
+    stream.seek(0)
+    renderer.show(["title", "row two"])
+    assert CLEAR_SCREEN not in stream.getvalue()
+    assert "title" not in stream.getvalue()
+
+
+def test_rows_wider_than_the_terminal_redraw_everything(monkeypatch):
+    renderer, stream = make(monkeypatch, columns=20)
+    renderer.show(["title", "x" * 30, "last"])
+    stream.truncate(0)
+    stream.seek(0)
+    renderer.show(["title", "x" * 30, "changed"])
+    assert stream.getvalue().startswith(CLEAR_SCREEN)
+
+    # Emoji take two columns each
+    renderer.show(["title", "🎉" * 10])
+    stream.truncate(0)
+    stream.seek(0)
+    renderer.show(["title", "🎉" * 10, "more"])
+    assert stream.getvalue().startswith(CLEAR_SCREEN)
@@ -0,0 +1,85 @@
+import os
+
+from analytics import text_key
+from question_bank import Question
+from review import INTERVALS, ReviewDeck, ReviewScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_correct_reviews_climb_the_boxes_until_learned():
+    deck = ReviewDeck()
+    now = 1000
+    deck.schedule(7, 0, now)
+    assert deck.pull_due(now, 5) == [7]
+    for box in range(1, len(INTERVALS)):
+        deck.answered(7, True, now)
+        assert deck.box(7) == box and deck.next_due() == now + INTERVALS[box]
+        assert deck.pull_due(now + INTERVALS[box] - 1, 5) == []
+        now += INTERVALS[box]
+        assert deck.pull_due(now, 5) == [7]
+    deck.answered(7, True, now)
+    assert 7 not in deck and len(deck) == 0 and deck.next_due() is None
+    # A correct answer to a question that is not tracked changes nothing
+    deck.answered(8, True, now)
+    assert 8 not in deck
+
+
+def test_a_miss_sends_a_question_back_to_box_zero():
+    deck = ReviewDeck()
+    deck.schedule(7, 3, 1000)
+    deck.answered(7, False, 2000)
+    assert deck.box(7) == 0 and deck.pull_due(2000, 5) == [7]
+
+
+def test_stale_heap_entries_are_skipped():
+    deck = ReviewDeck()
+    deck.schedule(1, 0, 1000)
+    deck.schedule(2, 0, 1005)
+    deck.schedule(3, 0, 1010)
+    # Rescheduling and removal leave the old entries in the heap
+    deck.schedule(1, 2, 1000)
+    deck.remove(2)
+    assert len(deck._heap) == 4
+    assert deck.next_due() == 1010
+    assert deck.pull_due(2000, 5) == [3]
+    assert deck.pull_due(1000 + INTERVALS[2], 5) == [1]
+    assert deck._heap == []
+
+    # Heap order matches a sort of the live entries after many reschedules
+    for key in range(50):
+        deck.schedule(key, key % 4, 5000 - key * 7)
+    for key in range(0, 50, 3):
+        deck.schedule(key, (key + 1) % 4, 5000 + key)
+    expected = sorted((due, key) for key, (_, due) in deck._items.items())
+    assert deck.pull_due(10 ** 9, 100) == [key for _, key in expected]
+
+
+def test_decks_survive_a_save_and_reload(tmp_path):
+    clock = FakeClock()
+    scheduler = ReviewScheduler(str(tmp_path / "review"), clock)
+    capital = Question("Capital of France?", "Paris", ["Paris", "Rome"], "easy")
+    planet = Question("Largest planet?", "Jupiter", ["Mars", "Jupiter"], "hard")
+    scheduler.answered("alice", capital, False)
+    scheduler.answered("alice", planet, False)
+    scheduler.answered("alice", capital, True)
+    # A correct answer outside a review round is not tracked
+    scheduler.answered("bob", planet, True)
+    clock.now += 1
+    scheduler.answered("alice", capital, True, reviewing=True)
+    scheduler.save()
+    assert os.listdir(tmp_path / "review") == [os.path.basename(scheduler._path("alice"))]
+
+    reloaded = ReviewScheduler(str(tmp_path / "review"), clock)
+    deck = reloaded.deck("alice")
+    assert deck.box(text_key(capital.text)) == 1 and deck.box(text_key(planet.text)) == 0
+    assert reloaded.pull_due("alice", 5) == [text_key(planet.text)]
+    clock.now += INTERVALS[1]
+    assert reloaded.pull_due("alice", 5) == [text_key(capital.text)]
+    assert len(reloaded.deck("bob")) == 0
@@ -0,0 +1,93 @@
+import random
+from collections import Counter
+
+from question_bank import Question, QuestionBank
+from sampling import QuestionSampler
+from similarity import NearDuplicates
+
+
+def make_bank(easy=60, medium=30, hard=10) -> QuestionBank:
+    bank = QuestionBank()
+    for difficulty, count in (("easy", easy), ("medium", medium), ("hard", hard)):
+        for i in range(count):
+            bank.add(Question(f"{difficulty} question {i}?", "yes", ["yes", "no"], difficulty))
+    return bank
+
+
+def test_rounds_hold_distinct_questions_at_or_below_the_difficulty():
+    bank = make_bank()
+    sampler = QuestionSampler(bank, rng=random.Random(1))
+    for k in (1, 10, 45, 90, 200):
+        ids = sampler.sample_ids("medium", k)
+        assert len(ids) == min(k, 90) and len(set(ids)) == len(ids)
+        assert all(bank.difficulty_of(question_id) in ("easy", "medium") for question_id in ids)
+    assert sampler.sample_ids("hard", 0) == []
+
+
+def test_recent_rounds_are_skipped_for_a_player():
+    bank = make_bank()
+    sampler = QuestionSampler(bank, history_rounds=2, rng=random.Random(2))
+    history = []
+    for _ in range(20):
+        ids = sampler.sample_ids("hard", 30, player="alice")
+        sampler.remember("alice", ids)
+        for previous in history[-2:]:
+            assert not set(ids) & previous
+        history.append(set(ids))
+    assert sampler.recent_ids("alice") == history[-1] | history[-2]
+
+    # Other players are not affected, and forgetting clears the history
+    assert sampler.recent_ids("bob") == set()
+    sampler.forget("alice")
+    assert sampler.recent_ids("alice") == set()
+
+
+def test_level_weights_are_respected():
+    bank = make_bank()
+    sampler = QuestionSampler(bank, rng=random.Random(3))
+    weights = {"easy": 1, "medium": 0, "hard": 3}
+    levels = Counter()
+    for _ in range(3000):
+        levels.update(bank.difficulty_of(question_id) for question_id in sampler.sample_ids("hard", 1, weights))
+    # Each level is drawn in proportion to its size times its weight: 60 * 1 easy to 10 * 3 hard
+    assert levels["medium"] == 0
+    assert abs(levels["hard"] / 3000 - 1 / 3) < 0.04
+
+    # Weights also apply when the round is drawn exactly from a small pool
+    small = make_bank(easy=20, medium=0, hard=20)
+    sampler = QuestionSampler(small, rng=random.Random(3))
+    levels = Counter()
+    for _ in range(500):
+        levels.update(small.difficulty_of(question_id)
+                      for question_id in sampler.sample_ids("hard", 10, {"easy": 1, "hard": 20}))
+    assert levels["hard"] > 3 * levels["easy"]
+
+
+def test_small_pools_are_sampled_exactly(monkeypatch):
+    bank = make_bank(easy=12, medium=0, hard=0)
+    sampler = QuestionSampler(bank, history_rounds=1, rng=random.Random(4))
+
+    def fail(*args):
+        raise AssertionError("rejection sampling used on a small pool")
+
+    monkeypatch.setattr(sampler, "_rejection_sample", fail)
+    first = sampler.sample_ids("easy", 8, player="alice")
+    sampler.remember("alice", first)
+    assert len(set(first)) == 8
+
+    # Only 4 unseen questions remain, so the round tops up with recent repeats
+    second = sampler.sample_ids("easy", 8, player="alice")
+    assert len(set(second)) == 8
+    assert set(range(12)) - set(first) <= set(second)
+    assert sorted(sampler.sample_ids("easy", 50)) == list(range(12))
+
+
+def test_a_round_avoids_near_duplicates_while_it_can():
+    bank = make_bank(easy=6, medium=0, hard=0)
+    near_duplicates = NearDuplicates.from_dict(6, {0: [1], 1: [0], 2: [3], 3: [2]}, 0.8)
+    sampler = QuestionSampler(bank, rng=random.Random(5), near_duplicates=near_duplicates)
+    for _ in range(50):
+        ids = set(sampler.sample_ids("easy", 4))
+        assert len(ids) == 4 and not {0, 1} <= ids and not {2, 3} <= ids
+    # With no other choice left, near-duplicates are allowed back in
+    assert sorted(sampler.sample_ids("easy", 6)) == list(range(6))
@@ -0,0 +1,94 @@
+import random
+import sqlite3
+
+import pytest
+
+from leaderboard import Standing
+from score_store import JournalScoreStore, SQLiteScoreStore
+
+
+def test_busy_database_keeps_the_batch(tmp_path):
+    path = str(tmp_path / "scores.db")
+    store = SQLiteScoreStore(path, batch_size=3, timeout=0.05)
+    store.record("alice", 4, "easy")
+    store.record("bob", 6, "medium")
+
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        store.record("carol", 8, "hard")
+    blocker.execute("ROLLBACK")
+    blocker.close()
+
+    store.flush()
+    assert [store.best_score(name) for name in ("alice", "bob", "carol")] == [4, 6, 8]
+    store.close()
+
+
+def test_standing_matches_a_full_count(tmp_path):
+    path = str(tmp_path / "scores.db")
+    store = SQLiteScoreStore(path, batch_size=4)
+    rng = random.Random(3)
+    for _ in range(300):
+        store.record(f"player{rng.randrange(60)}", rng.randrange(40), rng.choice(["easy", "hard"]))
+    store.close()
+
+    def counted(name, difficulty=None):
+        conn = sqlite3.connect(path)
+        table, where = "players", ""
+        if difficulty is not None:
+            table, where = "player_levels", f"difficulty = '{difficulty}' AND "
+        score, = conn.execute(f"SELECT best_score FROM {table} WHERE {where}name = ?", (name,)).fetchone()
+        above, = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}best_score > ?", (score,)).fetchone()
+        players, = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}1").fetchone()
+        conn.close()
+        return Standing(above + 1, players, (players - above) / players * 100)
+
+    # A database from before the count table is backfilled when opened
+    conn = sqlite3.connect(path)
+    for trigger in ("players", "player_levels"):
+        for event in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER {trigger}_count_{event}")
+    conn.execute("DROP TABLE score_counts")
+    conn.close()
+
+    for store in (SQLiteScoreStore(path), SQLiteScoreStore(path)):
+        store.record("player1", 99, "hard")
+        for number in range(60):
+            name = f"player{number}"
+            if store.get(name) is None:
+                continue
+            assert store.standing(name) == counted(name)
+            for difficulty in ("easy", "hard"):
+                if store.standing(name, difficulty) is not None:
+                    assert store.standing(name, difficulty) == counted(name, difficulty)
+        store.close()
+
+
+def test_journal_store_standings_match_a_full_count(tmp_path):
+    rng = random.Random(6)
+    store = JournalScoreStore(str(tmp_path / "high_scores.json"), compact_every=50)
+    store.load()
+    for _ in range(400):
+        store.record(f"player{rng.randrange(80)}", rng.randrange(30), rng.choice(["easy", "medium", "hard"]))
+    store.close()
+
+    # Reloading rebuilds the distributions from the snapshot
+    store = JournalScoreStore(str(tmp_path / "high_scores.json"))
+    store.load()
+    entries = list(store.leaderboard)
+
+    def counted(score, bests):
+        above = sum(best > score for best in bests)
+        return Standing(above + 1, len(bests), (len(bests) - above) / len(bests) * 100)
+
+    overall = [other["best_score"] for other in entries]
+    for entry in entries:
+        assert store.standing(entry["name"]) == counted(entry["best_score"], overall)
+        for level in ("easy", "medium", "hard"):
+            levels = entry["best_by_difficulty"]
+            if level not in levels:
+                assert store.standing(entry["name"], level) is None
+                continue
+            bests = [other["best_by_difficulty"][level] for other in entries if level in other["best_by_difficulty"]]
+            assert store.standing(entry["name"], level) == counted(levels[level], bests)
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from question_bank import Question
+from session import QuizSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_session(clock, difficulty="medium", time_limit=10):
+    questions = [
+        Question("2 + 2?", "4", ["3", "4", "5"], "easy"),
+        Question("Capital of France?", "Paris", ["Paris", "Rome", "Madrid"], "medium"),
+        Question("Largest planet?", "Jupiter", ["Mars", "Jupiter", "Venus"], "hard")
+    ]
+    return QuizSession(questions, difficulty, time_limit, rng=random.Random(4), clock=clock)
+
+
+def test_answers_score_by_question_difficulty():
+    clock = FakeClock()
+    session = make_session(clock)
+    assert session.max_score == 6
+
+    prompt = session.next_question()
+    assert (prompt.number, prompt.total, prompt.time_limit) == (1, 3, 10)
+    assert sorted(prompt.options) == sorted(prompt.question.options)
+    clock.now += 4
+    assert session.time_remaining() == 6 and session.deadline() == 110
+    result = session.submit_answer(prompt.options.index("4"))
+    assert result.correct and not result.timed_out and result.points == 1 and result.elapsed == 4
+
+    prompt = session.next_question()
+    result = session.submit_answer(prompt.options.index("Rome"))
+    assert not result.correct and result.points == 0 and result.chosen == "Rome" and result.answer == "Paris"
+
+    prompt = session.next_question()
+    result = session.submit_answer(prompt.options.index("Jupiter"))
+    assert result.points == 3 and result.score == 4
+    assert session.next_question() is None
+
+    final = session.finish()
+    assert (final.score, final.max_score, final.total_questions, final.correct) == (4, 6, 3, 2)
+    assert final.percentage == pytest.approx(400 / 6) and final.band == "good"
+    # Finishing again returns the same result
+    assert session.finish() is final and session.finished
+
+
+def test_late_and_missing_answers_time_out():
+    clock = FakeClock()
+    session = make_session(clock)
+
+    prompt = session.next_question()
+    clock.now += 10.5
+    assert session.time_remaining() == 0
+    result = session.submit_answer(prompt.options.index("4"))
+    assert result.timed_out and not result.correct and result.chosen is None and result.points == 0
+
+    # An answer given exactly at the limit still counts
+    prompt = session.next_question()
+    result = session.submit_answer(prompt.options.index("Paris"), now=clock.now + 10)
+    assert result.correct and not result.timed_out
+
+    session.next_question()
+    result = session.submit_answer(None)
+    assert result.timed_out and result.elapsed == 0 and session.score == 2
+
+
+def test_invalid_choices_leave_the_question_open():
+    clock = FakeClock()
+    session = make_session(clock)
+    prompt = session.next_question()
+    for choice in (-1, 3):
+        with pytest.raises(ValueError):
+            session.submit_answer(choice)
+    assert session.awaiting_answer and session.current_question is prompt.question
+    assert session.submit_answer(prompt.options.index("4")).correct
+
+
+def test_calls_out_of_order_raise():
+    session = make_session(FakeClock())
+    with pytest.raises(RuntimeError):
+        session.submit_answer(0)
+    session.next_question()
+    with pytest.raises(RuntimeError):
+        session.next_question()
+    session.submit_answer(0)
+    with pytest.raises(RuntimeError):
+        session.submit_answer(0)
+
+    # Finishing early closes the round with the remaining questions counted in the maximum
+    session.next_question()
+    final = session.finish()
+    assert not session.awaiting_answer and final.max_score == 6 and final.total_questions == 3
+    assert session.next_question() is None
+    with pytest.raises(RuntimeError):
+        session.submit_answer(0)
+
+
+def test_max_score_uses_the_round_difficulty():
+    assert make_session(FakeClock(), "easy").max_score == 3
+    assert make_session(FakeClock(), "hard").max_score == 9
+    empty = QuizSession([], "hard", clock=FakeClock())
+    assert empty.next_question() is None
+    final = empty.finish()
+    assert (final.max_score, final.percentage, final.band) == (0, 0.0, "practice")
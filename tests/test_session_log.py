@@ -0,0 +1,70 @@
+from analytics import text_key
+from question_bank import Question, QuestionBank
+from session_log import QuestionLookup, SessionLog, read_sessions
+
+QUESTION = Question("What keyword defines a function?", "def", ["def", "fun", "func"], "easy")
+
+
+def play(log, player, finish=True):
+    number = log.start(player, "easy", 7, 30, [QUESTION])
+    log.asked(number, QUESTION, QUESTION.options)
+    log.answered(number, 0, 1.5)
+    if finish:
+        log.finished(number, 1, 1)
+    return number
+
+
+def test_long_names_are_cut_on_a_character_boundary(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    player = "é" * 200
+    log = SessionLog(path, fsync=False)
+    number = play(log, player, finish=False)
+    log.close()
+
+    reopened = SessionLog(path, fsync=False)
+    assert reopened.unfinished(player).number == number
+    assert reopened.unfinished(player).player == "é" * 127
+
+
+def test_rotation_keeps_only_unfinished_sessions(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    log = SessionLog(path, fsync=False, max_bytes=1000)
+    waiting = play(log, "alice", finish=False)
+    for number in range(20):
+        play(log, f"player{number}")
+    log.close()
+
+    assert (tmp_path / "sessions.bin.1").exists()
+    assert (tmp_path / "sessions.bin").stat().st_size < 1000
+    assert SessionLog(path, fsync=False).unfinished("alice").number == waiting
+    assert any(session.finished for session in read_sessions(path + ".1"))
+
+
+def test_lookup_columns_are_saved_and_mapped(tmp_path):
+    bank = QuestionBank(compact=True)
+    bank.extend(Question(f"Question {i}?", "yes", ["yes", "no"], "easy") for i in range(50))
+    path = str(tmp_path / "question_keys.bin")
+    QuestionLookup(bank).save(path, b"k" * 32)
+
+    lookup = QuestionLookup.load(path, bank, b"k" * 32)
+    assert lookup(text_key("Question 17?")).text == "Question 17?"
+    assert lookup(text_key("Not in the bank")) is None
+    assert QuestionLookup.load(path, bank, b"x" * 32) is None
+
+
+def test_writers_sharing_a_log_never_reuse_numbers(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    kiosk, server = SessionLog(path, fsync=False, max_bytes=2000), SessionLog(path, fsync=False, max_bytes=2000)
+    bob = play(kiosk, "bob", finish=False)
+    numbers = [bob]
+    for round_number in range(30):
+        writer = server if round_number % 2 else kiosk
+        numbers.append(play(writer, f"player{round_number}"))
+    assert len(set(numbers)) == len(numbers)
+    # Both see bob's interrupted round, also after the log was rotated
+    assert (tmp_path / "sessions.bin.1").exists()
+    assert server.unfinished("bob").number == bob
+    assert kiosk.unfinished("bob").answers == [(0, 1.5)]
+    kiosk.close()
+    server.close()
+    assert SessionLog(path, fsync=False).unfinished("bob").number == bob
@@ -0,0 +1,49 @@
+import bisect
+import random
+
+import pytest
+
+from skiplist import IndexableSkipList
+
+
+def test_matches_a_sorted_list_under_random_inserts_and_removes():
+    rng = random.Random(5)
+    skiplist = IndexableSkipList(random.Random(6))
+    expected = []
+    for step in range(3000):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            assert skiplist.remove(key) == f"value {key}"
+            expected.remove(key)
+        else:
+            key = rng.randrange(10000)
+            if key in expected:
+                continue
+            skiplist.insert(key, f"value {key}")
+            bisect.insort(expected, key)
+
+        if step % 50 == 0:
+            assert len(skiplist) == len(expected)
+            assert list(skiplist) == expected
+            for probe in rng.sample(range(10000), 20):
+                assert skiplist.rank(probe) == bisect.bisect_left(expected, probe)
+            for index in range(len(expected)):
+                assert skiplist[index] == (expected[index], f"value {expected[index]}")
+            start = rng.randrange(len(expected) + 1)
+            assert [key for key, _ in skiplist.items(start, start + 10)] == expected[start:start + 10]
+
+
+def test_positions_and_missing_keys():
+    skiplist = IndexableSkipList(random.Random(1))
+    for key in (30, 10, 20):
+        skiplist.insert(key, key * 2)
+    assert skiplist[-1] == (30, 60)
+    assert skiplist.get(20) == 40 and skiplist.get(25, "missing") == "missing"
+    assert [key for key, _ in skiplist.irange(15)] == [20, 30]
+    with pytest.raises(IndexError):
+        skiplist[3]
+    with pytest.raises(KeyError):
+        skiplist.remove(25)
+    for key in (10, 20, 30):
+        skiplist.remove(key)
+    assert len(skiplist) == 0 and list(skiplist.items()) == []